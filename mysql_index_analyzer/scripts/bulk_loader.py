@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 批量导入工具
+把行数据写成CSV并通过LOAD DATA LOCAL INFILE导入，供数据生成器和快照恢复共用
+"""
+
+import os
+import csv
+import tempfile
+from datetime import datetime
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+NULL_TEXT = 'NULL'  # ESCAPED BY ''时LOAD DATA把未加引号的NULL识别为空值
+
+
+def csv_value(value):
+    """把字段值转换为LOAD DATA可以识别的文本"""
+    if value is None:
+        return NULL_TEXT
+    if isinstance(value, datetime):
+        return value.strftime(DATETIME_FORMAT)
+    return value
+
+
+def write_csv_rows(f, rows):
+    """把行数据写入已打开的文本文件，返回写入的行数"""
+    writer = csv.writer(f, lineterminator='\n')
+    count = 0
+    for row in rows:
+        writer.writerow([csv_value(value) for value in row])
+        count += 1
+    return count
+
+
+def read_csv_rows(f):
+    """从CSV文件读取行数据（NULL还原为None），用于不能使用LOAD DATA时的INSERT导入"""
+    for row in csv.reader(f):
+        yield tuple(None if value == NULL_TEXT else value for value in row)
+
+
+def load_csv_file(cursor, table, columns, path):
+    """通过LOAD DATA LOCAL INFILE导入CSV文件"""
+    cursor.execute(f"""
+        LOAD DATA LOCAL INFILE '{path}' INTO TABLE {table}
+        CHARACTER SET utf8mb4
+        FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+        LINES TERMINATED BY '\\n'
+        ({', '.join(columns)})
+    """)
+
+
+def bulk_load_rows(cursor, table, columns, rows):
+    """把一批数据写入CSV缓冲文件，再通过LOAD DATA LOCAL INFILE导入"""
+    # mysql-connector只能从文件路径读取本地文件，因此缓冲区使用临时文件
+    fd, path = tempfile.mkstemp(prefix=f"{table}_", suffix=".csv")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+            write_csv_rows(f, rows)
+        load_csv_file(cursor, table, columns, path)
+    finally:
+        os.unlink(path)
+
+
+def insert_rows(cursor, table, columns, rows):
+    """使用executemany批量插入"""
+    placeholders = ", ".join(["%s"] * len(columns))
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
+    cursor.executemany(sql, rows)
+
+
+def check_local_infile(cursor):
+    """检查服务器是否允许LOAD DATA LOCAL INFILE"""
+    cursor.execute("SELECT @@GLOBAL.local_infile")
+    return bool(cursor.fetchone()[0])
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 声明式测试用例
+从JSON/YAML文件读取测试查询（SQL、参数生成器和索引提示）和索引策略（索引集合），
+索引测试框架按 查询×策略 的矩阵执行，结果以查询ID（case_id）和策略ID作为稳定的键
+"""
+
+import os
+import re
+import json
+import random
+import hashlib
+from datetime import datetime, timedelta
+
+from schema_spec import read_spec_file
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+DEFAULT_CASE_SPEC = os.path.join(PROJECT_DIR, "specs", "index_cases.json")  # 默认的测试用例配置
+
+# 支持的参数生成器: constant 固定值, int 随机整数, sample 从表中随机取一个值,
+# days_ago 指定列的最大值（未指定列时为当前时间）往前若干天的时间
+PARAM_TYPES = ('constant', 'int', 'sample', 'days_ago')
+# 参数池配置：sample参数每次测试只按主键范围抽样一次，之后每次执行从池中抽取
+POOL_SIZE = 100  # 每个sample参数抽取的取值数，也是每个查询预先生成的参数组数
+POOL_SEED = 20240101  # 固定随机种子，各索引策略按相同顺序使用相同的参数
+# SQL中的索引提示位置，如 FROM users u /*hint:users*/，按策略替换为FORCE INDEX或删除
+HINT_PATTERN = re.compile(r'\s*/\*hint:(\w+)\*/')
+
+
+def load_case_spec(path=None):
+    """读取并校验测试用例配置，返回查询、策略和基准策略"""
+    path = path or DEFAULT_CASE_SPEC
+    raw = read_spec_file(path)
+    if not isinstance(raw, dict) or not raw.get('queries') or not raw.get('strategies'):
+        raise ValueError("测试用例配置中必须包含非空的queries和strategies列表")
+
+    strategies = []
+    index_names = {}
+    tables = []
+    for strategy in raw['strategies']:
+        strategy_id = strategy.get('id')
+        if not strategy_id or strategy_id in index_names:
+            raise ValueError(f"策略ID为空或重复: {strategy_id}")
+        indexes = []
+        for index in strategy.get('indexes', []):
+            if not index.get('table') or not index.get('columns'):
+                raise ValueError(f"策略 {strategy_id} 的索引必须指定table和columns")
+            columns = index['columns'] if isinstance(index['columns'], list) else [index['columns']]
+            indexes.append((index['table'], columns, index.get('name') or f"idx_{'_'.join(columns)}"))
+            if index['table'] not in tables:
+                tables.append(index['table'])
+        index_names[strategy_id] = {name for _, _, name in indexes}
+        strategies.append({
+            'id': strategy_id,
+            'label': strategy.get('label', strategy_id),
+            'title': strategy.get('title', f"测试{strategy.get('label', strategy_id)}"),
+            'indexes': indexes
+        })
+
+    queries = []
+    seen = set()
+    for query in raw['queries']:
+        query_id = query.get('id')
+        if not query_id or query_id in seen:
+            raise ValueError(f"查询ID为空或重复: {query_id}")
+        if not query.get('sql'):
+            raise ValueError(f"查询 {query_id} 没有定义sql")
+        seen.add(query_id)
+        params = query.get('params') or []
+        for param in params:
+            if not isinstance(param, dict) or param.get('type') not in PARAM_TYPES:
+                raise ValueError(f"查询 {query_id} 的参数生成器类型不支持: {param}（可选: {', '.join(PARAM_TYPES)}）")
+            if param['type'] == 'sample' and (not param.get('table') or not param.get('column')):
+                raise ValueError(f"查询 {query_id} 的sample参数必须指定table和column")
+            if param['type'] == 'days_ago' and bool(param.get('table')) != bool(param.get('column')):
+                raise ValueError(f"查询 {query_id} 的days_ago参数的table和column必须同时指定")
+        if query['sql'].count('%s') != len(params):
+            raise ValueError(f"查询 {query_id} 的占位符数量与参数数量不一致")
+        aliases = set(HINT_PATTERN.findall(query['sql']))
+        hints = query.get('hints', {})
+        for strategy_id, strategy_hints in hints.items():
+            if strategy_id not in index_names:
+                raise ValueError(f"查询 {query_id} 的提示引用了不存在的策略: {strategy_id}")
+            for alias, index_name in strategy_hints.items():
+                if alias not in aliases:
+                    raise ValueError(f"查询 {query_id} 的SQL中没有提示位置 /*hint:{alias}*/")
+                if index_name not in index_names[strategy_id]:
+                    raise ValueError(f"查询 {query_id} 的提示引用了策略 {strategy_id} 中不存在的索引: {index_name}")
+        queries.append({
+            'id': query_id,
+            'name': query.get('name', query_id),
+            'sql': query['sql'],
+            'params': params,
+            'hints': hints
+        })
+
+    baseline = raw.get('baseline', strategies[0]['id'])
+    if baseline not in index_names:
+        raise ValueError(f"基准策略不存在: {baseline}")
+
+    text = json.dumps(raw, sort_keys=True, ensure_ascii=False)
+    return {
+        'path': path,
+        'label': f"cases{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}",
+        'queries': queries,
+        'strategies': strategies,
+        'baseline': baseline,
+        'tables': tables
+    }
+
+
+def render_query(query, strategy_id):
+    """把SQL中的提示位置替换为该策略的FORCE INDEX，没有提示的位置删除"""
+    hints = query['hints'].get(strategy_id, {})
+
+    def replace(match):
+        index_name = hints.get(match.group(1))
+        return f" FORCE INDEX ({index_name})" if index_name else ""
+
+    return HINT_PATTERN.sub(replace, query['sql'])
+
+
+def _fetch_value(cursor):
+    """读取单个值，兼容字典游标"""
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return list(row.values())[0] if isinstance(row, dict) else row[0]
+
+
+def _fetch_values(cursor):
+    """读取结果的第一列，兼容字典游标"""
+    return [list(row.values())[0] if isinstance(row, dict) else row[0] for row in cursor.fetchall()]
+
+
+def sample_column(cursor, param, size=POOL_SIZE, rng=random):
+    """抽取sample参数的候选取值
+
+    按主键范围随机取起点，用 WHERE id >= 起点 ORDER BY id LIMIT 1 读取（只走主键，不像ORDER BY RAND()那样扫描全表），
+    取值按出现频率分布；distinct为true时读取全部不同取值（用于取值很少的列），之后均匀抽取
+    """
+    table, column, key = param['table'], param['column'], param.get('key', 'id')
+    if param.get('distinct'):
+        cursor.execute(f"SELECT DISTINCT {column} FROM {table}")
+        return _fetch_values(cursor)
+    cursor.execute(f"SELECT MIN({key}) FROM {table}")
+    min_id = _fetch_value(cursor)
+    cursor.execute(f"SELECT MAX({key}) FROM {table}")
+    max_id = _fetch_value(cursor)
+    if max_id is None:
+        return []
+    values = []
+    for _ in range(size):
+        cursor.execute(f"SELECT {column} FROM {table} WHERE {key} >= %s ORDER BY {key} LIMIT 1",
+                       (rng.randint(min_id, max_id),))
+        values.append(_fetch_value(cursor))
+    return values
+
+
+def latest_value(cursor, param):
+    """days_ago参数的基准时间：数据按参考日期往前生成，以列的最大值为基准，日期范围不会随测试日期漂移"""
+    cursor.execute(f"SELECT MAX({param['column']}) FROM {param['table']}")
+    return _fetch_value(cursor)
+
+
+class ParamPool:
+    """查询的参数池：sample参数预先抽样，每次执行抽取一组新参数，测到的是不同键和日期范围上的延迟分布"""
+
+    def __init__(self, cursor, query, size=POOL_SIZE, seed=POOL_SEED):
+        self.query = query
+        self.samples = {}
+        self.anchors = {}
+        now = datetime.now()
+        for i, param in enumerate(query['params']):
+            if param['type'] == 'sample':
+                self.samples[i] = sample_column(cursor, param, size, random.Random(seed + i))
+                if not self.samples[i]:
+                    raise ValueError(f"查询 {query['id']} 的参数 {param['table']}.{param['column']} 没有可用的取值")
+            elif param['type'] == 'days_ago':
+                self.anchors[i] = latest_value(cursor, param) if param.get('table') else now
+                if self.anchors[i] is None:
+                    raise ValueError(f"查询 {query['id']} 的参数 {param['table']}.{param['column']} 没有可用的取值")
+        # 固定种子的参数序列，计时时按顺序轮流取用，各索引策略使用完全相同的参数
+        rng = random.Random(seed)
+        self.sequence = [self.draw(rng) for _ in range(size)]
+
+    def draw(self, rng=random):
+        """抽取一组参数"""
+        values = []
+        for i, param in enumerate(self.query['params']):
+            kind = param['type']
+            if kind == 'constant':
+                values.append(param['value'])
+            elif kind == 'int':
+                values.append(rng.randint(param['min'], param['max']))
+            elif kind == 'days_ago':
+                values.append(self.anchors[i] - timedelta(days=rng.randint(param.get('min', 0), param['max'])))
+            else:
+                values.append(rng.choice(self.samples[i]))
+        return tuple(values)
@@ -6,12 +6,24 @@ MySQL索引测试 - 数据生成器
 生成大量测试数据并导入MySQL数据库
 """
 
+import os
 import time
 import random
 import sys
+import argparse
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime, timedelta
+import numpy as np
 import mysql.connector
 from faker import Faker
+import vectorized_generator
+import schema_spec
+from distributions import DISTRIBUTION_PRESETS, DATE_COLUMNS, build_samplers, load_distributions, distribution_label
+from bulk_loader import bulk_load_rows, insert_rows, check_local_infile
+import snapshot
+from partitioning import PARTITION_SCHEMES, partition_clause
 
 # 初始化Faker
 fake = Faker('zh_CN')
@@ -32,19 +44,108 @@ USERS_COUNT = 500000  # 用户表记录数量 (原来的2倍)
 ORDERS_COUNT = 1000000  # 订单表记录数量 (原来的2倍)
 PRODUCTS_COUNT = 25000  # 产品表记录数量 (原来的2倍)
 BATCH_SIZE = 20000  # 批量插入大小 (增大批量以提高性能)
+RANGE_ROWS = 100000  # 每个并行任务负责的ID区间大小
 
-def create_database():
-    """创建数据库和测试表"""
+# 快速导入模式配置
+PACKET_FILL_RATIO = 0.5  # 单条批量INSERT语句最多占用max_allowed_packet的比例
+ESTIMATED_ROW_BYTES = {'users': 200, 'products': 700, 'orders': 150}  # 各表单行在INSERT语句中的估算字节数
+DEFAULT_SEED = 42  # 默认随机种子
+SCHEMA_VERSION = 3  # 表结构和生成逻辑的版本，修改后递增使旧快照失效
+PARENT_FETCH_SIZE = 50000  # 读取父表数据时每次从服务器获取的行数
+
+# 断点续传：生成过程中在目标库中记录本次生成的配置和已提交的ID区间，全部完成后删除
+RUN_TABLE = '_generation_run'
+CHECKPOINT_TABLE = '_generation_checkpoints'
+
+# 导入方式: insert 使用executemany批量插入, bulk 使用LOAD DATA LOCAL INFILE批量导入
+LOAD_MODES = ('insert', 'bulk')
+# 数据生成引擎: python 逐行生成, numpy 按批向量化生成
+ENGINES = ('python', 'numpy')
+
+# 各表插入的列
+USERS_COLUMNS = ('id', 'username', 'email', 'phone', 'registration_date', 'last_login', 'status', 'credit_score')
+PRODUCTS_COLUMNS = ('id', 'name', 'category', 'price', 'stock', 'description', 'created_at', 'updated_at')
+ORDERS_COLUMNS = ('id', 'user_id', 'product_id', 'order_date', 'quantity', 'total_price', 'status', 'payment_method')
+
+# 数据导入后添加的二级索引（索引名, 列）
+SECONDARY_INDEXES = {
+    'users': [
+        ('idx_users_username', 'username'),
+        ('idx_users_email', 'email'),
+        ('idx_users_status', 'status'),
+        ('idx_users_registration', 'registration_date')
+    ],
+    'products': [
+        ('idx_products_name', 'name'),
+        ('idx_products_category', 'category'),
+        ('idx_products_price', 'price')
+    ],
+    'orders': [
+        ('idx_orders_date', 'order_date'),
+        ('idx_orders_status', 'status'),
+        ('idx_orders_user_product', 'user_id, product_id')
+    ]
+}
+
+# 订单表的外键（约束名, 列, 引用）
+ORDERS_FOREIGN_KEYS = [
+    ('fk_orders_user', 'user_id', 'users(id)'),
+    ('fk_orders_product', 'product_id', 'products(id)')
+]
+
+# 枚举型字段的取值
+COLUMN_CHOICES = {
+    'users.status': ['active', 'inactive', 'suspended'],
+    'products.category': [
+        '电子产品', '服装鞋帽', '家居用品', '食品饮料', '美妆护肤',
+        '母婴用品', '运动户外', '图书音像', '汽车用品', '数码配件'
+    ],
+    'orders.status': ['pending', 'processing', 'shipped', 'delivered', 'cancelled'],
+    'orders.payment_method': ['信用卡', '借记卡', '支付宝', '微信支付', '现金', '银行转账']
+}
+
+def write_batch(conn, cursor, table, columns, rows, load_mode='insert', commit=True):
+    """按指定的导入方式写入一批数据，commit为False时由调用方控制事务"""
+    if load_mode == 'bulk':
+        bulk_load_rows(cursor, table, columns, rows)
+    else:
+        insert_rows(cursor, table, columns, rows)
+    if commit:
+        conn.commit()
+
+def print_throughput(label, count, elapsed_time):
+    """输出导入耗时和速率"""
+    rows_per_sec = count / elapsed_time if elapsed_time > 0 else 0
+    print(f"{label}生成完成！耗时: {elapsed_time:.2f}秒, 速率: {rows_per_sec:,.0f} 行/秒")
+    return rows_per_sec
+
+def create_database(load_mode='insert', fast_load=False, spec=None, partition=None, reference_time=None):
+    """创建数据库和测试表
+
+    fast_load为True时子表先不声明外键，导入完成后再统一添加；
+    spec为声明式表结构时按其中的定义建表；
+    partition为分区方式时订单表按order_date分区（主键改为(id, order_date)，不声明外键）
+    """
+    database = spec['database'] if spec else DB_NAME
     try:
-        # 连接MySQL服务器
-        conn = mysql.connector.connect(**DB_CONFIG)
+        # 连接MySQL服务器（bulk模式需要允许客户端发送本地文件）
+        config = dict(DB_CONFIG, allow_local_infile=True) if load_mode == 'bulk' else DB_CONFIG
+        conn = mysql.connector.connect(**config)
         cursor = conn.cursor()
         
         # 创建数据库
-        print(f"创建数据库: {DB_NAME}")
-        cursor.execute(f"DROP DATABASE IF EXISTS {DB_NAME}")
-        cursor.execute(f"CREATE DATABASE {DB_NAME}")
-        cursor.execute(f"USE {DB_NAME}")
+        print(f"创建数据库: {database}")
+        cursor.execute(f"DROP DATABASE IF EXISTS {database}")
+        cursor.execute(f"CREATE DATABASE {database}")
+        cursor.execute(f"USE {database}")
+        
+        if spec:
+            for table in spec['tables']:
+                print(f"创建{table['name']}表")
+                cursor.execute(schema_spec.create_table_sql(table, foreign_keys=not fast_load))
+            conn.commit()
+            print("数据库和表创建成功！")
+            return conn, cursor
         
         # 创建用户表
         print("创建用户表")
@@ -77,20 +178,31 @@ def create_database():
         """)
         
         # 创建订单表
-        print("创建订单表")
-        cursor.execute("""
+        if partition:
+            # 分区表的主键必须包含分区列，且InnoDB分区表不支持外键
+            print(f"创建订单表（按order_date {partition}分区）")
+            primary_key = ""
+            constraints = ",\n            PRIMARY KEY (id, order_date)"
+            partition_options = "\n        " + partition_clause(
+                partition, reference_time - timedelta(days=DATE_COLUMNS['orders.order_date'][1]), reference_time)
+        else:
+            print("创建订单表")
+            primary_key = " PRIMARY KEY"
+            constraints = "" if fast_load else ",\n" + ",\n".join(
+                f"            CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {reference}"
+                for name, column, reference in ORDERS_FOREIGN_KEYS)
+            partition_options = ""
+        cursor.execute(f"""
         CREATE TABLE orders (
-            id INT AUTO_INCREMENT PRIMARY KEY,
+            id INT AUTO_INCREMENT{primary_key},
             user_id INT NOT NULL,
             product_id INT NOT NULL,
             order_date DATETIME NOT NULL,
             quantity INT NOT NULL,
             total_price DECIMAL(10, 2) NOT NULL,
             status ENUM('pending', 'processing', 'shipped', 'delivered', 'cancelled') NOT NULL,
-            payment_method VARCHAR(50) NOT NULL,
-            FOREIGN KEY (user_id) REFERENCES users(id),
-            FOREIGN KEY (product_id) REFERENCES products(id)
-        ) ENGINE=InnoDB
+            payment_method VARCHAR(50) NOT NULL{constraints}
+        ) ENGINE=InnoDB{partition_options}
         """)
         
         conn.commit()
@@ -101,189 +213,530 @@ def create_database():
         print(f"创建数据库和表时出错: {e}")
         sys.exit(1)
 
-def generate_users(conn, cursor, count):
-    """生成用户数据并插入数据库"""
-    print(f"开始生成 {count} 条用户数据...")
-    start_time = time.time()
-    
-    # 准备批量插入
-    users_data = []
-    sql = """INSERT INTO users 
-             (username, email, phone, registration_date, last_login, status, credit_score)
-             VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-    
-    status_options = ['active', 'inactive', 'suspended']
-    now = datetime.now()
+def _range_seed(seed, table, start_id):
+    """根据全局种子、表名和起始ID计算分区的随机种子"""
+    digest = hashlib.sha256(f"{seed}:{table}:{start_id}".encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def split_id_ranges(count, range_rows=RANGE_ROWS):
+    """把1..count切分为固定大小的ID区间
+
+    区间划分与进程数无关，同样的种子在任意进程数下生成相同的数据
+    """
+    return [(start_id, min(start_id + range_rows - 1, count))
+            for start_id in range(1, count + 1, range_rows)]
+
+def build_users_batches(rng, start_id, end_id, reference_time, context):
+    """生成用户数据，按批返回"""
+    status_options = context['choices']['users.status']
+    batch_size = context['batch_size']
+    # 配置了非均匀分布的列使用对应的抽样器
+    samplers = context['samplers']
+    reg_sampler = samplers.get('users.registration_date')
+    status_sampler = samplers.get('users.status')
+    credit_sampler = samplers.get('users.credit_score')
+    batch = []
     
-    for i in range(1, count + 1):
+    for user_id in range(start_id, end_id + 1):
         # 生成一个随机的注册日期（过去3年内）
-        reg_date = now - timedelta(days=random.randint(1, 1095))
+        reg_days = reg_sampler.draw(rng) if reg_sampler else rng.randint(1, 1095)
+        reg_date = reference_time - timedelta(days=reg_days)
         # 生成一个随机的最后登录日期（注册日期之后）
-        last_login = reg_date + timedelta(days=random.randint(0, (now - reg_date).days))
+        last_login = reg_date + timedelta(days=rng.randint(0, (reference_time - reg_date).days))
         
-        user = (
-            fake.user_name(),
-            fake.email(),
+        batch.append((
+            user_id,
+            # 与向量化引擎一致，用户名和邮箱追加用户ID保证唯一
+            vectorized_generator.id_suffixed(fake.user_name(), user_id),
+            vectorized_generator.id_suffixed(fake.email(), user_id, '@'),
             fake.phone_number(),
             reg_date,
             last_login,
-            random.choice(status_options),
-            random.randint(300, 850)  # 信用分数范围
-        )
-        users_data.append(user)
-        
-        # 批量插入
-        if len(users_data) >= BATCH_SIZE or i == count:
-            cursor.executemany(sql, users_data)
-            conn.commit()
-            users_data = []
-            # 显示进度
-            progress = min(i / count * 100, 100)
-            print(f"用户数据生成进度: {progress:.2f}% ({i}/{count})")
-    
-    elapsed_time = time.time() - start_time
-    print(f"用户数据生成完成！耗时: {elapsed_time:.2f}秒")
+            status_sampler.draw(rng, age=(reference_time - last_login).days) if status_sampler
+            else rng.choice(status_options),
+            credit_sampler.draw(rng) if credit_sampler else rng.randint(300, 850)  # 信用分数范围
+        ))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-def generate_products(conn, cursor, count):
-    """生成产品数据并插入数据库"""
-    print(f"开始生成 {count} 条产品数据...")
-    start_time = time.time()
-    
-    # 准备批量插入
-    products_data = []
-    sql = """INSERT INTO products 
-             (name, category, price, stock, description, created_at, updated_at)
-             VALUES (%s, %s, %s, %s, %s, %s, %s)"""
-    
-    categories = [
-        '电子产品', '服装鞋帽', '家居用品', '食品饮料', '美妆护肤',
-        '母婴用品', '运动户外', '图书音像', '汽车用品', '数码配件'
-    ]
+def build_products_batches(rng, start_id, end_id, reference_time, context):
+    """生成产品数据，按批返回"""
+    categories = context['choices']['products.category']
+    batch_size = context['batch_size']
+    samplers = context['samplers']
+    created_sampler = samplers.get('products.created_at')
+    category_sampler = samplers.get('products.category')
+    price_sampler = samplers.get('products.price')
+    stock_sampler = samplers.get('products.stock')
+    batch = []
     
-    now = datetime.now()
-    
-    for i in range(1, count + 1):
+    for product_id in range(start_id, end_id + 1):
         # 生成一个随机的创建日期（过去2年内）
-        created_at = now - timedelta(days=random.randint(1, 730))
+        created_days = created_sampler.draw(rng) if created_sampler else rng.randint(1, 730)
+        created_at = reference_time - timedelta(days=created_days)
         # 生成一个随机的更新日期（创建日期之后）
-        updated_at = created_at + timedelta(days=random.randint(0, (now - created_at).days))
+        updated_at = created_at + timedelta(days=rng.randint(0, (reference_time - created_at).days))
         
-        product = (
+        batch.append((
+            product_id,
             fake.word() + ' ' + fake.word(),  # 产品名称
-            random.choice(categories),  # 类别
-            round(random.uniform(10, 9999.99), 2),  # 价格
-            random.randint(0, 10000),  # 库存
+            category_sampler.draw(rng) if category_sampler else rng.choice(categories),  # 类别
+            price_sampler.draw(rng) if price_sampler else round(rng.uniform(10, 9999.99), 2),  # 价格
+            stock_sampler.draw(rng) if stock_sampler else rng.randint(0, 10000),  # 库存
             fake.paragraph(),  # 描述
             created_at,
             updated_at
-        )
-        products_data.append(product)
-        
-        # 批量插入
-        if len(products_data) >= BATCH_SIZE or i == count:
-            cursor.executemany(sql, products_data)
-            conn.commit()
-            products_data = []
-            # 显示进度
-            progress = min(i / count * 100, 100)
-            print(f"产品数据生成进度: {progress:.2f}% ({i}/{count})")
-    
-    elapsed_time = time.time() - start_time
-    print(f"产品数据生成完成！耗时: {elapsed_time:.2f}秒")
+        ))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-def generate_orders(conn, cursor, count):
-    """生成订单数据并插入数据库"""
-    print(f"开始生成 {count} 条订单数据...")
-    start_time = time.time()
-    
-    # 获取用户ID范围
-    cursor.execute("SELECT MIN(id), MAX(id) FROM users")
-    user_min_id, user_max_id = cursor.fetchone()
-    
-    # 获取产品ID范围和价格
-    cursor.execute("SELECT id, price FROM products")
-    products = {row[0]: row[1] for row in cursor.fetchall()}
-    product_ids = list(products.keys())
+def _id_dtype(max_id):
+    """能容纳最大ID的最小整数类型"""
+    return np.int32 if (max_id or 0) < 2 ** 31 else np.int64
+
+def fetch_arrays(conn, table, expressions, dtypes):
+    """用非缓冲游标分批读取一张表的若干列，直接填入预先分配的NumPy数组（按ID排序）"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT COUNT(*) FROM {table}")
+    count = cursor.fetchone()[0]
+    cursor.close()
     
-    # 准备批量插入
-    orders_data = []
-    sql = """INSERT INTO orders 
-             (user_id, product_id, order_date, quantity, total_price, status, payment_method)
-             VALUES (%s, %s, %s, %s, %s, %s, %s)"""
+    arrays = [np.empty(count, dtype=dtype) for dtype in dtypes]
+    cursor = conn.cursor(buffered=False)
+    cursor.execute(f"SELECT {', '.join(expressions)} FROM {table} ORDER BY id")
+    filled = 0
+    while True:
+        rows = cursor.fetchmany(PARENT_FETCH_SIZE)
+        if not rows:
+            break
+        end = min(filled + len(rows), count)
+        for array, values in zip(arrays, zip(*rows)):
+            array[filled:end] = values[:end - filled]
+        filled = end
+    cursor.close()
+    return [array[:filled] for array in arrays]
+
+def load_order_parents(conn):
+    """读取生成订单所需的用户ID、产品ID和产品价格（以分为单位），保存为紧凑的NumPy数组"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT (SELECT MAX(id) FROM users), (SELECT MAX(id) FROM products)")
+    user_max_id, product_max_id = cursor.fetchone()
+    cursor.close()
     
-    status_options = ['pending', 'processing', 'shipped', 'delivered', 'cancelled']
-    payment_methods = ['信用卡', '借记卡', '支付宝', '微信支付', '现金', '银行转账']
-    now = datetime.now()
+    user_ids, = fetch_arrays(conn, 'users', ['id'], [_id_dtype(user_max_id)])
+    product_ids, price_cents = fetch_arrays(conn, 'products', ['id', 'CAST(ROUND(price * 100) AS SIGNED)'],
+                                            [_id_dtype(product_max_id), np.int64])
+    memory_mb = (user_ids.nbytes + product_ids.nbytes + price_cents.nbytes) / 1024 / 1024
+    print(f"父表数据已读取: {len(user_ids):,} 个用户ID, {len(product_ids):,} 个产品, 占用内存 {memory_mb:.1f} MB")
+    return {
+        'user_ids': user_ids,
+        'product_ids': product_ids,
+        'price_cents': price_cents
+    }
+
+def build_orders_batches(rng, start_id, end_id, reference_time, context):
+    """生成订单数据，按批返回"""
+    user_ids = context['user_ids']
+    product_ids = context['product_ids']
+    price_cents = context['price_cents']
+    status_options = context['choices']['orders.status']
+    payment_methods = context['choices']['orders.payment_method']
+    batch_size = context['batch_size']
+    samplers = context['samplers']
+    user_sampler = samplers.get('orders.user_id')
+    product_sampler = samplers.get('orders.product_id')
+    quantity_sampler = samplers.get('orders.quantity')
+    date_sampler = samplers.get('orders.order_date')
+    status_sampler = samplers.get('orders.status')
+    payment_sampler = samplers.get('orders.payment_method')
+    batch = []
     
-    for i in range(1, count + 1):
-        # 随机用户ID
-        user_id = random.randint(user_min_id, user_max_id)
+    for order_id in range(start_id, end_id + 1):
+        # 从实际存在的用户ID中随机选择
+        user_index = user_sampler.draw(rng) if user_sampler else rng.randrange(len(user_ids))
+        user_id = int(user_ids[user_index])
         # 随机产品ID
-        product_id = random.choice(product_ids)
-        # 获取产品价格 (从缓存中获取)
-        price = products[product_id]
+        product_index = product_sampler.draw(rng) if product_sampler else rng.randrange(len(product_ids))
+        product_id = int(product_ids[product_index])
         
         # 随机数量
-        quantity = random.randint(1, 10)
-        # 计算总价
-        total_price = round(price * quantity, 2)
+        quantity = quantity_sampler.draw(rng) if quantity_sampler else rng.randint(1, 10)
+        # 计算总价（按分计算，避免浮点误差）
+        total_price = int(price_cents[product_index]) * quantity / 100
         
         # 随机订单日期（过去1年内）
-        order_date = now - timedelta(days=random.randint(0, 365))
+        order_days = date_sampler.draw(rng) if date_sampler else rng.randint(0, 365)
+        order_date = reference_time - timedelta(days=order_days)
         
-        order = (
+        batch.append((
+            order_id,
             user_id,
             product_id,
             order_date,
             quantity,
             total_price,
-            random.choice(status_options),
-            random.choice(payment_methods)
-        )
-        orders_data.append(order)
-        
-        # 批量插入
-        if len(orders_data) >= BATCH_SIZE or i == count:
-            cursor.executemany(sql, orders_data)
-            conn.commit()
-            orders_data = []
-            # 显示进度
-            progress = min(i / count * 100, 100)
-            print(f"订单数据生成进度: {progress:.2f}% ({i}/{count})")
+            status_sampler.draw(rng, age=order_days) if status_sampler else rng.choice(status_options),
+            payment_sampler.draw(rng) if payment_sampler else rng.choice(payment_methods)
+        ))
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# 各表的列和按批生成数据的函数
+TABLE_GENERATORS = {
+    'users': (USERS_COLUMNS, build_users_batches),
+    'products': (PRODUCTS_COLUMNS, build_products_batches),
+    'orders': (ORDERS_COLUMNS, build_orders_batches)
+}
+
+def builtin_tables(partition=None):
+    """返回内置的用户/产品/订单表定义，按生成顺序排列（订单依赖产品价格和用户ID，必须最后生成）
+
+    订单表分区时不添加外键
+    """
+    counts = {'products': PRODUCTS_COUNT, 'users': USERS_COUNT, 'orders': ORDERS_COUNT}
+    labels = {'products': "产品数据", 'users': "用户数据", 'orders': "订单数据"}
+    return [{
+        'name': table,
+        'rows': counts[table],
+        'label': labels[table],
+        'columns': TABLE_GENERATORS[table][0],
+        'indexes': SECONDARY_INDEXES[table],
+        'foreign_keys': ORDERS_FOREIGN_KEYS if table == 'orders' and not partition else [],
+        'row_bytes': ESTIMATED_ROW_BYTES[table]
+    } for table in ('products', 'users', 'orders')]
+
+# 工作进程内的状态（每个进程独立的连接和父表缓存）
+_worker_state = {}
+
+def _init_worker(options):
+    """工作进程初始化：建立自己的数据库连接"""
+    config = dict(DB_CONFIG, database=options['database'])
+    if options['load_mode'] == 'bulk':
+        config['allow_local_infile'] = True
+    conn = mysql.connector.connect(**config)
+    cursor = conn.cursor()
+    max_allowed_packet = None
+    if options['fast_load']:
+        # 快速导入：本会话跳过外键和唯一性检查
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        cursor.execute("SELECT @@max_allowed_packet")
+        max_allowed_packet = cursor.fetchone()[0]
+    _worker_state.clear()
+    _worker_state.update({'conn': conn, 'cursor': cursor, 'options': options, 'contexts': {},
+                          'max_allowed_packet': max_allowed_packet})
+
+def _close_worker():
+    """关闭工作进程的数据库连接"""
+    conn = _worker_state.get('conn')
+    if conn and conn.is_connected():
+        _worker_state['cursor'].close()
+        conn.close()
+    _worker_state.clear()
+
+def _batch_size(row_bytes):
+    """返回每条批量语句包含的行数
+
+    快速导入模式下按max_allowed_packet放大批量，让每条语句尽量大但不超过包大小限制
+    """
+    max_allowed_packet = _worker_state.get('max_allowed_packet')
+    if not max_allowed_packet:
+        return BATCH_SIZE
+    rows = int(max_allowed_packet * PACKET_FILL_RATIO / row_bytes)
+    return max(BATCH_SIZE, min(rows, RANGE_ROWS))
+
+def _table_context(table):
+    """返回生成某张表时需要的枚举取值和父表数据（每个进程只读取一次）"""
+    contexts = _worker_state['contexts']
+    if table not in contexts:
+        options = _worker_state['options']
+        spec = options['spec']
+        if spec:
+            # 声明式表的外键只需要父表行数，不读取父表数据
+            spec_table = next(t for t in spec['tables'] if t['name'] == table)
+            context = {
+                'spec_table': spec_table,
+                'table_rows': {t['name']: t['rows'] for t in spec['tables']},
+                'locale': spec['locale'],
+                'seed': options['seed'],
+                'batch_size': _batch_size(spec_table['row_bytes'])
+            }
+        else:
+            context = load_order_parents(_worker_state['conn']) if table == 'orders' else {}
+            context['choices'] = COLUMN_CHOICES
+            context['seed'] = options['seed']
+            context['batch_size'] = _batch_size(ESTIMATED_ROW_BYTES[table])
+            context['samplers'] = build_samplers(table, options['distributions'], COLUMN_CHOICES, context,
+                                                 options['reference_time'])
+        contexts[table] = context
+    return contexts[table]
+
+def generate_id_range(table, start_id, end_id):
+    """在工作进程中生成并写入一个ID区间的数据，返回写入的行数"""
+    conn = _worker_state['conn']
+    cursor = _worker_state['cursor']
+    options = _worker_state['options']
+    context = _table_context(table)
+    
+    # 每个区间使用独立的种子，结果只取决于全局种子和区间位置
+    range_seed = _range_seed(options['seed'], table, start_id)
+    if options['spec']:
+        # 声明式表总是按批向量化生成
+        columns = context['spec_table']['columns']
+        build_batches = schema_spec.build_spec_batches
+        rng = np.random.default_rng(range_seed)
+    elif options['engine'] == 'numpy':
+        columns = TABLE_GENERATORS[table][0]
+        build_batches = vectorized_generator.BATCH_BUILDERS[table]
+        rng = np.random.default_rng(range_seed)
+    else:
+        columns, build_batches = TABLE_GENERATORS[table]
+        rng = random.Random(range_seed)
+        fake.seed_instance(range_seed)
+    
+    if options['resume']:
+        # 删除上次中断时该区间已提交的部分数据，从区间起点按相同的种子重新生成
+        cursor.execute(f"DELETE FROM {table} WHERE id BETWEEN %s AND %s", (start_id, end_id))
+    
+    # 快速导入模式下整个区间作为一个事务提交
+    commit_each_batch = not options['fast_load']
+    written = 0
+    for batch in build_batches(rng, start_id, end_id, options['reference_time'], context):
+        write_batch(conn, cursor, table, columns, batch, options['load_mode'], commit_each_batch)
+        written += len(batch)
+    # 记录区间断点，区间的随机数状态完全由该种子决定
+    cursor.execute(f"INSERT INTO {CHECKPOINT_TABLE} (table_name, start_id, end_id, rows_written, range_seed, completed_at) "
+                   f"VALUES (%s, %s, %s, %s, %s, NOW())", (table, start_id, end_id, written, range_seed))
+    conn.commit()
+    return written
+
+def generate_table(table, count, label, options, completed=None):
+    """把一张表按ID区间分给进程池并行生成
+
+    completed为断点中已完成的{区间起始ID: 行数}，这些区间会被跳过
+    """
+    print(f"开始生成 {count} 条{label}...")
+    start_time = time.time()
+    completed = completed or {}
+    ranges = [(start_id, end_id) for start_id, end_id in split_id_ranges(count) if start_id not in completed]
+    skipped = sum(completed.values())
+    if completed:
+        print(f"跳过已完成的 {len(completed)} 个区间（{skipped:,} 行）")
+    workers = min(options['workers'], len(ranges)) if ranges else 1
+    if options['engine'] == 'numpy' and not options['spec']:
+        # 在主进程中预先生成取值池，工作进程fork后直接复用
+        vectorized_generator.get_pools(options['seed'])
+    done = skipped
+    
+    if workers <= 1:
+        # 单进程时直接在当前进程中生成
+        _init_worker(options)
+        try:
+            for start_id, end_id in ranges:
+                done += generate_id_range(table, start_id, end_id)
+                print(f"{label}生成进度: {done / count * 100:.2f}% ({done}/{count})")
+        finally:
+            _close_worker()
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(options,)) as executor:
+            futures = [executor.submit(generate_id_range, table, start_id, end_id)
+                       for start_id, end_id in ranges]
+            for future in as_completed(futures):
+                done += future.result()
+                print(f"{label}生成进度: {done / count * 100:.2f}% ({done}/{count})")
     
     elapsed_time = time.time() - start_time
-    print(f"订单数据生成完成！耗时: {elapsed_time:.2f}秒")
+    return print_throughput(label, count - skipped, elapsed_time)
 
-def add_indexes(conn, cursor):
-    """为表添加索引以提高查询性能"""
-    print("\n添加索引...")
+def add_indexes(conn, cursor, tables, secondary_indexes=True, foreign_keys=False):
+    """导入完成后添加二级索引和外键，每张表只执行一条ALTER TABLE
+
+    返回各表ALTER TABLE的耗时
+    """
+    print("\n添加索引" + ("和外键" if foreign_keys else "") + "...")
     start_time = time.time()
+    table_times = {}
     
     try:
-        # 为用户表添加索引
-        print("为用户表添加索引...")
-        cursor.execute("CREATE INDEX idx_users_username ON users(username)")
-        cursor.execute("CREATE INDEX idx_users_email ON users(email)")
-        cursor.execute("CREATE INDEX idx_users_status ON users(status)")
-        cursor.execute("CREATE INDEX idx_users_registration ON users(registration_date)")
-        
-        # 为产品表添加索引
-        print("为产品表添加索引...")
-        cursor.execute("CREATE INDEX idx_products_name ON products(name)")
-        cursor.execute("CREATE INDEX idx_products_category ON products(category)")
-        cursor.execute("CREATE INDEX idx_products_price ON products(price)")
-        
-        # 为订单表添加索引
-        print("为订单表添加索引...")
-        cursor.execute("CREATE INDEX idx_orders_date ON orders(order_date)")
-        cursor.execute("CREATE INDEX idx_orders_status ON orders(status)")
-        cursor.execute("CREATE INDEX idx_orders_user_product ON orders(user_id, product_id)")
+        # 跳过已经存在的索引和约束（断点续传时上次可能已为部分表添加过）
+        existing = existing_index_names(cursor)
+        if foreign_keys:
+            # 数据由生成器保证引用完整，跳过校验以便InnoDB使用INPLACE算法添加外键
+            cursor.execute("SET SESSION foreign_key_checks = 0")
+            
+        for table_info in tables:
+            table = table_info['name']
+            clauses = []
+            if secondary_indexes:
+                clauses.extend(f"ADD INDEX {name} ({columns})" for name, columns in table_info['indexes']
+                               if (table, name) not in existing)
+            if foreign_keys:
+                clauses.extend(f"ADD CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {reference}"
+                               for name, column, reference in table_info['foreign_keys']
+                               if (table, name) not in existing)
+            if not clauses:
+                continue
+                
+            print(f"为{table}表添加{len(clauses)}个索引/约束...")
+            table_start_time = time.time()
+            cursor.execute(f"ALTER TABLE {table} " + ", ".join(clauses))
+            table_times[table] = time.time() - table_start_time
+            print(f"{table}表完成，耗时: {table_times[table]:.2f}秒")
         
         conn.commit()
         elapsed_time = time.time() - start_time
         print(f"索引添加完成！耗时: {elapsed_time:.2f}秒")
     except Exception as e:
         print(f"添加索引时出错: {e}")
+        return None
+    finally:
+        if foreign_keys:
+            # 出错时也要恢复外键检查，否则之后在同一连接上的写入不再校验引用完整性
+            try:
+                cursor.execute("SET SESSION foreign_key_checks = 1")
+            except Exception as e:
+                print(f"恢复外键检查时出错: {e}")
+    return table_times
+
+def existing_index_names(cursor):
+    """返回当前库中已存在的(表名, 索引名/约束名)"""
+    cursor.execute("""
+        SELECT TABLE_NAME, INDEX_NAME FROM information_schema.STATISTICS WHERE TABLE_SCHEMA = DATABASE()
+        UNION
+        SELECT TABLE_NAME, CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS WHERE TABLE_SCHEMA = DATABASE()
+    """)
+    return {(table, name) for table, name in cursor.fetchall()}
+
+def create_checkpoint_tables(conn, cursor, run_config):
+    """在目标库中创建断点表，并记录本次生成的配置"""
+    cursor.execute(f"""
+    CREATE TABLE {RUN_TABLE} (
+        id TINYINT PRIMARY KEY,
+        config TEXT NOT NULL,
+        started_at DATETIME NOT NULL
+    ) ENGINE=InnoDB
+    """)
+    cursor.execute(f"""
+    CREATE TABLE {CHECKPOINT_TABLE} (
+        table_name VARCHAR(64) NOT NULL,
+        start_id BIGINT NOT NULL,
+        end_id BIGINT NOT NULL,
+        rows_written INT NOT NULL,
+        range_seed BIGINT UNSIGNED NOT NULL,
+        completed_at DATETIME NOT NULL,
+        PRIMARY KEY (table_name, start_id)
+    ) ENGINE=InnoDB
+    """)
+    cursor.execute(f"INSERT INTO {RUN_TABLE} (id, config, started_at) VALUES (1, %s, NOW())", (run_config,))
+    conn.commit()
+
+def resume_database(load_mode, database, run_config):
+    """连接上次中断的生成
+
+    目标库中有未完成的生成且配置一致时返回(conn, cursor, {表名: {区间起始ID: 行数}})，否则返回None
+    """
+    config = dict(DB_CONFIG, database=database)
+    if load_mode == 'bulk':
+        config['allow_local_infile'] = True
+    try:
+        conn = mysql.connector.connect(**config)
+    except Exception:
+        return None
+    cursor = conn.cursor()
+    
+    try:
+        cursor.execute(f"SELECT config, started_at FROM {RUN_TABLE} WHERE id = 1")
+        row = cursor.fetchone()
+        if row and row[0] == run_config:
+            cursor.execute(f"SELECT table_name, start_id, rows_written FROM {CHECKPOINT_TABLE}")
+            completed = {}
+            for table, start_id, rows in cursor.fetchall():
+                completed.setdefault(table, {})[start_id] = rows
+            ranges = sum(len(table_ranges) for table_ranges in completed.values())
+            # 结束读取断点时开启的事务，否则之后的校验会在旧快照中看不到工作进程提交的行
+            conn.commit()
+            print(f"发现 {row[1]} 开始的未完成生成，从断点继续（已完成 {ranges} 个区间）")
+            return conn, cursor, completed
+        if row:
+            print("上次未完成的生成使用了不同的配置，重新生成")
+    except Exception:
+        # 断点表不存在：没有未完成的生成
+        pass
+    cursor.close()
+    conn.close()
+    return None
+
+def verify_tables(cursor, tables):
+    """添加索引前校验各表的行数和ID连续性"""
+    print("\n校验生成的数据...")
+    valid = True
+    for table in tables:
+        cursor.execute(f"SELECT COUNT(*), MIN(id), MAX(id) FROM {table['name']}")
+        count, min_id, max_id = cursor.fetchone()
+        if count != table['rows']:
+            print(f"{table['name']}: 行数为 {count:,}，应为 {table['rows']:,}")
+            valid = False
+        elif min_id != 1 or max_id != count:
+            print(f"{table['name']}: ID不连续（{min_id}..{max_id}，共 {count:,} 行）")
+            valid = False
+        else:
+            print(f"{table['name']}: {count:,} 行，ID 1..{max_id} 连续")
+    return valid
+
+def drop_checkpoint_tables(conn, cursor):
+    """生成完成后删除断点表"""
+    cursor.execute(f"DROP TABLE IF EXISTS {CHECKPOINT_TABLE}, {RUN_TABLE}")
+    conn.commit()
+
+def restore_from_snapshot(manifest, tables, spec, create_indexes, workers, total_start_time,
+                          partition=None, reference_time=None):
+    """从快照恢复数据集，代替重新生成数据（分区方式不影响数据，同一快照可恢复为分区或非分区表）"""
+    conn, cursor = create_database('bulk', fast_load=True, spec=spec, partition=partition,
+                                   reference_time=reference_time)
+    database = spec['database'] if spec else DB_NAME
+    try:
+        use_load_data = check_local_infile(cursor)
+        if not use_load_data:
+            print("服务器未开启local_infile，使用批量INSERT恢复快照")
+        
+        phase_time = time.time()
+        restored = snapshot.restore_snapshot(manifest, dict(DB_CONFIG, database=database), workers, use_load_data)
+        restore_time = time.time() - phase_time
+        
+        phase_time = time.time()
+        index_table_times = add_indexes(conn, cursor, tables, secondary_indexes=create_indexes, foreign_keys=True)
+        indexes_time = time.time() - phase_time
+        if index_table_times is None:
+            sys.exit(1)
+        
+        total_rows = sum(restored.values())
+        total_elapsed_time = time.time() - total_start_time
+        print("\n========== 数据集恢复完成 ==========")
+        print(f"快照: {manifest['key']}")
+        print(f"恢复数据: {total_rows:,}条 - 耗时: {restore_time:.2f}秒 - {total_rows / max(restore_time, 1e-9):,.0f} 行/秒")
+        print(f"{'创建索引和外键' if create_indexes else '创建外键'} - 耗时: {indexes_time:.2f}秒")
+        for table, table_time in index_table_times.items():
+            print(f"  - {table}: {table_time:.2f}秒")
+        print(f"总耗时: {total_elapsed_time:.2f}秒")
+    except Exception as e:
+        print(f"恢复快照时出错: {e}")
+        sys.exit(1)
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+            print("数据库连接已关闭")
+
 
 def main():
     """主函数"""
@@ -293,73 +746,220 @@ def main():
     
     # 根据命令行参数调整数据量
     global USERS_COUNT, ORDERS_COUNT, PRODUCTS_COUNT
+    parser = argparse.ArgumentParser(description="生成测试数据")
+    parser.add_argument("options", nargs="*",
+                        help="数据量缩放因子（数字）和/或noindex（不创建索引）")
+    parser.add_argument("--load-mode", choices=LOAD_MODES, default="insert",
+                        help="导入方式: insert为批量INSERT, bulk为LOAD DATA LOCAL INFILE（默认为insert）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="并行生成数据的进程数（默认为CPU核数）")
+    parser.add_argument("--engine", choices=ENGINES, default="python",
+                        help="数据生成引擎: python为逐行生成, numpy为按批向量化生成（默认为python）")
+    parser.add_argument("--fast-load", action="store_true",
+                        help="快速导入: 会话内关闭外键和唯一性检查，按max_allowed_packet放大事务，导入后再添加外键和索引")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help=f"随机种子（默认为{DEFAULT_SEED}）")
+    parser.add_argument("--reference-date", help="生成日期的参考日期YYYY-MM-DD（默认为今天），固定后结果可复现")
+    parser.add_argument("--distribution", choices=sorted(DISTRIBUTION_PRESETS), default="uniform",
+                        help="数据分布预设: uniform为均匀分布, skewed为热点倾斜、季节性和相关列（默认为uniform）")
+    parser.add_argument("--distribution-file", help="JSON格式的列分布配置，覆盖预设中对应列的分布")
+    parser.add_argument("--spec", help="JSON/YAML格式的声明式表结构（表、列生成器、外键和行数），代替内置的用户/产品/订单表")
+    parser.add_argument("--partition", choices=PARTITION_SCHEMES,
+                        help="订单表按order_date分区: range为按月分区, list为按季度分区, hash为按日期哈希分区（默认不分区）")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="生成完成后保存数据集快照，之后生成相同数据集时直接从快照恢复")
+    parser.add_argument("--regenerate", action="store_true", help="忽略已有快照和未完成生成的断点，重新生成数据")
+    args = parser.parse_args()
+    
     create_indexes = True
+    scale_factor = 1.0
+    load_mode = args.load_mode
+    if args.reference_date:
+        reference_time = datetime.strptime(args.reference_date, "%Y-%m-%d")
+    else:
+        reference_time = datetime.combine(datetime.now().date(), datetime.min.time())
     
-    if len(sys.argv) > 1:
+    for option in args.options:
+        if option.lower() == "noindex":
+            create_indexes = False
+            print("将不创建索引")
+            continue
         try:
-            if sys.argv[1].lower() == "noindex":
-                create_indexes = False
-                print("将不创建索引")
-            else:
-                scale_factor = float(sys.argv[1])
-                USERS_COUNT = int(USERS_COUNT * scale_factor)
-                ORDERS_COUNT = int(ORDERS_COUNT * scale_factor)
-                PRODUCTS_COUNT = int(PRODUCTS_COUNT * scale_factor)
-                print(f"数据量调整为原来的 {scale_factor} 倍")
-                
-                if len(sys.argv) > 2 and sys.argv[2].lower() == "noindex":
-                    create_indexes = False
-                    print("将不创建索引")
+            scale_factor = float(option)
         except ValueError:
             print("参数必须是数字，表示数据量的缩放因子，或者是'noindex'表示不创建索引")
             sys.exit(1)
+        USERS_COUNT = int(USERS_COUNT * scale_factor)
+        ORDERS_COUNT = int(ORDERS_COUNT * scale_factor)
+        PRODUCTS_COUNT = int(PRODUCTS_COUNT * scale_factor)
+        print(f"数据量调整为原来的 {scale_factor} 倍")
+    
+    spec = None
+    distributions = {}
+    if args.spec and args.partition:
+        print("--partition只适用于内置的订单表，不能与--spec同时使用")
+        sys.exit(1)
+    if args.spec:
+        # 读取声明式表结构，行数同样按缩放因子调整
+        try:
+            spec = schema_spec.load_spec(args.spec, scale_factor, DB_NAME)
+        except Exception as e:
+            print(f"读取表结构配置时出错: {e}")
+            sys.exit(1)
+        tables = spec['tables']
+        distribution = spec['label']
+        print(f"表结构配置: {args.spec}（数据库: {spec['database']}）")
+    else:
+        # 读取列分布配置
+        try:
+            distributions = load_distributions(args.distribution, args.distribution_file)
+        except Exception as e:
+            print(f"读取分布配置时出错: {e}")
+            sys.exit(1)
+        tables = builtin_tables(args.partition)
+        distribution = distribution_label(args.distribution, distributions)
+        print(f"数据分布: {distribution}")
+        if args.partition:
+            print(f"订单表分区方式: {args.partition}")
+    database = spec['database'] if spec else DB_NAME
+    total_rows = sum(table['rows'] for table in tables)
     
     print(f"\n将生成以下数据:")
-    print(f"- 用户: {USERS_COUNT:,} 条记录")
-    print(f"- 产品: {PRODUCTS_COUNT:,} 条记录")
-    print(f"- 订单: {ORDERS_COUNT:,} 条记录")
-    print(f"- 总计: {USERS_COUNT + PRODUCTS_COUNT + ORDERS_COUNT:,} 条记录")
+    for table in tables:
+        print(f"- {table['label']}: {table['rows']:,} 条记录")
+    print(f"- 总计: {total_rows:,} 条记录")
+    
+    # 查找相同数据集的快照（参考日期和声明式表结构的内容会影响生成的数据，因此必须一致；
+    # 表结构的标签是配置内容的哈希，同时写入快照键和快照元数据）
+    snapshot_key = snapshot.snapshot_key(scale_factor, args.seed, SCHEMA_VERSION,
+                                         'spec' if spec else args.engine, distribution)
+    manifest = None
+    if not args.regenerate:
+        manifest = snapshot.find_snapshot(snapshot_key)
+        if manifest and manifest['metadata'].get('reference_date') != reference_time.strftime("%Y-%m-%d"):
+            print(f"快照 {snapshot_key} 的参考日期为 {manifest['metadata'].get('reference_date')}，与本次不一致，重新生成")
+            manifest = None
+        if manifest and spec and manifest['metadata'].get('spec_label') != spec['label']:
+            print(f"快照 {snapshot_key} 的表结构配置（{manifest['metadata'].get('spec')}）与本次不一致，重新生成")
+            manifest = None
+    if manifest:
+        # 恢复快照时先导入数据再统一添加外键和索引
+        return restore_from_snapshot(manifest, tables, spec, create_indexes, max(args.workers, 1), total_start_time,
+                                     args.partition, reference_time)
+    
+    # 影响生成结果的配置，断点续传时必须一致
+    run_config = json.dumps({
+        'scale_factor': scale_factor,
+        'seed': args.seed,
+        'engine': 'spec' if spec else args.engine,
+        'distribution': distribution,
+        'fast_load': args.fast_load,
+        'partition': args.partition,
+        'reference_date': reference_time.strftime("%Y-%m-%d"),
+        'schema_version': SCHEMA_VERSION,
+        'tables': {table['name']: table['rows'] for table in tables}
+    }, sort_keys=True)
+    
+    # 有未完成的相同生成时从断点继续，否则创建数据库和表
+    phase_time = time.time()
+    resumed = None if args.regenerate else resume_database(load_mode, database, run_config)
+    if resumed:
+        conn, cursor, completed = resumed
+    else:
+        completed = {}
+        conn, cursor = create_database(load_mode, args.fast_load, spec, args.partition, reference_time)
+        create_checkpoint_tables(conn, cursor, run_config)
+    schema_time = time.time() - phase_time
     
-    # 创建数据库和表
-    conn, cursor = create_database()
+    if load_mode == 'bulk' and not check_local_infile(cursor):
+        print("服务器未开启local_infile，改用批量INSERT导入（可执行 SET GLOBAL local_infile = 1 开启）")
+        load_mode = 'insert'
+    print(f"导入方式: {load_mode}, 生成引擎: {'numpy' if spec else args.engine}, 进程数: {args.workers}, "
+          f"随机种子: {args.seed}")
     
-    # 生成数据
+    # 传给工作进程的生成选项
+    options = {
+        'load_mode': load_mode,
+        'workers': max(args.workers, 1),
+        'seed': args.seed,
+        'engine': args.engine,
+        'fast_load': args.fast_load,
+        'reference_time': reference_time,
+        'distributions': distributions,
+        'spec': spec,
+        'database': database,
+        'resume': resumed is not None
+    }
+    
+    # 按顺序生成各表数据（父表先于子表）
     try:
-        phase_time = time.time()
-        # 生成产品数据
-        generate_products(conn, cursor, PRODUCTS_COUNT)
-        products_time = time.time() - phase_time
-        
-        phase_time = time.time()
-        # 生成用户数据
-        generate_users(conn, cursor, USERS_COUNT)
-        users_time = time.time() - phase_time
+        table_stats = []
+        for table in tables:
+            phase_time = time.time()
+            rate = generate_table(table['name'], table['rows'], table['label'], options,
+                                  completed.get(table['name']))
+            table_stats.append((table, time.time() - phase_time, rate))
         
-        phase_time = time.time()
-        # 生成订单数据
-        generate_orders(conn, cursor, ORDERS_COUNT)
-        orders_time = time.time() - phase_time
+        # 添加索引前校验行数和ID连续性（先结束当前事务，读取工作进程提交后的最新数据）
+        conn.commit()
+        if not verify_tables(cursor, tables):
+            print("数据校验失败，未添加索引（可使用--regenerate重新生成）")
+            sys.exit(1)
         
-        # 添加索引
+        # 添加索引（快速导入模式下同时补上外键）
         indexes_time = 0
-        if create_indexes:
+        index_table_times = {}
+        if create_indexes or args.fast_load:
             phase_time = time.time()
-            add_indexes(conn, cursor)
+            index_table_times = add_indexes(conn, cursor, tables, secondary_indexes=create_indexes,
+                                            foreign_keys=args.fast_load)
             indexes_time = time.time() - phase_time
+            if index_table_times is None:
+                print("添加索引失败，重新运行相同的命令可继续添加剩余的索引")
+                sys.exit(1)
+        drop_checkpoint_tables(conn, cursor)
+        
+        # 保存快照
+        snapshot_time = 0
+        if args.snapshot:
+            phase_time = time.time()
+            snapshot.create_snapshot(snapshot_key, dict(DB_CONFIG, database=database),
+                                     {table['name']: table['columns'] for table in tables},
+                                     metadata={
+                                         'scale_factor': scale_factor,
+                                         'seed': args.seed,
+                                         'engine': args.engine,
+                                         'distributions': distributions,
+                                         'spec': args.spec,
+                                         'spec_label': spec['label'] if spec else None,
+                                         'schema_version': SCHEMA_VERSION,
+                                         'reference_date': reference_time.strftime("%Y-%m-%d")
+                                     },
+                                     workers=options['workers'])
+            snapshot_time = time.time() - phase_time
         
         # 完成
         total_elapsed_time = time.time() - total_start_time
         print("\n========== 数据生成完成 ==========")
-        print(f"产品数据: {PRODUCTS_COUNT:,}条 - 耗时: {products_time:.2f}秒")
-        print(f"用户数据: {USERS_COUNT:,}条 - 耗时: {users_time:.2f}秒")
-        print(f"订单数据: {ORDERS_COUNT:,}条 - 耗时: {orders_time:.2f}秒")
-        if create_indexes:
-            print(f"创建索引 - 耗时: {indexes_time:.2f}秒")
-        print(f"总记录数: {USERS_COUNT + PRODUCTS_COUNT + ORDERS_COUNT:,}条")
+        print(f"导入方式: {load_mode}, 进程数: {options['workers']}"
+              f"{', 快速导入' if args.fast_load else ''}"
+              f"{f', 订单表{args.partition}分区' if args.partition else ''}")
+        print(f"创建表结构 - 耗时: {schema_time:.2f}秒")
+        for table, table_time, rate in table_stats:
+            print(f"{table['label']}: {table['rows']:,}条 - 耗时: {table_time:.2f}秒 - {rate:,.0f} 行/秒")
+        if create_indexes or args.fast_load:
+            label = "创建索引和外键" if args.fast_load else "创建索引"
+            print(f"{label} - 耗时: {indexes_time:.2f}秒")
+            for table, table_time in index_table_times.items():
+                print(f"  - {table}: {table_time:.2f}秒")
+        if args.snapshot:
+            print(f"保存快照 - 耗时: {snapshot_time:.2f}秒")
+        print(f"总记录数: {total_rows:,}条")
         print(f"总耗时: {total_elapsed_time:.2f}秒")
         
     except Exception as e:
         print(f"生成数据时出错: {e}")
+        # 以非0状态退出，调用方（如scale_curve.py）据此判断数据没有生成
+        sys.exit(1)
     finally:
         # 关闭连接
         if conn and conn.is_connected():
@@ -368,4 +968,4 @@ def main():
             print("数据库连接已关闭")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
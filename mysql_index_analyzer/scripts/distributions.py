@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 数据分布
+为生成的列配置非均匀分布（Zipf、正态/对数正态、按时间的季节性、与日期相关的状态），
+使测试数据的选择性接近真实业务。每个分布同时支持逐行抽样（random.Random）和
+向量化抽样（numpy.random.Generator），两种生成引擎得到相同的分布
+"""
+
+import json
+import bisect
+import hashlib
+import math
+from datetime import timedelta
+
+import numpy as np
+
+# 未配置分布的列保持原有的均匀分布
+DISTRIBUTION_PRESETS = {
+    'uniform': {},
+    'skewed': {
+        # 大部分用户是活跃用户，长期未登录的用户更可能是非活跃或被冻结
+        'users.status': {'type': 'correlated', 'bands': [
+            {'max_age_days': 90, 'weights': [95, 4, 1]},
+            {'max_age_days': 365, 'weights': [70, 25, 5]},
+            {'weights': [30, 60, 10]}
+        ]},
+        'users.credit_score': {'type': 'normal', 'mean': 680, 'std': 70},
+        'users.registration_date': {'type': 'seasonal', 'growth': 3.0},
+        'products.category': {'type': 'zipf', 's': 0.8},
+        'products.price': {'type': 'lognormal', 'mean': 5.0, 'sigma': 1.1},
+        # 少数热门用户和热门产品贡献大部分订单
+        'orders.user_id': {'type': 'zipf', 's': 1.07},
+        'orders.product_id': {'type': 'zipf', 's': 1.2},
+        'orders.quantity': {'type': 'zipf', 's': 1.5},
+        # 订单量逐月增长，周末更多，大促前后出现峰值
+        'orders.order_date': {'type': 'seasonal', 'growth': 1.5,
+                              'weekly': [1.0, 0.95, 0.95, 1.0, 1.1, 1.3, 1.25],
+                              'peaks': [{'month': 11, 'day': 11, 'width': 3, 'boost': 4.0},
+                                        {'month': 6, 'day': 18, 'width': 3, 'boost': 2.0}]},
+        # 订单状态取决于下单时间：新订单多为待处理，旧订单多为已送达
+        'orders.status': {'type': 'correlated', 'bands': [
+            {'max_age_days': 1, 'weights': [70, 25, 3, 0, 2]},
+            {'max_age_days': 7, 'weights': [5, 25, 55, 10, 5]},
+            {'max_age_days': 30, 'weights': [1, 2, 12, 78, 7]},
+            {'weights': [0, 0, 1, 92, 7]}
+        ]},
+        'orders.payment_method': {'type': 'weighted', 'weights': [20, 10, 35, 30, 2, 3]}
+    }
+}
+
+# 可配置分布的列
+# 日期列：相对参考时间往前的天数范围（含两端）
+DATE_COLUMNS = {
+    'users.registration_date': (1, 1095),
+    'products.created_at': (1, 730),
+    'orders.order_date': (0, 365)
+}
+# 数值列：取值范围（含两端）和是否为整数
+NUMERIC_COLUMNS = {
+    'users.credit_score': (300, 850, True),
+    'products.price': (10, 9999.99, False),
+    'products.stock': (0, 10000, True),
+    'orders.quantity': (1, 10, True)
+}
+# 引用父表ID的列
+REFERENCE_COLUMNS = ('orders.user_id', 'orders.product_id')
+# 相关分布依据的日期列（按该日期距参考时间的天数分段）
+CORRELATION_SOURCES = {
+    'users': 'last_login',
+    'orders': 'order_date'
+}
+
+
+class WeightedChoice:
+    """按权重从给定取值中抽样（累积权重+二分查找）"""
+
+    def __init__(self, values, weights):
+        weights = np.asarray(weights, dtype=np.float64)
+        if len(weights) != len(values) or len(weights) == 0:
+            raise ValueError(f"权重数量({len(weights)})与取值数量({len(values)})不一致")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError("权重必须非负且不能全为0")
+        # 数值取值保留原始类型（紧凑存储），字符串取值使用object数组
+        self.values = np.asarray(values)
+        if self.values.dtype.kind not in 'iuf':
+            self.values = np.asarray(values, dtype=object)
+        self.cumulative = np.cumsum(weights)
+        self.total = float(self.cumulative[-1])
+        self._cumulative_list = None
+
+    def draw(self, rng, age=None):
+        """逐行抽样一个值"""
+        if self._cumulative_list is None:
+            self._cumulative_list = self.cumulative.tolist()
+        index = bisect.bisect_right(self._cumulative_list, rng.random() * self.total)
+        value = self.values[min(index, len(self.values) - 1)]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def draw_array(self, rng, n, ages=None):
+        """向量化抽样n个值"""
+        index = np.searchsorted(self.cumulative, rng.random(n) * self.total, side='right')
+        return self.values[np.minimum(index, len(self.values) - 1)]
+
+
+class NumericSampler:
+    """正态或对数正态分布的数值，截断到列的取值范围"""
+
+    def __init__(self, kind, params, low, high, integer, decimals=2):
+        self.kind = kind
+        self.low = low
+        self.high = high
+        self.integer = integer
+        self.decimals = decimals
+        if kind == 'normal':
+            self.mean, self.std = params['mean'], params['std']
+        else:
+            self.mean, self.std = params['mean'], params['sigma']
+
+    def _clip(self, value):
+        value = min(max(value, self.low), self.high)
+        return int(round(value)) if self.integer else round(value, self.decimals)
+
+    def draw(self, rng, age=None):
+        """逐行抽样一个值"""
+        if self.kind == 'normal':
+            return self._clip(rng.gauss(self.mean, self.std))
+        return self._clip(rng.lognormvariate(self.mean, self.std))
+
+    def draw_array(self, rng, n, ages=None):
+        """向量化抽样n个值"""
+        if self.kind == 'normal':
+            values = rng.normal(self.mean, self.std, n)
+        else:
+            values = rng.lognormal(self.mean, self.std, n)
+        values = np.clip(values, self.low, self.high)
+        return np.rint(values).astype(np.int64) if self.integer else np.round(values, self.decimals)
+
+
+class ZipfIndex:
+    """按Zipf分布抽取父表ID数组的下标，热门下标按固定步长打散
+
+    用逆累积分布函数直接抽取排名，不为每个父表ID保存权重，内存占用与父表行数无关
+    """
+
+    def __init__(self, n, s):
+        if n <= 0:
+            raise ValueError("父表没有数据，无法抽样引用的ID")
+        self.n = n
+        self.s = s
+
+    def draw(self, rng, age=None):
+        """逐行抽样一个下标"""
+        rank = zipf_inverse(rng.random(), self.n, self.s)
+        return int(scatter_ranks(rank, self.n)) - 1
+
+    def draw_array(self, rng, n, ages=None):
+        """向量化抽样n个下标"""
+        return scatter_ranks(zipf_ranks(rng, self.n, self.s, n), self.n) - 1
+
+
+class CorrelatedChoice:
+    """按日期距参考时间的天数分段，每段使用不同的权重抽样"""
+
+    def __init__(self, values, bands):
+        self.bands = []
+        for band in bands:
+            max_age = band.get('max_age_days')
+            self.bands.append((math.inf if max_age is None else max_age, WeightedChoice(values, band['weights'])))
+        self.bands.sort(key=lambda band: band[0])
+        if self.bands[-1][0] != math.inf:
+            raise ValueError("相关分布的最后一段不能设置max_age_days")
+
+    def draw(self, rng, age=None):
+        """逐行抽样一个值"""
+        for max_age, choice in self.bands:
+            if age <= max_age:
+                return choice.draw(rng)
+
+    def draw_array(self, rng, n, ages=None):
+        """向量化抽样n个值"""
+        result = np.empty(n, dtype=object)
+        assigned = np.zeros(n, dtype=bool)
+        for max_age, choice in self.bands:
+            mask = (ages <= max_age) & ~assigned
+            count = int(mask.sum())
+            if count:
+                result[mask] = choice.draw_array(rng, count)
+                assigned |= mask
+        return result
+
+
+def zipf_weights(n, s):
+    """排名1..n的Zipf权重"""
+    return np.arange(1, n + 1, dtype=np.float64) ** -s
+
+
+def zipf_ranks(rng, n, s, size):
+    """从1..n中按Zipf分布抽取排名
+
+    使用连续近似的逆累积分布函数，内存占用与n无关，适合从很大的ID范围中抽样
+    """
+    return zipf_inverse(rng.random(size), n, s)
+
+
+def zipf_inverse(u, n, s):
+    """把[0, 1)上均匀分布的u（标量或数组）映射为1..n中的Zipf排名"""
+    u = np.asarray(u, dtype=np.float64)
+    if s == 1:
+        x = (n + 1) ** u
+    else:
+        x = (1 + u * ((n + 1) ** (1 - s) - 1)) ** (1 / (1 - s))
+    return np.clip(np.floor(x).astype(np.int64), 1, n)
+
+
+def _scatter_step(n):
+    """返回与n互质的打散步长"""
+    step = max(int(n * 0.618), 1)
+    while math.gcd(step, n) != 1:
+        step += 1
+    return step
+
+
+def scatter_ranks(ranks, n):
+    """按固定步长把1..n的排名映射为1..n的ID，使热门ID分散在整个ID范围内而不是集中在开头"""
+    return (ranks - 1) * _scatter_step(n) % n + 1
+
+
+def seasonal_weights(low, high, reference_time, spec):
+    """计算往前low..high天每一天的权重：增长趋势 × 星期系数 × 节日峰值"""
+    days = high - low + 1
+    growth = spec.get('growth', 1.0)
+    weekly = spec.get('weekly')
+    peaks = spec.get('peaks', [])
+    if weekly and len(weekly) != 7:
+        raise ValueError("weekly必须包含7个星期系数（周一到周日）")
+
+    weights = []
+    for offset in range(low, high + 1):
+        date = reference_time - timedelta(days=offset)
+        # 越接近参考时间权重越大，最新一天是最早一天的growth倍
+        weight = growth ** ((high - offset) / max(days - 1, 1))
+        if weekly:
+            weight *= weekly[date.weekday()]
+        for peak in peaks:
+            distance = min(abs((date.date() - date.date().replace(year=year, month=peak['month'], day=peak['day'])).days)
+                           for year in (date.year - 1, date.year, date.year + 1))
+            weight *= 1 + peak['boost'] * math.exp(-0.5 * (distance / peak['width']) ** 2)
+        weights.append(weight)
+    return weights
+
+
+def build_sampler(column, spec, choices, context, reference_time):
+    """根据列的分布配置创建抽样器，返回None表示使用均匀分布"""
+    kind = spec.get('type', 'uniform')
+    if kind == 'uniform':
+        return None
+
+    if column in choices:
+        values = choices[column]
+        if kind == 'weighted':
+            return WeightedChoice(values, spec['weights'])
+        if kind == 'zipf':
+            return WeightedChoice(values, zipf_weights(len(values), spec['s']))
+        if kind == 'correlated':
+            if column.split('.')[0] not in CORRELATION_SOURCES:
+                raise ValueError(f"{column} 不支持相关分布")
+            return CorrelatedChoice(values, spec['bands'])
+
+    elif column in REFERENCE_COLUMNS:
+        if kind == 'zipf':
+            # 抽样得到父表ID数组中的下标，由生成器换算为ID（产品同时换算价格）
+            parent_ids = context['user_ids'] if column == 'orders.user_id' else context['product_ids']
+            return ZipfIndex(len(parent_ids), spec['s'])
+
+    elif column in NUMERIC_COLUMNS:
+        low, high, integer = NUMERIC_COLUMNS[column]
+        if kind in ('normal', 'lognormal'):
+            return NumericSampler(kind, spec, low, high, integer)
+        if kind == 'zipf' and integer:
+            return WeightedChoice(list(range(low, high + 1)), zipf_weights(high - low + 1, spec['s']))
+
+    elif column in DATE_COLUMNS:
+        low, high = DATE_COLUMNS[column]
+        if kind == 'seasonal':
+            return WeightedChoice(list(range(low, high + 1)), seasonal_weights(low, high, reference_time, spec))
+
+    else:
+        raise ValueError(f"不支持配置分布的列: {column}")
+    raise ValueError(f"列 {column} 不支持分布类型: {kind}")
+
+
+def build_samplers(table, distributions, choices, context, reference_time):
+    """为一张表创建所有已配置分布的列的抽样器"""
+    samplers = {}
+    for column, spec in distributions.items():
+        if column.split('.')[0] != table:
+            continue
+        sampler = build_sampler(column, spec, choices, context, reference_time)
+        if sampler is not None:
+            samplers[column] = sampler
+    return samplers
+
+
+def load_distributions(preset='uniform', distribution_file=None):
+    """读取分布配置：先取预设，再用JSON文件中的列配置覆盖"""
+    if preset not in DISTRIBUTION_PRESETS:
+        raise ValueError(f"未知的分布预设: {preset}")
+    distributions = dict(DISTRIBUTION_PRESETS[preset])
+    if distribution_file:
+        with open(distribution_file, 'r', encoding='utf-8') as f:
+            distributions.update(json.load(f))
+    return distributions
+
+
+def distribution_label(preset, distributions):
+    """返回分布配置的标识，用于区分数据集快照"""
+    if distributions == DISTRIBUTION_PRESETS.get(preset):
+        return preset
+    text = json.dumps(distributions, sort_keys=True)
+    return f"custom{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}"
@@ -0,0 +1,186 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 索引创建代价
+用ALTER TABLE ... ADD INDEX指定ALGORITHM/LOCK创建索引并计时，记录临时文件和redo日志的使用量；
+可选地在创建索引期间运行后台DML负载（主键查询和更新），对比创建前后的吞吐量和延迟，衡量在线DDL对业务的影响
+"""
+
+import time
+
+from server_status import read_status, status_delta, read_variable
+from load_tester import LoadRunner
+
+# 创建索引的方式（服务器不支持时退回DEFAULT）
+BUILD_ALGORITHM = 'INPLACE'
+BUILD_LOCK = 'NONE'
+# 创建索引时记录的全局计数器
+BUILD_STATUS = ('Created_tmp_files', 'Innodb_os_log_written')
+# 在线DDL排序使用的InnoDB临时文件（performance_schema文件I/O统计）
+TEMP_FILE_EVENT = 'wait/io/file/innodb/innodb_temp_file'
+# 影响在线DDL的服务器变量
+BUILD_VARIABLES = ('innodb_sort_buffer_size', 'innodb_online_alter_log_max_size', 'innodb_tmpdir')
+
+# 后台DML负载配置
+BACKGROUND_WORKERS = 4  # 后台负载线程数
+BASELINE_SECONDS = 5  # 创建索引前测量基准吞吐量的时长（秒）
+# 各表的后台更新语句：按主键定位并锁定行，但把列设为原值，不改变测试数据（重复运行的结果可比较）
+BACKGROUND_UPDATES = {
+    'users': "UPDATE users SET last_login = last_login WHERE id = %s",
+    'products': "UPDATE products SET updated_at = updated_at WHERE id = %s",
+    'orders': "UPDATE orders SET quantity = quantity WHERE id = %s"
+}
+
+
+def build_index_statement(table, columns, index_name, unique=False, algorithm=None, lock=None):
+    """返回创建索引的ALTER TABLE语句"""
+    index_type = "UNIQUE INDEX" if unique else "INDEX"
+    statement = f"ALTER TABLE {table} ADD {index_type} {index_name} ({', '.join(columns)})"
+    if algorithm:
+        statement += f", ALGORITHM={algorithm}"
+    if lock:
+        statement += f", LOCK={lock}"
+    return statement
+
+
+def read_temp_file_bytes(conn):
+    """InnoDB临时文件累计写入字节数，performance_schema不可用时返回None"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT SUM_NUMBER_OF_BYTES_WRITE FROM performance_schema.file_summary_by_event_name "
+                       "WHERE EVENT_NAME = %s", (TEMP_FILE_EVENT,))
+        row = cursor.fetchone()
+        return int(row[0]) if row else None
+    except Exception:
+        return None
+    finally:
+        cursor.close()
+
+
+def background_cases(conn, table):
+    """表上的后台DML用例：随机主键查询和更新"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+    min_id, max_id = cursor.fetchone()
+    cursor.close()
+    if not max_id:
+        return []
+
+    def random_id(rng):
+        return (rng.randint(min_id, max_id),)
+
+    return [
+        (f"{table}主键查询", f"SELECT * FROM {table} WHERE id = %s", random_id),
+        (f"{table}主键更新", BACKGROUND_UPDATES[table], random_id)
+    ]
+
+
+def load_impact(baseline, during):
+    """创建索引期间相对基准的吞吐量下降比例（%）和p99延迟倍数"""
+    impact = {'throughput_drop': None, 'p99_ratio': None}
+    if baseline['throughput']:
+        impact['throughput_drop'] = (baseline['throughput'] - during['throughput']) / baseline['throughput'] * 100
+    if baseline['p99'] and during['p99'] is not None:
+        impact['p99_ratio'] = during['p99'] / baseline['p99']
+    return impact
+
+
+class IndexBuilder:
+    """按指定的ALGORITHM/LOCK创建索引并记录代价"""
+
+    def __init__(self, conn, algorithm=BUILD_ALGORITHM, lock=BUILD_LOCK, db_config=None,
+                 background_workers=0, baseline_seconds=BASELINE_SECONDS):
+        """background_workers大于0时在创建索引期间运行后台DML负载（需要db_config）"""
+        self.conn = conn
+        self.algorithm = algorithm
+        self.lock = lock
+        self.db_config = db_config
+        self.background_workers = background_workers if db_config else 0
+        self.baseline_seconds = baseline_seconds
+        self.variables = {}
+        for name in BUILD_VARIABLES:
+            try:
+                self.variables[name] = read_variable(conn, name)
+            except Exception:
+                self.variables[name] = None
+
+    def _execute_build(self, statement):
+        """执行创建索引的语句，返回耗时（秒）"""
+        cursor = self.conn.cursor()
+        try:
+            start = time.perf_counter_ns()
+            cursor.execute(statement)
+            self.conn.commit()
+            return (time.perf_counter_ns() - start) / 1e9
+        finally:
+            cursor.close()
+
+    def build(self, table, columns, index_name, unique=False):
+        """创建索引，返回记录（表、索引、使用的ALGORITHM/LOCK、耗时、临时文件、redo和后台负载的影响）"""
+        record = {
+            'table': table,
+            'index': index_name,
+            'columns': list(columns),
+            'algorithm': self.algorithm,
+            'lock': self.lock,
+            'fallback_reason': None,
+            'variables': self.variables
+        }
+
+        runner = None
+        if self.background_workers:
+            cases = background_cases(self.conn, table)
+            if cases:
+                # 先测基准，再在创建索引期间运行同样的负载
+                baseline = LoadRunner(self.db_config, cases, workers=self.background_workers,
+                                      duration=self.baseline_seconds).run()
+                runner = LoadRunner(self.db_config, cases, workers=self.background_workers)
+                record['background'] = {'workers': self.background_workers, 'baseline': baseline}
+
+        before = read_status(self.conn, BUILD_STATUS)
+        temp_bytes_before = read_temp_file_bytes(self.conn)
+        if runner:
+            runner.start()
+        try:
+            statement = build_index_statement(table, columns, index_name, unique, self.algorithm, self.lock)
+            print(f"创建索引: {statement}")
+            try:
+                record['elapsed'] = self._execute_build(statement)
+            except Exception as e:
+                if not self.algorithm and not self.lock:
+                    raise
+                # 服务器不支持指定的方式（如LOCK=NONE的全文索引），退回默认方式
+                print(f"不支持ALGORITHM={self.algorithm}, LOCK={self.lock}（{e}），改用默认方式")
+                record.update({'algorithm': 'DEFAULT', 'lock': 'DEFAULT', 'fallback_reason': str(e)})
+                statement = build_index_statement(table, columns, index_name, unique)
+                record['elapsed'] = self._execute_build(statement)
+        finally:
+            if runner:
+                during = runner.stop()
+                record['background']['during'] = during
+
+        status = status_delta(before, read_status(self.conn, BUILD_STATUS))
+        temp_bytes_after = read_temp_file_bytes(self.conn)
+        record.update({
+            'statement': statement,
+            'tmp_files': status['Created_tmp_files'],
+            'temp_file_bytes': temp_bytes_after - temp_bytes_before
+            if temp_bytes_before is not None and temp_bytes_after is not None else None,
+            'redo_bytes': status['Innodb_os_log_written']
+        })
+        print(f"耗时: {record['elapsed']:.3f}秒, 临时文件: {record['tmp_files']} 个"
+              + (f"（写入 {record['temp_file_bytes'] / 1024 / 1024:.1f} MB）"
+                 if record['temp_file_bytes'] is not None else "")
+              + f", redo: {record['redo_bytes'] / 1024 / 1024:.1f} MB")
+
+        if 'background' in record:
+            background = record['background']
+            background['impact'] = load_impact(background['baseline'], background['during'])
+            impact = background['impact']
+            print(f"后台负载: 吞吐量 {background['baseline']['throughput']:.1f} -> "
+                  f"{background['during']['throughput']:.1f} 请求/秒"
+                  + (f"（下降 {impact['throughput_drop']:.1f}%）" if impact['throughput_drop'] is not None else "")
+                  + (f", p99延迟为基准的 {impact['p99_ratio']:.2f} 倍" if impact['p99_ratio'] is not None else "")
+                  + f", 错误 {background['during']['errors']} 次")
+        return record
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 索引状态管理
+读取各表当前的二级索引，计算切换到目标索引策略所需的最少操作：已存在的索引保留（不可见的改为可见），
+多余的索引改为不可见（ALTER INDEX ... INVISIBLE，MySQL 8.0+）或删除，只创建缺少的索引；
+并按创建代价安排策略的执行顺序，减少索引重建
+"""
+
+import itertools
+
+# 多余索引的处理方式: invisible 改为不可见（之后可瞬间恢复）, drop 删除
+INDEX_STATE_MODES = ('invisible', 'drop')
+MAX_EXACT_ORDER = 7  # 策略数不超过该值时枚举全部顺序，否则按最近邻贪心排序
+
+
+class IndexStateManager:
+    """比较当前索引和目标索引策略，执行最少的创建/删除/可见性切换"""
+
+    def __init__(self, conn, database, tables, create_index, drop_index, mode='invisible'):
+        """create_index(table, columns, name)和drop_index(table, name)由调用方提供，用于记录创建代价"""
+        if mode not in INDEX_STATE_MODES:
+            raise ValueError(f"未知的索引状态管理方式: {mode}")
+        self.conn = conn
+        self.database = database
+        self.tables = tuple(tables)
+        self.create_index = create_index
+        self.drop_index = drop_index
+        self.supports_invisible = self._supports_invisible()
+        if mode == 'invisible' and not self.supports_invisible:
+            print("服务器不支持不可见索引（需要MySQL 8.0+），多余的索引改为删除")
+            mode = 'drop'
+        self.mode = mode
+        self.table_rows = self._table_rows()
+
+    def _supports_invisible(self):
+        """information_schema.STATISTICS是否有IS_VISIBLE列"""
+        cursor = self.conn.cursor()
+        try:
+            cursor.execute("SELECT IS_VISIBLE FROM information_schema.STATISTICS LIMIT 1")
+            cursor.fetchall()
+            return True
+        except Exception:
+            return False
+        finally:
+            cursor.close()
+
+    def _table_rows(self):
+        """各表的估算行数，作为创建索引的代价"""
+        cursor = self.conn.cursor()
+        placeholders = ", ".join(["%s"] * len(self.tables))
+        cursor.execute(f"SELECT TABLE_NAME, TABLE_ROWS FROM information_schema.TABLES "
+                       f"WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})",
+                       (self.database,) + self.tables)
+        rows = {table: int(count or 0) for table, count in cursor.fetchall()}
+        cursor.close()
+        return rows
+
+    def read_state(self):
+        """返回当前的二级索引 {(表, 索引名): {'columns': [...], 'visible': bool}}"""
+        cursor = self.conn.cursor()
+        placeholders = ", ".join(["%s"] * len(self.tables))
+        visible = "IS_VISIBLE" if self.supports_invisible else "'YES'"
+        cursor.execute(f"""
+            SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME, {visible}
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders}) AND INDEX_NAME != 'PRIMARY'
+            ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+        """, (self.database,) + self.tables)
+        state = {}
+        for table, name, column, is_visible in cursor.fetchall():
+            index = state.setdefault((table, name), {'columns': [], 'visible': is_visible == 'YES'})
+            index['columns'].append(column)
+        cursor.close()
+        return state
+
+    def plan(self, target, state=None):
+        """计算从当前状态切换到目标索引[(表, 列, 索引名)]的操作"""
+        state = self.read_state() if state is None else state
+        wanted = {(table, name): list(columns) for table, columns, name in target}
+        actions = {'create': [], 'drop': [], 'show': [], 'hide': []}
+        for key, index in state.items():
+            if key in wanted and index['columns'] == wanted[key]:
+                if not index['visible']:
+                    actions['show'].append(key)
+            elif key in wanted or self.mode == 'drop':
+                # 同名但列不同的索引必须删除重建
+                actions['drop'].append(key)
+            elif index['visible']:
+                actions['hide'].append(key)
+        for table, columns, name in target:
+            key = (table, name)
+            if key not in state or key in actions['drop']:
+                actions['create'].append((table, list(columns), name))
+        return actions
+
+    def _set_visible(self, table, name, visible):
+        """切换索引的可见性（只修改元数据，不重建索引）"""
+        cursor = self.conn.cursor()
+        statement = f"ALTER TABLE {table} ALTER INDEX {name} {'VISIBLE' if visible else 'INVISIBLE'}"
+        print(f"切换索引可见性: {statement}")
+        cursor.execute(statement)
+        self.conn.commit()
+        cursor.close()
+
+    def apply(self, target):
+        """切换到目标索引，返回执行的操作"""
+        actions = self.plan(target)
+        for table, name in actions['drop']:
+            self.drop_index(table, name)
+        for table, name in actions['hide']:
+            self._set_visible(table, name, False)
+        for table, name in actions['show']:
+            self._set_visible(table, name, True)
+        for table, columns, name in actions['create']:
+            self.create_index(table, columns, name)
+        print(f"索引切换: 创建 {len(actions['create'])} 个, 删除 {len(actions['drop'])} 个, "
+              f"恢复可见 {len(actions['show'])} 个, 设为不可见 {len(actions['hide'])} 个")
+        return {key: [list(item) for item in items] for key, items in actions.items()}
+
+    def _simulate(self, state, target):
+        """模拟切换，返回(创建代价, 切换后的状态)"""
+        actions = self.plan(target, state)
+        cost = sum(max(self.table_rows.get(table, 0), 1) for table, _, _ in actions['create'])
+        new_state = {key: dict(index) for key, index in state.items() if key not in actions['drop']}
+        for key in actions['hide']:
+            new_state[key]['visible'] = False
+        for key in actions['show']:
+            new_state[key]['visible'] = True
+        for table, columns, name in actions['create']:
+            new_state[(table, name)] = {'columns': list(columns), 'visible': True}
+        return cost, new_state
+
+    def order(self, strategies):
+        """按创建索引的总代价（表的行数之和）最小安排策略顺序，strategies为[(策略ID, 目标索引)]"""
+        if len(strategies) < 2:
+            return [strategy_id for strategy_id, _ in strategies]
+        state = self.read_state()
+
+        def total_cost(sequence):
+            cost, current = 0, state
+            for _, target in sequence:
+                step, current = self._simulate(current, target)
+                cost += step
+            return cost
+
+        if len(strategies) <= MAX_EXACT_ORDER:
+            # 保持配置顺序作为代价相同时的优先顺序
+            best = min(itertools.permutations(strategies), key=total_cost)
+            return [strategy_id for strategy_id, _ in best]
+
+        # 最近邻: 每次选择从当前状态切换代价最小的策略
+        ordered, current, remaining = [], state, list(strategies)
+        while remaining:
+            costs = [self._simulate(current, target) for _, target in remaining]
+            best = min(range(len(remaining)), key=lambda i: costs[i][0])
+            ordered.append(remaining.pop(best)[0])
+            current = costs[best][1]
+        return ordered
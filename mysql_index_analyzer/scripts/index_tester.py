@@ -10,13 +10,24 @@ import time
 import sys
 import json
 import os
+import argparse
+import statistics
+import itertools
 import mysql.connector
-import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 from datetime import datetime, timedelta
-import random
 from functools import wraps
+from results_store import ResultsStore, case_key_for, case_time, match_strategy_cases
+from timing import TimingEngine, intervals_overlap, summarize, WARMUP_RUNS
+from server_status import CACHE_MODES, EVICT_METHODS, STATEMENT_STATUS, BufferPoolController, StatementProbe, prewarm, \
+    read_variable
+from partitioning import table_partitions, partition_table_statements
+from write_benchmark import WriteBenchmark, write_overhead
+from index_build import IndexBuilder, BUILD_ALGORITHM, BUILD_LOCK, BACKGROUND_WORKERS
+from case_spec import load_case_spec, render_query, ParamPool
+from index_state import IndexStateManager, INDEX_STATE_MODES
+from optimizer_choice import compare_choice, capture_optimizer_trace, considered_access_paths
 
 # 配置matplotlib支持中文显示
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans']
@@ -35,7 +46,22 @@ DB_CONFIG = {
 }
 
 # 测试配置
-TEST_ITERATIONS = 5  # 每个查询重复执行的次数
+TEST_ITERATIONS = None  # 每个查询固定执行的次数，为None时由计时引擎自适应决定（见timing.py）
+# 统计取值分布的列（表, 列），用于判断数据倾斜对索引选择性的影响
+DISTRIBUTION_COLUMNS = [
+    ('users', 'status'),
+    ('products', 'category'),
+    ('orders', 'status'),
+    ('orders', 'payment_method'),
+    ('orders', 'user_id'),
+    ('orders', 'product_id')
+]
+TOP_VALUES_COUNT = 5  # 每列记录的最常见取值数量
+PARTITION_TEST_SCHEME = 'range'  # 订单表未分区时，分区对照表使用的分区方式
+COLD_ITERATIONS = 3  # 冷缓存模式的执行次数（每次执行前都要清空缓冲池，代价较大，不做自适应）
+WARM_PREREAD_RUNS = WARMUP_RUNS  # 热缓存模式计时前的预读次数
+RAW_ITERATIONS = 5  # 拆分耗时时使用原始（不转换类型）游标执行的次数
+INDEX_TABLES = ("users", "products", "orders")  # 切换索引策略时管理索引、统计索引大小的表
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 RESULT_DIR = os.path.join(PROJECT_DIR, "data")  # 结果保存目录
@@ -49,19 +75,70 @@ def time_query(func):
     """装饰器：计时查询执行时间"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
         result = func(*args, **kwargs)
-        elapsed_time = time.time() - start_time
+        elapsed_time = (time.perf_counter_ns() - start_time) / 1e9
         return result, elapsed_time
     return wrapper
 
+def significant(test_a, test_b):
+    """两个用例的耗时差异是否显著（置信区间不重叠）；旧结果没有置信区间时返回None"""
+    if 'timing' not in test_a or 'timing' not in test_b:
+        return None
+    return not intervals_overlap(test_a['timing'], test_b['timing'])
+
 class IndexTester:
     """索引测试类"""
     
-    def __init__(self):
+    def __init__(self, cache_modes=CACHE_MODES, evict_method='scan', write_benchmark=True,
+                 build_algorithm=BUILD_ALGORITHM, build_lock=BUILD_LOCK, build_background_workers=0, case_spec=None,
+                 index_state=None, optimizer_choice=False, optimizer_trace=False, fixed_params=False,
+                 dataset=None, partition_test=False):
         """初始化"""
+        # 测试查询和索引策略（见specs/index_cases.json）
+        try:
+            self.spec = load_case_spec(case_spec)
+        except Exception as e:
+            print(f"读取测试用例配置时出错: {e}")
+            sys.exit(1)
+        self.index_tables = tuple(dict.fromkeys(INDEX_TABLES + tuple(self.spec['tables'])))
+        # 每个查询的参数池，fixed_params为True时每次执行都使用同一组参数
+        self.case_params = {}
+        self.fixed_params = fixed_params
+        # 数据集标签（如scale_curve.py使用的scale0.1），与各表行数一起记录在结果中
+        self.dataset = dataset
         self.connect_to_db()
         self.results = {}
+        self.write_benchmark = write_benchmark
+        # 带索引提示的用例再不加提示执行一次，对比优化器自己选择的计划；optimizer_trace只记录选错计划的用例
+        self.optimizer_choice = optimizer_choice or optimizer_trace
+        self.optimizer_trace = optimizer_trace
+        # 分区裁剪测试要复制整张订单表，默认不运行
+        self.partition_test = partition_test
+        # 创建索引的方式和代价记录，build_background_workers大于0时在创建索引期间运行后台DML负载
+        self.index_builder = IndexBuilder(self.conn, build_algorithm, build_lock, DB_CONFIG, build_background_workers)
+        self.index_builds = []
+        # 切换索引策略时只创建缺少的索引，多余的索引设为不可见或删除；
+        # 不可见索引仍要在写入时维护，测试写入代价时默认删除多余的索引
+        if index_state is None:
+            index_state = 'drop' if write_benchmark else 'invisible'
+        try:
+            self.index_state = IndexStateManager(self.conn, DB_CONFIG['database'], self.index_tables,
+                                                 self.create_index, self.drop_index, index_state)
+        except Exception as e:
+            print(f"初始化索引状态管理时出错: {e}")
+            sys.exit(1)
+        # 预读由缓冲池控制器负责，计时引擎本身不再预热
+        self.timer = TimingEngine(warmup=0)
+        self.cache_modes = cache_modes
+        self.probe = StatementProbe(self.conn)
+        self.buffer_pool = None
+        if 'cold' in cache_modes:
+            try:
+                self.buffer_pool = BufferPoolController(self.conn, evict_method, reconnect=self.reconnect)
+            except Exception as e:
+                print(f"初始化缓冲池控制时出错: {e}")
+                sys.exit(1)
         
     def connect_to_db(self):
         """连接到数据库"""
@@ -73,8 +150,23 @@ class IndexTester:
             print(f"连接到数据库时出错: {e}")
             sys.exit(1)
             
+    def reconnect(self):
+        """重新连接数据库（MySQL重启后），返回新连接"""
+        self.conn = mysql.connector.connect(**DB_CONFIG)
+        self.cursor = self.conn.cursor(dictionary=True)
+        # 重启后performance_schema的配置会恢复默认，需要重新开启语句历史
+        self.probe = StatementProbe(self.conn)
+        self.index_builder.conn = self.conn
+        self.index_state.conn = self.conn
+        return self.conn
+            
     def close_connection(self):
         """关闭数据库连接"""
+        if self.buffer_pool:
+            try:
+                self.buffer_pool.cleanup()
+            except Exception as e:
+                print(f"删除缓冲池填充表时出错: {e}")
         if self.conn and self.conn.is_connected():
             self.cursor.close()
             self.conn.close()
@@ -105,19 +197,12 @@ class IndexTester:
             return None
             
     def create_index(self, table, columns, index_name=None, unique=False):
-        """创建索引"""
+        """创建索引，并记录创建耗时、临时文件和后台负载的影响"""
         try:
             if not index_name:
                 index_name = f"idx_{'_'.join(columns)}"
                 
-            index_type = "UNIQUE" if unique else ""
-            column_str = ", ".join(columns)
-            
-            query = f"CREATE {index_type} INDEX {index_name} ON {table} ({column_str})"
-            print(f"创建索引: {query}")
-            
-            self.cursor.execute(query)
-            self.conn.commit()
+            self.index_builds.append(self.index_builder.build(table, columns, index_name, unique))
             return True
         except Exception as e:
             print(f"创建索引时出错: {e}")
@@ -165,46 +250,153 @@ class IndexTester:
         """运行单个查询并返回结果"""
         return self.execute_query(query, params)
             
-    def run_test_case(self, name, query, params=None, iterations=TEST_ITERATIONS):
-        """运行测试用例，多次执行查询取平均时间"""
+    def measure_cache_mode(self, mode, query, params=None, iterations=TEST_ITERATIONS, param_sequence=None):
+        """在指定的缓存状态下计时，同时记录每次执行的服务器端耗时和Handler/InnoDB计数器增量
+
+        warm: 先预读若干次，再自适应地重复执行；cold: 每次执行前清空缓冲池，固定执行COLD_ITERATIONS次；
+        param_sequence不为空时每次执行按顺序取用其中的下一组参数，warm先预读计时会用到的每一组参数
+        """
+        if param_sequence:
+            position = itertools.count()
+            run = lambda: self.execute_query(query, param_sequence[next(position) % len(param_sequence)])
+        else:
+            run = lambda: self.execute_query(query, params)
+        samples = []
+        
+        def before_each():
+            if mode == 'cold':
+                self.buffer_pool.evict()
+            self.probe.begin(self.conn)
+            
+        def after_each(i, query_time):
+            sample = self.probe.end(self.conn)
+            samples.append(sample)
+            server = f", 服务器端: {sample['server_time']:.6f}秒" if 'server_time' in sample else ""
+            print(f"[{mode}] 第 {i} 次耗时: {query_time:.6f}秒{server}, "
+                  f"磁盘读取: {sample['status']['Innodb_buffer_pool_reads']} 页")
+        
+        if mode == 'cold':
+            times, timing = self.timer.measure(run, iterations or COLD_ITERATIONS, after_each, before_each)
+        else:
+            if param_sequence:
+                # 计时最多执行到次数上限，先按顺序预读这些参数组，再从第一组重新开始计时，
+                # 计时的每次执行使用的都是已预读的参数（上一个用例的冷缓存测量已清空了缓冲池）
+                preread_sets = min(len(param_sequence), iterations or self.timer.max_iterations)
+                prewarm(run, max(preread_sets, WARM_PREREAD_RUNS))
+                position = itertools.count()
+            else:
+                prewarm(run, WARM_PREREAD_RUNS)
+            times, timing = self.timer.measure(run, iterations, after_each, before_each)
+        
+        # 各计数器每次执行的平均增量
+        avg_status = {name: sum(sample['status'][name] for sample in samples) / len(samples)
+                      for name in STATEMENT_STATUS}
+        result = {
+            'times': times,
+            'timing': timing,
+            'buffer_pool_reads': [sample['status']['Innodb_buffer_pool_reads'] for sample in samples],
+            'avg_buffer_pool_reads': avg_status['Innodb_buffer_pool_reads'],
+            'avg_buffer_pool_read_requests': avg_status['Innodb_buffer_pool_read_requests'],
+            'avg_status': avg_status
+        }
+        server_times = [sample['server_time'] for sample in samples if 'server_time' in sample]
+        if server_times:
+            result['server_times'] = server_times
+            result['server_timing'] = summarize(server_times)
+            result['rows_sent'] = samples[-1]['rows_sent']
+            result['rows_examined'] = samples[-1]['rows_examined']
+        return result
+        
+    def measure_breakdown(self, query, params, mode_result, param_sequence=None):
+        """把热缓存下的客户端耗时拆分为服务器执行、结果传输和客户端解码
+
+        原始游标不把结果转换为Python类型：原始游标耗时 - 服务器耗时 ≈ 传输，字典游标耗时 - 原始游标耗时 ≈ 解码
+        """
+        raw_times = []
+        raw_server_times = []
+        for i in range(RAW_ITERATIONS):
+            cursor = self.conn.cursor(raw=True)
+            start_time = time.perf_counter_ns()
+            cursor.execute(query, param_sequence[i % len(param_sequence)] if param_sequence else params)
+            cursor.fetchall()
+            raw_times.append((time.perf_counter_ns() - start_time) / 1e9)
+            cursor.close()
+            if self.probe.history_enabled:
+                statement = self.probe.last_statement(self.conn)
+                if statement:
+                    raw_server_times.append(statement['server_time'])
+        
+        total = mode_result['timing']['median']
+        raw_total = statistics.median(raw_times)
+        breakdown = {'total': total, 'raw_total': raw_total, 'decode': max(total - raw_total, 0)}
+        if 'server_timing' in mode_result and raw_server_times:
+            raw_server = statistics.median(raw_server_times)
+            breakdown['server'] = mode_result['server_timing']['median']
+            breakdown['transfer'] = max(raw_total - raw_server, 0)
+        return breakdown
+            
+    def run_test_case(self, name, query, params=None, iterations=TEST_ITERATIONS, param_sequence=None):
+        """运行测试用例：按每种缓存状态分别计时（热缓存自适应重复直到置信区间足够窄），剔除异常值后统计
+
+        param_sequence不为空时每次执行使用其中的下一组参数，EXPLAIN使用第一组参数
+        """
+        if param_sequence:
+            params = param_sequence[0]
         print(f"\n执行测试用例: {name}")
         print(f"查询: {query}")
-        if params:
+        if param_sequence:
+            print(f"参数: 每次执行轮流使用 {len(param_sequence)} 组参数，第一组为 {params}")
+        elif params:
             print(f"参数: {params}")
             
-        # 执行EXPLAIN分析查询执行计划
+        cache_modes = {}
+        breakdown = None
+        for mode in self.cache_modes:
+            cache_modes[mode] = self.measure_cache_mode(mode, query, params, iterations, param_sequence)
+            if mode == 'warm':
+                # 缓存仍是热的，紧接着拆分耗时
+                breakdown = self.measure_breakdown(query, params, cache_modes[mode], param_sequence)
+        # 主结果优先使用热缓存的计时
+        primary = cache_modes.get('warm') or cache_modes[self.cache_modes[0]]
+        times, timing = primary['times'], primary['timing']
+        
+        # 计时结束后再执行EXPLAIN，避免影响计时
         explain_results = self.execute_query(query, params, explain=True)
         print("\n查询执行计划:")
-        for row in explain_results:
+        for row in explain_results or []:
             print(json.dumps(row, ensure_ascii=False, indent=2))
-            
-        # 多次执行查询，记录时间
-        total_time = 0
-        times = []
-        
-        for i in range(iterations):
-            print(f"执行第 {i+1}/{iterations} 次...")
-            _, query_time = self.run_single_query(query, params)
-            times.append(query_time)
-            total_time += query_time
-            print(f"耗时: {query_time:.6f}秒")
-            
-        # 计算平均时间和标准差
-        avg_time = total_time / iterations
         
-        # 保存结果
+        # 保存结果（avg_time为剔除异常值后的均值）
         test_result = {
             'name': name,
             'query': query,
             'explain': explain_results,
             'times': times,
-            'avg_time': avg_time
+            'avg_time': timing['mean'],
+            'timing': timing,
+            'cache_modes': cache_modes
         }
+        if breakdown:
+            test_result['breakdown'] = breakdown
         
         if params:
             test_result['params'] = params
+        if param_sequence:
+            test_result['param_sequence'] = param_sequence
             
-        print(f"\n测试用例 {name} 完成，平均耗时: {avg_time:.6f}秒")
+        print(f"\n测试用例 {name} 完成（{timing['iterations']} 次，剔除 {timing['outliers']} 个异常值"
+              f"{'' if timing['converged'] else '，置信区间未达到目标'}）")
+        print(f"平均: {timing['mean']:.6f}秒, 中位数: {timing['median']:.6f}秒, p95: {timing['p95']:.6f}秒, "
+              f"p99: {timing['p99']:.6f}秒, 标准差: {timing['stddev']:.6f}秒, "
+              f"95%置信区间: [{timing['ci_low']:.6f}, {timing['ci_high']:.6f}]")
+        for mode, mode_result in cache_modes.items():
+            print(f"{'热缓存' if mode == 'warm' else '冷缓存'}: 中位数 {mode_result['timing']['median']:.6f}秒, "
+                  f"平均每次磁盘读取 {mode_result['avg_buffer_pool_reads']:.1f} 页, "
+                  f"InnoDB读取行数 {mode_result['avg_status']['Innodb_rows_read']:,.0f}")
+        if breakdown:
+            server = f"服务器执行 {breakdown['server']:.6f}秒, 传输 {breakdown['transfer']:.6f}秒, " \
+                if 'server' in breakdown else ""
+            print(f"耗时拆分: {server}客户端解码 {breakdown['decode']:.6f}秒（总计 {breakdown['total']:.6f}秒）")
         
         return test_result
         
@@ -212,10 +404,40 @@ class IndexTester:
         """运行所有索引测试"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # 测试不同的索引策略
-        self.test_no_indexes()
-        self.test_single_column_indexes()
-        self.test_multi_column_indexes()
+        # 记录数据集的规模、测试数据的取值分布和计时的缓存状态
+        self.collect_dataset()
+        self.collect_data_distribution()
+        self.results['cache_modes'] = {
+            'modes': list(self.cache_modes),
+            'evict_method': self.buffer_pool.method if self.buffer_pool else None,
+            # 热缓存预读的参数：timed_param_sets 表示预读计时会用到的全部参数组后再从第一组开始计时
+            'warm_preread': 'timed_param_sets'
+        }
+        
+        self.results['case_spec'] = {
+            'label': self.spec['label'],
+            'baseline': self.spec['baseline'],
+            'strategies': {strategy['id']: strategy['label'] for strategy in self.spec['strategies']},
+            'queries': {query['id']: query['name'] for query in self.spec['queries']},
+            'fixed_params': self.fixed_params
+        }
+        
+        # 按 查询×策略 的矩阵测试各索引策略，按索引重建代价最小的顺序执行
+        try:
+            order = self.index_state.order([(strategy['id'], strategy['indexes'])
+                                            for strategy in self.spec['strategies']])
+        except Exception as e:
+            print(f"安排索引策略顺序时出错: {e}")
+            order = [strategy['id'] for strategy in self.spec['strategies']]
+        print(f"索引策略执行顺序: {' -> '.join(order)}（多余的索引: "
+              f"{'设为不可见' if self.index_state.mode == 'invisible' else '删除'}）")
+        self.results['index_state'] = {'mode': self.index_state.mode, 'order': order}
+        for strategy_id in order:
+            self.run_strategy(strategy_id, self.get_strategy(strategy_id)['title'])
+        if self.optimizer_choice:
+            self.report_optimizer_choices()
+        if self.partition_test:
+            self.test_partitioning()
         
         # 保存结果
         result_file = os.path.join(RESULT_DIR, f"index_test_results_{timestamp}.json")
@@ -231,291 +453,381 @@ class IndexTester:
             
         print(f"\n测试结果已保存到: {result_file}")
         
+        # 记录到历史结果库
+        try:
+            store = ResultsStore()
+            run_id = store.record_index_test_run(self.results, source_file=result_file,
+                                                 metadata={'dataset': self.results['dataset']})
+            store.close()
+            print(f"测试结果已记录到历史结果库（运行ID: {run_id}）")
+        except Exception as e:
+            print(f"记录历史结果时出错: {e}")
+        
         # 生成可视化
         self.visualize_results(timestamp)
         
-    def test_no_indexes(self):
-        """测试没有索引的情况"""
-        print("\n==================== 测试没有索引的情况 ====================")
-        
-        # 删除所有非主键索引
-        self.drop_all_indexes("users")
-        self.drop_all_indexes("products")
-        self.drop_all_indexes("orders")
-        
-        # 存储测试结果
-        self.results['no_indexes'] = []
-        
-        # 测试用例1：按用户名查询
-        query = "SELECT * FROM users WHERE username = %s"
-        # 随机选择一个存在的用户名
-        self.cursor.execute("SELECT username FROM users ORDER BY RAND() LIMIT 1")
-        random_username = self.cursor.fetchone()['username']
-        
-        result = self.run_test_case(
-            name="按用户名查询（无索引）",
-            query=query,
-            params=(random_username,)
-        )
-        self.results['no_indexes'].append(result)
-        
-        # 测试用例2：按用户注册日期范围查询
-        query = """
-        SELECT * FROM users 
-        WHERE registration_date BETWEEN %s AND %s
-        """
-        # 设置一个随机的日期范围
-        self.cursor.execute("SELECT MIN(registration_date), MAX(registration_date) FROM users")
-        min_date, max_date = self.cursor.fetchone().values()
-        
-        # 将最小日期和最大日期之间分成10个区间，随机选择其中一个
-        date_range = (max_date - min_date).days
-        if date_range > 10:
-            start_offset = random.randint(0, date_range // 2)
-            end_offset = random.randint(date_range // 2, date_range)
-            start_date = min_date + pd.Timedelta(days=start_offset)
-            end_date = min_date + pd.Timedelta(days=end_offset)
+    def collect_dataset(self):
+        """记录数据集标签和各表的行数（精确计数），用于对比不同数据规模下的结果"""
+        tables = {}
+        for table in self.index_tables:
+            try:
+                self.cursor.execute(f"SELECT COUNT(*) AS row_count FROM {table}")
+                tables[table] = self.cursor.fetchone()['row_count']
+            except Exception as e:
+                print(f"统计表 {table} 的行数时出错: {e}")
+        self.results['dataset'] = {
+            'label': self.dataset,
+            'tables': tables,
+            'total_rows': sum(tables.values())
+        }
+        print(f"数据集{f' {self.dataset}' if self.dataset else ''}: "
+              + ", ".join(f"{table} {rows:,} 行" for table, rows in tables.items()))
+        return self.results['dataset']
+        
+    def collect_data_distribution(self):
+        """统计主要过滤/连接列的取值分布，记录不同数据分布下索引的选择性"""
+        print("\n==================== 统计数据分布 ====================")
+        distribution = {}
+        
+        for table, column in DISTRIBUTION_COLUMNS:
+            try:
+                self.cursor.execute(f"SELECT COUNT(*) AS total, COUNT(DISTINCT {column}) AS distinct_count FROM {table}")
+                counts = self.cursor.fetchone()
+                total, distinct = counts['total'], counts['distinct_count']
+                if not total:
+                    continue
+                self.cursor.execute(f"SELECT {column} AS value, COUNT(*) AS cnt FROM {table} "
+                                    f"GROUP BY {column} ORDER BY cnt DESC LIMIT {TOP_VALUES_COUNT}")
+                rows = self.cursor.fetchall()
+                top_values = [{'value': row['value'], 'count': row['cnt'], 'share': row['cnt'] / total}
+                              for row in rows]
+                # 最常见取值的行数相对于均匀分布时每个取值行数的倍数，越大说明越倾斜
+                skew_ratio = rows[0]['cnt'] / (total / distinct)
+                distribution[f"{table}.{column}"] = {
+                    'rows': total,
+                    'distinct': distinct,
+                    'avg_selectivity': 1 / distinct,
+                    'max_selectivity': rows[0]['cnt'] / total,
+                    'skew_ratio': skew_ratio,
+                    'top_values': top_values
+                }
+                print(f"{table}.{column}: {distinct} 个取值, 最常见取值占 {rows[0]['cnt'] / total:.2%}, "
+                      f"倾斜倍数 {skew_ratio:.1f}")
+            except Exception as e:
+                print(f"统计 {table}.{column} 的取值分布时出错: {e}")
+        
+        self.results['data_distribution'] = distribution
+        return distribution
+        
+    def get_strategy(self, strategy_id):
+        """返回配置中的索引策略"""
+        for strategy in self.spec['strategies']:
+            if strategy['id'] == strategy_id:
+                return strategy
+        raise ValueError(f"未知的索引策略: {strategy_id}")
+        
+    def apply_strategy(self, strategy):
+        """切换到该索引策略的索引：只创建缺少的索引，已有的索引恢复可见，多余的索引设为不可见或删除"""
+        self.index_builds = []
+        start = time.perf_counter_ns()
+        try:
+            actions = self.index_state.apply(self.get_strategy(strategy)['indexes'])
+        except Exception as e:
+            # 无法比较索引状态时退回删除全部索引后重建
+            print(f"切换索引状态时出错: {e}，删除全部索引后重建")
+            for table in self.index_tables:
+                self.drop_all_indexes(table)
+            self.index_builds = []
+            for table, columns, index_name in self.get_strategy(strategy)['indexes']:
+                self.create_index(table, columns, index_name)
+            actions = None
+        if actions is not None:
+            actions['elapsed'] = (time.perf_counter_ns() - start) / 1e9
+            self.results.setdefault('index_transitions', {})[strategy] = actions
+        if self.index_builds:
+            self.results.setdefault('index_builds', {})[strategy] = self.index_builds
             
-            result = self.run_test_case(
-                name="按用户注册日期范围查询（无索引）",
-                query=query,
-                params=(start_date, end_date)
-            )
-            self.results['no_indexes'].append(result)
-        
-        # 测试用例3：联表查询（用户订单）
-        query = """
-        SELECT u.username, o.order_date, o.total_price
-        FROM users u
-        JOIN orders o ON u.id = o.user_id
-        WHERE u.credit_score > %s
-        LIMIT 1000
-        """
+    def collect_index_sizes(self, strategy):
+        """统计当前各索引的大小（mysql.innodb_index_stats的页数和information_schema.TABLES的INDEX_LENGTH）"""
+        print("\n---------- 索引大小 ----------")
+        try:
+            # 更新持久化统计信息，保证新建索引的页数准确
+            for table in self.index_tables:
+                self.cursor.execute(f"ANALYZE TABLE {table}")
+                self.cursor.fetchall()
+            page_size = int(read_variable(self.conn, 'innodb_page_size'))
+            buffer_pool_size = int(read_variable(self.conn, 'innodb_buffer_pool_size'))
+            
+            placeholders = ", ".join(["%s"] * len(self.index_tables))
+            # 分区表的统计信息按分区记录（表名为 orders#p#p202401），按表汇总
+            self.cursor.execute(f"""
+            SELECT SUBSTRING_INDEX(table_name, '#', 1) AS table_name, index_name, stat_name,
+                   SUM(stat_value) AS stat_value
+            FROM mysql.innodb_index_stats
+            WHERE database_name = %s
+            AND SUBSTRING_INDEX(table_name, '#', 1) IN ({placeholders})
+            AND stat_name IN ('size', 'n_leaf_pages')
+            GROUP BY SUBSTRING_INDEX(table_name, '#', 1), index_name, stat_name
+            """, (DB_CONFIG['database'],) + self.index_tables)
+            indexes = {}
+            for row in self.cursor.fetchall():
+                index = indexes.setdefault((row['table_name'], row['index_name']), {
+                    'table': row['table_name'],
+                    'index': row['index_name']
+                })
+                index['pages' if row['stat_name'] == 'size' else 'leaf_pages'] = int(row['stat_value'])
+            for index in indexes.values():
+                index['bytes'] = index.get('pages', 0) * page_size
+                index['mb'] = index['bytes'] / 1024 / 1024
+            
+            self.cursor.execute(f"""
+            SELECT TABLE_NAME AS table_name, DATA_LENGTH AS data_length, INDEX_LENGTH AS index_length
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME IN ({placeholders})
+            """, (DB_CONFIG['database'],) + self.index_tables)
+            tables = {row['table_name']: {'data_length': int(row['data_length']), 'index_length': int(row['index_length'])}
+                      for row in self.cursor.fetchall()}
+            state = self.index_state.read_state()
+        except Exception as e:
+            print(f"统计索引大小时出错: {e}")
+            return
+        
+        # 主键（聚簇索引）就是表数据，只统计二级索引；不可见索引不属于当前策略，单独统计
+        for (table, name), index in indexes.items():
+            index['visible'] = state[(table, name)]['visible'] if (table, name) in state else True
+        secondary = [index for index in indexes.values() if index['index'] != 'PRIMARY' and index['visible']]
+        secondary_bytes = sum(index['bytes'] for index in secondary)
+        invisible_bytes = sum(index['bytes'] for index in indexes.values() if not index['visible'])
+        sizes = {
+            'page_size': page_size,
+            'buffer_pool_bytes': buffer_pool_size,
+            'indexes': sorted(indexes.values(), key=lambda index: (index['table'], index['index'])),
+            'tables': tables,
+            'secondary_index_bytes': secondary_bytes,
+            'secondary_index_mb': secondary_bytes / 1024 / 1024,
+            'invisible_index_bytes': invisible_bytes,
+            'buffer_pool_ratio': secondary_bytes / buffer_pool_size if buffer_pool_size else None
+        }
+        self.results.setdefault('index_sizes', {})[strategy] = sizes
+        
+        for index in secondary:
+            print(f"{index['table']}.{index['index']}: {index['mb']:.2f} MB "
+                  f"（{index.get('pages', 0):,} 页，叶子页 {index.get('leaf_pages', 0):,}）")
+        for table, size in tables.items():
+            print(f"{table}: 数据 {size['data_length'] / 1024 / 1024:.2f} MB, 索引 {size['index_length'] / 1024 / 1024:.2f} MB")
+        print(f"二级索引合计: {sizes['secondary_index_mb']:.2f} MB，占缓冲池的 {sizes['buffer_pool_ratio']:.1%}")
+        if invisible_bytes:
+            print(f"不可见索引（不计入合计）: {invisible_bytes / 1024 / 1024:.2f} MB")
+            
+    def get_strategy_cases(self, strategy):
+        """返回该索引策略下的测试用例列表[(查询ID, 名称, 查询, 参数池)]，没有参数的查询参数池为None
         
-        result = self.run_test_case(
-            name="用户订单联表查询（无索引）",
-            query=query,
-            params=(700,)  # 信用分大于700
-        )
-        self.results['no_indexes'].append(result)
-        
-        # 测试用例4：按产品类别统计订单数量
-        query = """
-        SELECT p.category, COUNT(*) as order_count, SUM(o.total_price) as total_sales
-        FROM products p
-        JOIN orders o ON p.id = o.product_id
-        GROUP BY p.category
+        每个查询的参数池只抽样一次，所有策略按相同顺序使用相同的参数，保证结果可比
         """
-        
-        result = self.run_test_case(
-            name="按产品类别统计订单（无索引）",
-            query=query
-        )
-        self.results['no_indexes'].append(result)
-        
-    def test_single_column_indexes(self):
-        """测试单列索引"""
-        print("\n==================== 测试单列索引 ====================")
-        
-        # 删除所有非主键索引
-        self.drop_all_indexes("users")
-        self.drop_all_indexes("products")
-        self.drop_all_indexes("orders")
-        
-        # 创建单列索引
-        self.create_index("users", ["username"], "idx_username")
-        self.create_index("users", ["registration_date"], "idx_registration_date")
-        self.create_index("users", ["credit_score"], "idx_credit_score")
-        self.create_index("products", ["category"], "idx_category")
+        label = self.get_strategy(strategy)['label']
+        cases = []
+        for query in self.spec['queries']:
+            if query['id'] not in self.case_params:
+                self.case_params[query['id']] = ParamPool(self.cursor, query) if query['params'] else None
+            cases.append((query['id'], f"{query['name']}（{label}）", render_query(query, strategy),
+                          self.case_params[query['id']]))
+        return cases
+        
+    def run_strategy(self, strategy, title):
+        """创建索引策略的索引并运行其全部测试用例"""
+        print(f"\n==================== {title} ====================")
+        self.apply_strategy(strategy)
+        self.collect_index_sizes(strategy)
         
         # 存储测试结果
-        self.results['single_column_indexes'] = []
-        
-        # 测试用例1：按用户名查询
-        query = "SELECT * FROM users FORCE INDEX (idx_username) WHERE username = %s"
-        # 随机选择一个存在的用户名
-        self.cursor.execute("SELECT username FROM users ORDER BY RAND() LIMIT 1")
-        random_username = self.cursor.fetchone()['username']
-        
-        result = self.run_test_case(
-            name="按用户名查询（单列索引）",
-            query=query,
-            params=(random_username,)
-        )
-        self.results['single_column_indexes'].append(result)
-        
-        # 测试用例2：按用户注册日期范围查询
-        query = """
-        SELECT * FROM users FORCE INDEX (idx_registration_date)
-        WHERE registration_date BETWEEN %s AND %s
-        """
-        # 选择一个日期范围
-        now = datetime.now()
-        start_date = now - timedelta(days=random.randint(365, 730))
-        end_date = now - timedelta(days=random.randint(0, 300))
-        
-        result = self.run_test_case(
-            name="按用户注册日期范围查询（单列索引）",
-            query=query,
-            params=(start_date, end_date)
-        )
-        self.results['single_column_indexes'].append(result)
-        
-        # 测试用例3：用户订单联表查询
-        query = """
-        SELECT u.username, o.order_date, o.total_price
-        FROM users u FORCE INDEX (idx_credit_score)
-        JOIN orders o ON u.id = o.user_id
-        WHERE u.credit_score > %s
-        LIMIT 1000
-        """
-        
-        result = self.run_test_case(
-            name="用户订单联表查询（单列索引）",
-            query=query,
-            params=(700,)
-        )
-        self.results['single_column_indexes'].append(result)
-        
-        # 测试用例4：按产品类别统计订单
-        query = """
-        SELECT p.category, COUNT(*) as order_count, SUM(o.total_price) as total_sales
-        FROM products p FORCE INDEX (idx_category)
-        JOIN orders o ON p.id = o.product_id
-        GROUP BY p.category
-        """
-        
-        result = self.run_test_case(
-            name="按产品类别统计订单（单列索引）",
-            query=query
-        )
-        self.results['single_column_indexes'].append(result)
-        
-    def test_multi_column_indexes(self):
-        """测试多列（联合）索引"""
-        print("\n==================== 测试多列（联合）索引 ====================")
-        
-        # 删除所有非主键索引
-        self.drop_all_indexes("users")
-        self.drop_all_indexes("products")
-        self.drop_all_indexes("orders")
+        self.results[strategy] = []
+        for case_id, name, query, pool in self.get_strategy_cases(strategy):
+            params = pool.sequence[0] if pool else None
+            param_sequence = pool.sequence if pool and not self.fixed_params else None
+            result = self.run_test_case(name=name, query=query, params=params, param_sequence=param_sequence)
+            result['case_id'] = case_id
+            if self.optimizer_choice:
+                self.test_optimizer_choice(strategy, case_id, name, result, param_sequence)
+            self.results[strategy].append(result)
+        
+        # 同一组索引下的写入代价
+        if self.write_benchmark:
+            self.test_write_costs(strategy)
+        
+    def test_optimizer_choice(self, strategy, case_id, name, forced_result, param_sequence=None):
+        """不加索引提示执行同一查询，记录优化器选择的计划，并标记比强制索引更慢的选择"""
+        query = next(query for query in self.spec['queries'] if query['id'] == case_id)
+        unhinted_query = render_query(query, None)
+        if unhinted_query == forced_result['query']:
+            # 该策略下没有索引提示，测到的就是优化器的选择
+            return
+        params = forced_result.get('params')
+        unhinted_result = self.run_test_case(name=f"{name}（优化器选择）", query=unhinted_query, params=params,
+                                             param_sequence=param_sequence)
+        choice = compare_choice(forced_result, unhinted_result, significant)
+        print(f"优化器选择: {choice['chosen_plan']}，强制索引: {choice['forced_plan']}"
+              + (f"，耗时为强制索引的 {choice['slowdown']:.2f} 倍" if choice['slowdown'] else ""))
+        if choice['slower_plan']:
+            print(f"注意: 优化器为{name}选择了比强制索引更慢的计划")
+            if self.optimizer_trace:
+                try:
+                    trace, missing = capture_optimizer_trace(self.conn, unhinted_query, params)
+                    choice['optimizer_trace'] = trace
+                    choice['trace_missing_bytes'] = missing
+                    choice['considered_access_paths'] = considered_access_paths(trace)
+                except Exception as e:
+                    print(f"读取optimizer_trace时出错: {e}")
+        forced_result['optimizer_choice'] = choice
+        
+    def report_optimizer_choices(self):
+        """汇总优化器选择了更慢计划的用例"""
+        slower = [case for strategy in self.spec['strategies'] for case in self.results.get(strategy['id'], [])
+                  if case.get('optimizer_choice', {}).get('slower_plan')]
+        compared = sum(1 for strategy in self.spec['strategies'] for case in self.results.get(strategy['id'], [])
+                       if 'optimizer_choice' in case)
+        print(f"\n优化器选择: 对比 {compared} 个带索引提示的用例，{len(slower)} 个选择了更慢的计划")
+        for case in slower:
+            choice = case['optimizer_choice']
+            print(f"{case['name']}: 优化器使用 {choice['chosen_plan']}，强制索引为 {choice['forced_plan']}"
+                  + (f"，耗时为强制索引的 {choice['slowdown']:.2f} 倍" if choice['slowdown'] else ""))
+        
+    def test_write_costs(self, strategy):
+        """测试当前索引策略下的写入代价（批量插入、索引列更新、删除）"""
+        print(f"\n---------- 写入代价: {strategy} ----------")
+        try:
+            write_costs = WriteBenchmark(self.conn).run()
+        except Exception as e:
+            print(f"写入测试时出错: {e}")
+            return
+        self.results.setdefault('write_costs', {})[strategy] = write_costs
+        
+    def test_partitioning(self):
+        """对比分区表和非分区表上按日期范围查询的执行计划（访问的分区）和耗时"""
+        print("\n==================== 测试分区裁剪 ====================")
+        
+        self.cursor.execute("SELECT MIN(order_date) AS min_date, MAX(order_date) AS max_date FROM orders")
+        dates = self.cursor.fetchone()
+        min_date, max_date = dates['min_date'], dates['max_date']
+        if not max_date:
+            print("订单表没有数据，跳过分区测试")
+            return
+        
+        # 创建数据相同的对照表：订单表已分区时对照表不分区，否则对照表分区
+        scheme, _ = table_partitions(self.cursor, "orders")
+        shadow = "orders_unpartitioned" if scheme else "orders_partitioned"
+        try:
+            self.cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            self.cursor.execute(f"CREATE TABLE {shadow} LIKE orders")
+            # 对照表只保留主键（订单表的索引由索引状态管理，不能删除），减少复制数据的开销
+            self.drop_all_indexes(shadow)
+            if scheme:
+                self.cursor.execute(f"ALTER TABLE {shadow} REMOVE PARTITIONING")
+            else:
+                for statement in partition_table_statements(shadow, PARTITION_TEST_SCHEME, min_date, max_date):
+                    self.cursor.execute(statement)
+            start_time = time.time()
+            self.cursor.execute(f"INSERT INTO {shadow} SELECT * FROM orders")
+            self.conn.commit()
+            print(f"已创建对照表 {shadow}，复制数据耗时: {time.time() - start_time:.2f}秒")
+        except Exception as e:
+            print(f"创建分区对照表时出错: {e}")
+            self.cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            return
+        
+        partitioned_table, unpartitioned_table = ("orders", shadow) if scheme else (shadow, "orders")
+        scheme, partitions = table_partitions(self.cursor, partitioned_table)
+        print(f"分区表: {partitioned_table}（{scheme}分区，共 {len(partitions)} 个分区），非分区表: {unpartitioned_table}")
+        self.results['partition_layout'] = {
+            'scheme': scheme,
+            'partitions': partitions,
+            'partitioned_table': partitioned_table,
+            'unpartitioned_table': unpartitioned_table
+        }
         
-        # 创建联合索引
-        self.create_index("users", ["username", "credit_score"], "idx_username_credit_score")
-        self.create_index("users", ["registration_date", "status"], "idx_registration_date_status")
-        self.create_index("orders", ["user_id", "product_id"], "idx_user_id_product_id")
-        self.create_index("products", ["category", "price"], "idx_category_price")
+        # 按日期范围查询的测试用例（名称, 查询, 最近多少天）；两张表都强制使用主键，对比分区裁剪与全表扫描
+        test_cases = [
+            ("最近7天订单汇总", """
+            SELECT COUNT(*) AS order_count, SUM(total_price) AS total_sales
+            FROM {table} FORCE INDEX (PRIMARY)
+            WHERE order_date BETWEEN %s AND %s
+            """, 7),
+            ("最近一个月按状态统计订单", """
+            SELECT status, COUNT(*) AS order_count
+            FROM {table} FORCE INDEX (PRIMARY)
+            WHERE order_date BETWEEN %s AND %s
+            GROUP BY status
+            """, 30),
+            ("最近一个季度按支付方式统计订单", """
+            SELECT payment_method, COUNT(*) AS order_count, SUM(total_price) AS total_sales
+            FROM {table} FORCE INDEX (PRIMARY)
+            WHERE order_date BETWEEN %s AND %s
+            GROUP BY payment_method
+            """, 90)
+        ]
         
         # 存储测试结果
-        self.results['multi_column_indexes'] = []
-        
-        # 测试用例1：按用户名和信用分查询
-        query = "SELECT * FROM users FORCE INDEX (idx_username_credit_score) WHERE username = %s AND credit_score > %s"
-        # 随机选择一个存在的用户名
-        self.cursor.execute("SELECT username FROM users ORDER BY RAND() LIMIT 1")
-        random_username = self.cursor.fetchone()['username']
-        
-        result = self.run_test_case(
-            name="按用户名和信用分查询（联合索引）",
-            query=query,
-            params=(random_username, 500)
-        )
-        self.results['multi_column_indexes'].append(result)
-        
-        # 测试用例2：按用户注册日期和状态查询
-        query = """
-        SELECT * FROM users FORCE INDEX (idx_registration_date_status)
-        WHERE registration_date BETWEEN %s AND %s
-        AND status = %s
-        """
-        # 选择一个日期范围
-        now = datetime.now()
-        start_date = now - timedelta(days=random.randint(365, 730))
-        end_date = now - timedelta(days=random.randint(0, 300))
-        
-        result = self.run_test_case(
-            name="按用户注册日期和状态查询（联合索引）",
-            query=query,
-            params=(start_date, end_date, 'active')
-        )
-        self.results['multi_column_indexes'].append(result)
-        
-        # 测试用例3：用户订单联表查询（使用联合索引）
-        query = """
-        SELECT u.username, o.order_date, o.total_price
-        FROM users u
-        JOIN orders o FORCE INDEX (idx_user_id_product_id) ON u.id = o.user_id AND o.product_id = %s
-        WHERE u.credit_score > %s
-        LIMIT 1000
-        """
-        # 随机选择一个存在的产品ID
-        self.cursor.execute("SELECT id FROM products ORDER BY RAND() LIMIT 1")
-        random_product_id = self.cursor.fetchone()['id']
-        
-        result = self.run_test_case(
-            name="用户订单联表查询（联合索引）",
-            query=query,
-            params=(random_product_id, 700)
-        )
-        self.results['multi_column_indexes'].append(result)
-        
-        # 测试用例4：按产品类别和价格范围统计订单
-        query = """
-        SELECT p.category, COUNT(*) as order_count, SUM(o.total_price) as total_sales
-        FROM products p FORCE INDEX (idx_category_price)
-        JOIN orders o ON p.id = o.product_id
-        WHERE p.category = %s AND p.price BETWEEN %s AND %s
-        GROUP BY p.category
-        """
-        # 随机选择一个产品类别
-        self.cursor.execute("SELECT DISTINCT category FROM products ORDER BY RAND() LIMIT 1")
-        random_category = self.cursor.fetchone()['category']
+        self.results['partitioning'] = []
+        try:
+            for base_name, query, days in test_cases:
+                params = (max_date - timedelta(days=days), max_date)
+                for table, partitioned in ((partitioned_table, True), (unpartitioned_table, False)):
+                    result = self.run_test_case(
+                        name=f"{base_name}（{'分区表' if partitioned else '非分区表'}）",
+                        query=query.format(table=table),
+                        params=params
+                    )
+                    result['table'] = table
+                    result['partitioned'] = partitioned
+                    if partitioned:
+                        result['partitions_scanned'] = self.scanned_partitions(result['explain'])
+                        result['total_partitions'] = len(partitions)
+                        print(f"访问分区: {len(result['partitions_scanned'])}/{len(partitions)} "
+                              f"({', '.join(result['partitions_scanned'])})")
+                    self.results['partitioning'].append(result)
+        finally:
+            # 删除对照表
+            self.cursor.execute(f"DROP TABLE IF EXISTS {shadow}")
+            self.conn.commit()
         
-        result = self.run_test_case(
-            name="按产品类别和价格范围统计订单（联合索引）",
-            query=query,
-            params=(random_category, 100, 5000)
-        )
-        self.results['multi_column_indexes'].append(result)
+        # 输出对比
+        print("\n分区表相对非分区表的耗时:")
+        cases = self.results['partitioning']
+        for partitioned_case, unpartitioned_case in zip(cases[::2], cases[1::2]):
+            ratio = partitioned_case['avg_time'] / unpartitioned_case['avg_time'] if unpartitioned_case['avg_time'] else 0
+            print(f"{partitioned_case['name'].split('（')[0]}: {ratio:.2f}倍, "
+                  f"访问 {len(partitioned_case['partitions_scanned'])}/{len(partitions)} 个分区")
+        
+    def scanned_partitions(self, explain_results):
+        """从EXPLAIN结果中提取查询访问的分区"""
+        scanned = []
+        for row in explain_results or []:
+            if row.get('partitions'):
+                scanned.extend(row['partitions'].split(','))
+        return scanned
         
     def visualize_results(self, timestamp):
-        """可视化测试结果"""
+        """可视化测试结果：按配置中的基准策略和其他各索引策略对比"""
         print("\n生成测试结果可视化...")
         
-        # 准备数据
-        categories = []
-        no_index_times = []
-        single_index_times = []
-        multi_index_times = []
-        
-        # 按测试用例名称匹配结果
-        for no_idx_test in self.results.get('no_indexes', []):
-            test_name = no_idx_test['name']
-            base_name = test_name.split('（')[0]  # 提取基本名称
-            
-            # 查找对应的单列索引和多列索引测试结果
-            single_idx_test = next((t for t in self.results.get('single_column_indexes', []) 
-                                   if t['name'].startswith(base_name)), None)
-            multi_idx_test = next((t for t in self.results.get('multi_column_indexes', []) 
-                                  if t['name'].startswith(base_name)), None)
-            
-            if single_idx_test and multi_idx_test:
-                categories.append(base_name)
-                no_index_times.append(no_idx_test['avg_time'])
-                single_index_times.append(single_idx_test['avg_time'])
-                multi_index_times.append(multi_idx_test['avg_time'])
+        # 按测试用例ID匹配基准策略和其他策略的结果
+        baseline, labels, others, matched = match_strategy_cases(self.results)
+        if not matched or not others:
+            print("没有可对比的测试用例（需要基准策略和至少一种其他策略的结果），跳过可视化")
+            return
+        categories = [name for name, _, _ in matched]
+        baseline_times = [case_time(base_test) for _, base_test, _ in matched]
+        strategy_times = {strategy: [case_time(tests[strategy]) for _, _, tests in matched] for strategy in others}
         
         # 创建柱状图
         fig, ax = plt.subplots(figsize=(12, 8))
         
         x = range(len(categories))
-        width = 0.25
+        width = 0.8 / (len(others) + 1)
         
-        ax.bar([i - width for i in x], no_index_times, width, label='无索引')
-        ax.bar(x, single_index_times, width, label='单列索引')
-        ax.bar([i + width for i in x], multi_index_times, width, label='联合索引')
+        for i, (strategy, times) in enumerate([(baseline, baseline_times)] + list(strategy_times.items())):
+            ax.bar([j + (i - len(others) / 2) * width for j in x], times, width, label=labels[strategy])
         
-        ax.set_ylabel('平均查询时间（秒）')
+        ax.set_ylabel('查询时间中位数（秒）')
         ax.set_title('不同索引策略下的查询性能对比')
         ax.set_xticks(x)
         ax.set_xticklabels(categories, rotation=45, ha='right')
@@ -527,34 +839,38 @@ class IndexTester:
         plt.savefig(chart_file)
         print(f"图表已保存到: {chart_file}")
         
-        # 计算性能提升百分比
+        # 计算性能提升百分比和每MB二级索引缩短的查询时间（毫秒）
         improvements = []
+        index_mb = {strategy: sizes['secondary_index_mb']
+                    for strategy, sizes in self.results.get('index_sizes', {}).items()}
         
-        for i in range(len(categories)):
-            no_idx_time = no_index_times[i]
-            single_idx_time = single_index_times[i]
-            multi_idx_time = multi_index_times[i]
-            
-            single_improvement = (no_idx_time - single_idx_time) / no_idx_time * 100
-            multi_improvement = (no_idx_time - multi_idx_time) / no_idx_time * 100
-            
+        def gain_per_mb(strategy, base_time, idx_time):
+            if not index_mb.get(strategy):
+                return None
+            return (base_time - idx_time) * 1000 / index_mb[strategy]
+        
+        for i, (name, base_test, tests) in enumerate(matched):
+            base_time = baseline_times[i]
             improvements.append({
-                'test_case': categories[i],
-                'single_column_improvement': single_improvement,
-                'multi_column_improvement': multi_improvement
+                'test_case': name,
+                'case_id': case_key_for(base_test),
+                'improvements': {strategy: (base_time - strategy_times[strategy][i]) / base_time * 100
+                                 if base_time else 0 for strategy in others},
+                'significant': {strategy: significant(base_test, tests[strategy]) for strategy in others},
+                'gain_per_mb': {strategy: gain_per_mb(strategy, base_time, strategy_times[strategy][i])
+                                for strategy in others}
             })
         
         # 创建性能提升百分比图表
         fig, ax = plt.subplots(figsize=(12, 8))
         
-        single_improvements = [imp['single_column_improvement'] for imp in improvements]
-        multi_improvements = [imp['multi_column_improvement'] for imp in improvements]
-        
-        ax.bar([i - width/2 for i in x], single_improvements, width, label='单列索引')
-        ax.bar([i + width/2 for i in x], multi_improvements, width, label='联合索引')
+        width = 0.8 / len(others)
+        for i, strategy in enumerate(others):
+            ax.bar([j + (i - (len(others) - 1) / 2) * width for j in x],
+                   [imp['improvements'][strategy] for imp in improvements], width, label=labels[strategy])
         
         ax.set_ylabel('性能提升百分比（%）')
-        ax.set_title('不同索引策略的性能提升百分比（相对于无索引）')
+        ax.set_title(f'不同索引策略的性能提升百分比（相对于{labels[baseline]}，按中位数计算）')
         ax.set_xticks(x)
         ax.set_xticklabels(categories, rotation=45, ha='right')
         ax.legend()
@@ -566,17 +882,32 @@ class IndexTester:
         print(f"性能提升百分比图表已保存到: {improvement_file}")
         
         # 计算平均提升百分比
-        avg_single_improvement = sum(single_improvements) / len(single_improvements)
-        avg_multi_improvement = sum(multi_improvements) / len(multi_improvements)
-        
-        print(f"\n单列索引平均性能提升: {avg_single_improvement:.2f}%")
-        print(f"联合索引平均性能提升: {avg_multi_improvement:.2f}%")
+        avg_improvements = {strategy: sum(imp['improvements'][strategy] for imp in improvements) / len(improvements)
+                            for strategy in others}
+        
+        print()
+        for strategy, avg_improvement in avg_improvements.items():
+            print(f"{labels[strategy]}平均性能提升: {avg_improvement:.2f}%")
+        for imp in improvements:
+            for strategy in others:
+                if imp['significant'][strategy] is False:
+                    print(f"注意: {imp['test_case']}的{labels[strategy]}提升不显著"
+                          f"（置信区间与{labels[baseline]}重叠）")
+        
+        # 读性能提升对应的写入代价
+        overhead = write_overhead(self.results.get('write_costs', {}), baseline)
+        for strategy, cases in overhead.items():
+            for case_name, change in cases.items():
+                print(f"{labels.get(strategy, strategy)} {case_name}: 写入速度变化 {change['rows_per_sec_change']:+.2f}%, "
+                      f"redo为{labels[baseline]}的 {change['redo_ratio']:.2f} 倍")
         
         # 保存提升数据
         improvement_data = {
+            'baseline': baseline,
+            'strategies': {strategy: labels[strategy] for strategy in others},
             'improvements': improvements,
-            'avg_single_improvement': avg_single_improvement,
-            'avg_multi_improvement': avg_multi_improvement
+            'avg_improvements': avg_improvements,
+            'write_overhead': overhead
         }
         
         improvement_data_file = os.path.join(RESULT_DIR, f"index_improvement_data_{timestamp}.json")
@@ -587,7 +918,41 @@ def main():
     """主函数"""
     print("========== MySQL索引测试 - 索引测试框架 ==========")
     
-    tester = IndexTester()
+    parser = argparse.ArgumentParser(description="测试不同索引策略下的查询性能")
+    parser.add_argument("--cache-mode", choices=list(CACHE_MODES) + ["both"], default="both",
+                        help="缓存状态: warm为预读后测量, cold为每次执行前清空缓冲池, both为两者都测（默认为both）")
+    parser.add_argument("--evict-method", choices=EVICT_METHODS, default="scan",
+                        help="冷缓存清空缓冲池的方式: scan为扫描比缓冲池更大的填充表, "
+                             "restart为执行环境变量MYSQL_RESTART_COMMAND中的重启命令（默认为scan）")
+    parser.add_argument("--skip-writes", action="store_true", help="不测试各索引策略下的写入代价")
+    parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    parser.add_argument("--build-algorithm", choices=["INPLACE", "COPY", "DEFAULT"], default=BUILD_ALGORITHM,
+                        help=f"创建索引的ALGORITHM（默认为{BUILD_ALGORITHM}，不支持时退回DEFAULT）")
+    parser.add_argument("--build-lock", choices=["NONE", "SHARED", "EXCLUSIVE", "DEFAULT"], default=BUILD_LOCK,
+                        help=f"创建索引的LOCK（默认为{BUILD_LOCK}，不支持时退回DEFAULT）")
+    parser.add_argument("--build-load", type=int, nargs="?", const=BACKGROUND_WORKERS, default=0,
+                        help=f"创建索引期间运行后台DML负载的线程数（只写--build-load时为{BACKGROUND_WORKERS}）")
+    parser.add_argument("--index-state", choices=INDEX_STATE_MODES,
+                        help="切换索引策略时多余索引的处理方式: invisible为设为不可见（MySQL 8.0+）, drop为删除"
+                             "（默认测试写入代价时为drop，否则为invisible）")
+    parser.add_argument("--optimizer-choice", action="store_true",
+                        help="带索引提示的用例再不加提示执行一次，记录优化器选择的计划并标记比强制索引更慢的选择")
+    parser.add_argument("--optimizer-trace", action="store_true",
+                        help="同--optimizer-choice，并记录优化器选择了更慢计划的用例的optimizer_trace")
+    parser.add_argument("--fixed-params", action="store_true",
+                        help="每次执行都使用同一组参数（默认每次执行从参数池中取下一组参数）")
+    parser.add_argument("--dataset", help="数据集标签，记录在结果中（如scale0.1）")
+    parser.add_argument("--partition-test", action="store_true",
+                        help="运行分区裁剪测试（复制一份订单表作为分区/非分区对照表，数据量大时较慢）")
+    args = parser.parse_args()
+    cache_modes = CACHE_MODES if args.cache_mode == "both" else (args.cache_mode,)
+    
+    tester = IndexTester(cache_modes, args.evict_method, write_benchmark=not args.skip_writes,
+                         build_algorithm=args.build_algorithm, build_lock=args.build_lock,
+                         build_background_workers=args.build_load, case_spec=args.cases,
+                         index_state=args.index_state, optimizer_choice=args.optimizer_choice,
+                         optimizer_trace=args.optimizer_trace, fixed_params=args.fixed_params,
+                         dataset=args.dataset, partition_test=args.partition_test)
     
     try:
         # 运行索引测试
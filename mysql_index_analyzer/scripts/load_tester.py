@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 并发压测
+在每种索引策略下，由多个工作线程（各自独立的数据库连接）按权重随机执行该策略的测试查询，
+持续固定时长或固定请求数，统计吞吐量、延迟百分位（整体和按秒）以及错误
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from datetime import datetime
+
+import numpy as np
+import mysql.connector
+import matplotlib.pyplot as plt
+
+# 配置matplotlib支持中文显示
+plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans']
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+plt.rcParams['font.family'] = 'sans-serif'
+
+# 配置
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+RESULT_DIR = os.path.join(PROJECT_DIR, "data")  # 结果保存目录
+VISUALIZATION_DIR = os.path.join(PROJECT_DIR, "visualization")  # 可视化结果保存目录
+
+# 确保结果目录存在
+os.makedirs(RESULT_DIR, exist_ok=True)
+os.makedirs(VISUALIZATION_DIR, exist_ok=True)
+
+# 压测配置
+DEFAULT_WORKERS = 8  # 默认并发线程数
+DEFAULT_DURATION = 30  # 默认压测时长（秒）
+BUCKET_SECONDS = 1  # 按时间统计的时间窗口（秒）
+PERCENTILES = (50, 95, 99)
+MAX_ERROR_SAMPLES = 5  # 每种错误保留的示例数
+
+
+class LoadRunner:
+    """多线程按权重执行一组查询，记录每个请求的完成时间、延迟和错误"""
+
+    def __init__(self, db_config, cases, weights=None, workers=DEFAULT_WORKERS, duration=None, requests=None,
+                 rate=None, seed=None):
+        """cases为[(名称, 查询, 参数)]，参数可以是接收random.Random返回参数的函数（每次请求重新生成）；
+        weights为与cases对应的权重；run()需要指定duration（秒）或requests，start()/stop()可以不指定；
+        rate为总的目标QPS，为空时每个线程执行完一个请求立即执行下一个
+        """
+        self.db_config = db_config
+        self.cases = cases
+        self.weights = weights or [1] * len(cases)
+        self.workers = max(workers, 1)
+        self.duration = duration
+        self.requests = requests
+        self.rate = rate
+        self.seed = seed
+        self.lock = threading.Lock()
+        self.issued = 0
+        self.records = []  # (完成时间偏移, 用例下标, 延迟秒数, 错误信息)
+        self.stopped = threading.Event()
+        self.threads = []
+        self.start_time = [0.0]
+
+    def _next_request(self):
+        """领取一个请求名额，达到请求数时返回False"""
+        with self.lock:
+            if self.requests and self.issued >= self.requests:
+                return False
+            self.issued += 1
+            return True
+
+    def _worker(self, index, start, deadline, barrier):
+        """工作线程：独立连接，按权重选择查询并执行"""
+        rng = random.Random(None if self.seed is None else self.seed + index)
+        records = []
+        conn = None
+        try:
+            conn = mysql.connector.connect(**self.db_config)
+            # 每条语句自动提交，不长时间持有事务快照和元数据锁（否则会阻塞并发的DDL）
+            conn.autocommit = True
+            cursor = conn.cursor()
+        except Exception as e:
+            records.append((0.0, -1, 0.0, f"连接失败: {e}"))
+            barrier.wait()
+            with self.lock:
+                self.records.extend(records)
+            return
+
+        barrier.wait()
+        # 限速时每个线程按固定间隔发出请求，延迟从计划发出时间算起，避免服务端变慢时少算排队时间
+        interval = self.workers / self.rate if self.rate else 0
+        scheduled = start[0] + rng.random() * interval
+        try:
+            while True:
+                if interval:
+                    now = time.perf_counter()
+                    if scheduled > now:
+                        time.sleep(scheduled - now)
+                if self.stopped.is_set() or (deadline[0] and time.perf_counter() >= deadline[0]):
+                    break
+                if not self._next_request():
+                    break
+                case_index = rng.choices(range(len(self.cases)), self.weights)[0]
+                _, query, params = self.cases[case_index]
+                if callable(params):
+                    params = params(rng)
+                begin = scheduled if interval else time.perf_counter()
+                error = None
+                try:
+                    cursor.execute(query, params)
+                    cursor.fetchall()
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    # 连接断开时重新连接
+                    if not conn.is_connected():
+                        conn = mysql.connector.connect(**self.db_config)
+                        conn.autocommit = True
+                        cursor = conn.cursor()
+                finished = time.perf_counter()
+                records.append((finished - start[0], case_index, finished - begin, error))
+                scheduled += interval
+        finally:
+            conn.close()
+            with self.lock:
+                self.records.extend(records)
+
+    def start(self):
+        """在后台启动工作线程，所有线程建立连接后同时开始"""
+        deadline = [0.0]
+        barrier = threading.Barrier(self.workers + 1)
+        self.threads = [threading.Thread(target=self._worker, args=(i, self.start_time, deadline, barrier),
+                                         daemon=True)
+                        for i in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+        self.start_time[0] = time.perf_counter()
+        deadline[0] = self.start_time[0] + self.duration if self.duration else 0
+        barrier.wait()
+
+    def wait(self):
+        """等待工作线程结束，返回统计结果"""
+        for thread in self.threads:
+            thread.join()
+        elapsed = time.perf_counter() - self.start_time[0]
+        return summarize_records(self.records, self.cases, elapsed)
+
+    def stop(self):
+        """通知工作线程在当前请求完成后停止，返回统计结果"""
+        self.stopped.set()
+        return self.wait()
+
+    def run(self):
+        """执行压测，返回统计结果"""
+        if not self.duration and not self.requests:
+            raise ValueError("必须指定压测时长或请求数")
+        self.start()
+        return self.wait()
+
+
+def latency_percentiles(latencies):
+    """延迟的百分位（秒）"""
+    if not latencies:
+        return {f"p{p}": None for p in PERCENTILES}
+    values = np.percentile(latencies, PERCENTILES)
+    return {f"p{p}": float(value) for p, value in zip(PERCENTILES, values)}
+
+
+def summarize_records(records, cases, elapsed):
+    """汇总请求记录：整体、按用例和按时间窗口的吞吐量、延迟百分位和错误"""
+    ok = [record for record in records if record[3] is None]
+    errors = [record for record in records if record[3] is not None]
+    latencies = [record[2] for record in ok]
+
+    error_counts = {}
+    for record in errors:
+        key = record[3].split(':')[0]
+        entry = error_counts.setdefault(key, {'count': 0, 'samples': []})
+        entry['count'] += 1
+        if len(entry['samples']) < MAX_ERROR_SAMPLES:
+            entry['samples'].append(record[3])
+
+    per_case = []
+    for index, (name, _, _) in enumerate(cases):
+        case_latencies = [record[2] for record in ok if record[1] == index]
+        case_errors = sum(1 for record in errors if record[1] == index)
+        per_case.append(dict({
+            'name': name,
+            'requests': len(case_latencies) + case_errors,
+            'errors': case_errors,
+            'throughput': len(case_latencies) / elapsed if elapsed > 0 else 0,
+            'mean': float(np.mean(case_latencies)) if case_latencies else None
+        }, **latency_percentiles(case_latencies)))
+
+    # 按时间窗口统计，观察压测过程中延迟和吞吐量的变化
+    timeline = []
+    buckets = int(np.ceil(elapsed / BUCKET_SECONDS)) if elapsed > 0 else 0
+    for bucket in range(buckets):
+        low, high = bucket * BUCKET_SECONDS, (bucket + 1) * BUCKET_SECONDS
+        bucket_latencies = [record[2] for record in ok if low <= record[0] < high]
+        bucket_errors = sum(1 for record in errors if low <= record[0] < high)
+        timeline.append(dict({
+            'second': low,
+            'throughput': len(bucket_latencies) / BUCKET_SECONDS,
+            'errors': bucket_errors
+        }, **latency_percentiles(bucket_latencies)))
+
+    return dict({
+        'elapsed': elapsed,
+        'requests': len(records),
+        'errors': len(errors),
+        'throughput': len(ok) / elapsed if elapsed > 0 else 0,
+        'mean': float(np.mean(latencies)) if latencies else None,
+        'max': float(np.max(latencies)) if latencies else None,
+        'error_types': error_counts,
+        'cases': per_case,
+        'timeline': timeline
+    }, **latency_percentiles(latencies))
+
+
+def load_weights(weights_file, case_ids):
+    """读取权重配置 {查询ID: 权重}，未配置的查询权重为1"""
+    if not weights_file:
+        return None
+    with open(weights_file, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    return [config.get(case_id, 1) for case_id in case_ids]
+
+
+def plot_timeline(results, timestamp):
+    """绘制各索引策略压测过程中的吞吐量和p95延迟"""
+    fig, (ax_throughput, ax_latency) = plt.subplots(2, 1, figsize=(12, 10), sharex=True)
+    for strategy, result in results.items():
+        seconds = [bucket['second'] for bucket in result['timeline']]
+        ax_throughput.plot(seconds, [bucket['throughput'] for bucket in result['timeline']], label=strategy)
+        ax_latency.plot(seconds, [bucket['p95'] * 1000 if bucket['p95'] is not None else np.nan
+                                  for bucket in result['timeline']], label=strategy)
+    ax_throughput.set_ylabel('吞吐量（请求/秒）')
+    ax_throughput.set_title('不同索引策略下的并发压测')
+    ax_throughput.legend()
+    ax_latency.set_ylabel('p95延迟（毫秒）')
+    ax_latency.set_xlabel('时间（秒）')
+    ax_latency.legend()
+
+    chart_file = os.path.join(VISUALIZATION_DIR, f"load_test_timeline_{timestamp}.png")
+    plt.tight_layout()
+    plt.savefig(chart_file)
+    plt.close()
+    print(f"图表已保存到: {chart_file}")
+
+
+def format_ms(value):
+    """把秒转换为毫秒文本"""
+    return "-" if value is None else f"{value * 1000:.2f}ms"
+
+
+def main():
+    """主函数"""
+    # 索引测试框架也通过index_build使用LoadRunner，在这里导入以避免循环导入
+    from index_tester import IndexTester, DB_CONFIG
+
+    print("========== MySQL索引测试 - 并发压测 ==========")
+
+    parser = argparse.ArgumentParser(description="在不同索引策略下并发执行测试查询，统计吞吐量和延迟")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS,
+                        help=f"并发线程数，每个线程使用独立连接（默认为{DEFAULT_WORKERS}）")
+    parser.add_argument("--duration", type=float, help=f"每种策略的压测时长（秒，默认为{DEFAULT_DURATION}）")
+    parser.add_argument("--requests", type=int, help="每种策略的请求总数（与--duration同时指定时先达到者结束）")
+    parser.add_argument("--rate", type=float, help="目标总QPS（默认不限速）")
+    parser.add_argument("--weights", help="查询权重配置文件（JSON格式 {查询ID: 权重}，如 {\"user_by_username\": 5}），默认各查询权重相同")
+    parser.add_argument("--strategies", nargs="+", help="要压测的索引策略ID（默认为测试用例配置中的全部策略）")
+    parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    parser.add_argument("--seed", type=int, help="选择查询的随机种子")
+    args = parser.parse_args()
+    duration = args.duration or (None if args.requests else DEFAULT_DURATION)
+
+    # 压测只执行查询，多余的索引设为不可见即可，按索引重建代价最小的顺序执行全部策略
+    tester = IndexTester(cache_modes=('warm',), write_benchmark=False, case_spec=args.cases)
+    strategies = args.strategies or tester.index_state.order(
+        [(strategy['id'], strategy['indexes']) for strategy in tester.spec['strategies']])
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    results = {}
+    try:
+        for strategy in strategies:
+            print(f"\n==================== 压测: {strategy} ====================")
+            tester.apply_strategy(strategy)
+            case_ids, names, queries, pools = zip(*tester.get_strategy_cases(strategy))
+            # 每个请求从参数池中抽取一组新参数
+            cases = [(name, query, pool.draw if pool else None) for name, query, pool in zip(names, queries, pools)]
+            runner = LoadRunner(DB_CONFIG, cases, load_weights(args.weights, case_ids), args.workers,
+                                duration, args.requests, args.rate, args.seed)
+            result = runner.run()
+            result.update({'workers': args.workers, 'rate': args.rate})
+            for case, case_id in zip(result['cases'], case_ids):
+                case['case_id'] = case_id
+            results[strategy] = result
+
+            print(f"请求数: {result['requests']:,}, 错误: {result['errors']:,}, "
+                  f"吞吐量: {result['throughput']:.1f} 请求/秒, 耗时: {result['elapsed']:.1f}秒")
+            print(f"延迟 p50: {format_ms(result['p50'])}, p95: {format_ms(result['p95'])}, "
+                  f"p99: {format_ms(result['p99'])}, 最大: {format_ms(result['max'])}")
+            for case in result['cases']:
+                print(f"  - {case['name']}: {case['requests']:,} 次, {case['throughput']:.1f} 请求/秒, "
+                      f"p95: {format_ms(case['p95'])}, 错误: {case['errors']}")
+            for error_type, entry in result['error_types'].items():
+                print(f"  错误 {error_type}: {entry['count']} 次，例如: {entry['samples'][0]}")
+    except KeyboardInterrupt:
+        print("\n压测被用户中断")
+    except Exception as e:
+        print(f"\n压测时出错: {e}")
+    finally:
+        tester.close_connection()
+
+    if not results:
+        sys.exit(1)
+
+    result_file = os.path.join(RESULT_DIR, f"load_test_results_{timestamp}.json")
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\n压测结果已保存到: {result_file}")
+    plot_timeline(results, timestamp)
+
+
+if __name__ == "__main__":
+    main()
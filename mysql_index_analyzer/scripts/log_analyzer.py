@@ -17,7 +17,10 @@ import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
 import sqlparse
 import mysql.connector
+import heapq
 from collections import defaultdict, Counter
+from query_fingerprint import query_digest
+from results_store import ResultsStore
 
 # 配置matplotlib支持中文显示
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans']
@@ -40,6 +43,10 @@ PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 RESULT_DIR = os.path.join(PROJECT_DIR, "data")  # 结果保存目录
 VISUALIZATION_DIR = os.path.join(PROJECT_DIR, "visualization")  # 可视化结果保存目录
 
+# 报告配置
+MAX_EXAMPLES_PER_GROUP = 20  # 每个分组（类型/表）保留的示例建议数量上限
+TOP_SLOW_QUERIES = 10  # 图表中展示的最慢查询数量
+
 # 确保结果目录存在
 os.makedirs(RESULT_DIR, exist_ok=True)
 os.makedirs(VISUALIZATION_DIR, exist_ok=True)
@@ -63,28 +70,51 @@ class SlowQueryLogParser:
             
         print(f"开始解析慢查询日志文件: {self.log_file}")
         
-        # 正则表达式模式
-        time_pattern = re.compile(r"# Time: (\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}.\d+Z)")
-        user_pattern = re.compile(r"# User@Host: ([^\[]+)")
-        query_time_pattern = re.compile(r"# Query_time: (\d+\.\d+)\s+Lock_time: (\d+\.\d+)\s+Rows_sent: (\d+)\s+Rows_examined: (\d+)")
-        schema_pattern = re.compile(r"use ([^;]+);")
-        
-        # 解析日志
-        with open(self.log_file, 'r', encoding='utf-8', errors='ignore') as f:
+        self.queries = []
+        for query_info in self.iter_entries():
+            self.queries.append(query_info)
+                
+        print(f"解析完成，共提取到 {len(self.queries)} 条慢查询")
+        return self.queries
+    
+    def iter_entries(self, start=0, end=None, log_file=None):
+        """逐条解析日志，返回生成器
+        
+        只解析"# Time:"行起始于[start, end)字节范围内的条目，
+        用于把大文件按字节切分给多个进程并行解析
+        """
+        log_file = log_file or self.log_file
+        if not log_file:
+            raise ValueError("未指定慢查询日志文件")
+            
+        with open(log_file, 'rb') as f:
+            if start > 0:
+                # 从上一行末尾开始读，保证不会跳过恰好位于start的条目
+                f.seek(start - 1)
+                f.readline()
+            position = f.tell()
             lines = []
             in_query = False
-            self.queries = []
             
-            for line in f:
-                line = line.strip()
+            for raw_line in f:
+                line_start = position
+                position += len(raw_line)
+                line = raw_line.decode('utf-8', errors='ignore').strip()
                 
                 # 检查是否是新查询的开始
                 if line.startswith("# Time:"):
-                    # 如果已经在处理一个查询，保存它
+                    # 如果已经在处理一个查询，返回它
                     if in_query and lines:
-                        self._process_query(lines)
+                        query_info = self._build_query_info(lines)
+                        if query_info:
+                            yield query_info
                         lines = []
                         
+                    # 超出范围的条目由下一个分块处理
+                    if end is not None and line_start >= end:
+                        in_query = False
+                        break
+                        
                     # 开始新的查询
                     in_query = True
                     lines.append(line)
@@ -93,13 +123,12 @@ class SlowQueryLogParser:
                     
             # 处理最后一个查询
             if in_query and lines:
-                self._process_query(lines)
-                
-        print(f"解析完成，共提取到 {len(self.queries)} 条慢查询")
-        return self.queries
+                query_info = self._build_query_info(lines)
+                if query_info:
+                    yield query_info
     
-    def _process_query(self, lines):
-        """处理单个查询的日志行"""
+    def _build_query_info(self, lines):
+        """把单个查询的日志行解析为查询信息，没有查询文本时返回None"""
         query_info = {
             'timestamp': None,
             'user': None,
@@ -139,9 +168,10 @@ class SlowQueryLogParser:
                 
         # 合并查询行
         query_text = " ".join(query_lines).strip()
-        if query_text:
-            query_info['query'] = query_text
-            self.queries.append(query_info)
+        if not query_text:
+            return None
+        query_info['query'] = query_text
+        return query_info
     
     def get_dataframe(self):
         """将查询信息转换为DataFrame"""
@@ -420,6 +450,123 @@ class QueryAnalyzer:
         return columns
 
 
+class SuggestionAggregator:
+    """分析结果的增量聚合器，在每条分析结果产生时更新计数"""
+    
+    def __init__(self, max_examples=MAX_EXAMPLES_PER_GROUP, top_n=TOP_SLOW_QUERIES):
+        """初始化聚合器"""
+        self.max_examples = max_examples
+        self.top_n = top_n
+        self.reset()
+        
+    def reset(self):
+        """清空所有计数"""
+        self.total_queries = 0
+        self.total_suggestions = 0
+        self.type_counts = Counter()
+        self.table_counts = Counter()
+        self.column_counts = Counter()
+        self.examples_by_type = defaultdict(list)
+        self.examples_by_table = defaultdict(list)
+        self.query_times = []
+        self._slowest = []  # 最小堆: (query_time, 序号, query)
+        self.digest_stats = {}
+        
+    def add(self, result):
+        """累加一条分析结果"""
+        self.total_queries += 1
+        
+        query = result.get('query') or ''
+        query_time = result.get('query_time')
+        if query_time is not None:
+            self.query_times.append(query_time)
+            # 只保留最慢的top_n条查询
+            item = (query_time, self.total_queries, query)
+            if len(self._slowest) < self.top_n:
+                heapq.heappush(self._slowest, item)
+            elif item > self._slowest[0]:
+                heapq.heapreplace(self._slowest, item)
+                
+        suggestions = result.get('suggestions')
+        self._add_digest(result, query, query_time, suggestions)
+        if not suggestions:
+            return
+            
+        short_query = query[:100] + '...' if len(query) > 100 else query
+        for suggestion in suggestions:
+            self.total_suggestions += 1
+            suggestion_type = suggestion['type']
+            table = suggestion.get('table')
+            self.type_counts[suggestion_type] += 1
+            
+            # 示例只在需要保留时才复制
+            example = None
+            type_examples = self.examples_by_type[suggestion_type]
+            if len(type_examples) < self.max_examples:
+                example = self._make_example(suggestion, short_query, query_time)
+                type_examples.append(example)
+                
+            if 'table' in suggestion:
+                self.table_counts[table] += 1
+                table_examples = self.examples_by_table[table]
+                if len(table_examples) < self.max_examples:
+                    table_examples.append(example or self._make_example(suggestion, short_query, query_time))
+                    
+            for column in suggestion.get('columns', ()):
+                self.column_counts[column] += 1
+                
+    def _add_digest(self, result, query, query_time, suggestions):
+        """按查询摘要累加统计"""
+        digest = result.get('digest') or query_digest(query)
+        stats = self.digest_stats.get(digest)
+        if stats is None:
+            stats = self.digest_stats[digest] = {
+                'digest': digest,
+                'sample_query': query,
+                'schema': result.get('schema'),
+                'count': 0,
+                'total_time': 0.0,
+                'max_time': 0.0,
+                'rows_examined': 0,
+                'rows_sent': 0,
+                # 同一摘要的建议相同，只保留第一次出现时的建议
+                'suggestions': suggestions or []
+            }
+        stats['count'] += 1
+        stats['total_time'] += query_time or 0
+        stats['max_time'] = max(stats['max_time'], query_time or 0)
+        stats['rows_examined'] += result.get('rows_examined') or 0
+        stats['rows_sent'] += result.get('rows_sent') or 0
+        
+    @staticmethod
+    def _make_example(suggestion, short_query, query_time):
+        """构造示例建议"""
+        example = suggestion.copy()
+        example['query'] = short_query
+        example['query_time'] = query_time or 0
+        return example
+        
+    def slowest_queries(self):
+        """按查询时间降序返回最慢的查询"""
+        return [{'query_time': query_time, 'query': query}
+                for query_time, _, query in sorted(self._slowest, reverse=True)]
+        
+    def build_report(self):
+        """根据当前计数生成报告"""
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'total_queries_analyzed': self.total_queries,
+            'total_suggestions': self.total_suggestions,
+            'suggestion_counts': dict(self.type_counts),
+            'table_suggestion_counts': dict(self.table_counts),
+            'max_examples_per_group': self.max_examples,
+            'suggestions_by_type': dict(self.examples_by_type),
+            'suggestions_by_table': dict(self.examples_by_table),
+            'recommended_indexes': [{'column': column, 'count': count} 
+                                   for column, count in self.column_counts.most_common(20)]
+        }
+
+
 class SlowQueryAnalyzer:
     """慢查询分析器"""
     
@@ -429,8 +576,10 @@ class SlowQueryAnalyzer:
         self.db_config = db_config or DB_CONFIG
         self.parser = SlowQueryLogParser(log_file)
         self.query_analyzer = QueryAnalyzer(db_config)
+        self.aggregator = SuggestionAggregator()
         self.queries = []
         self.analysis_results = []
+        self.report = None
         
     def load_log(self, log_file=None):
         """加载慢查询日志"""
@@ -445,6 +594,8 @@ class SlowQueryAnalyzer:
         self.query_analyzer.connect_to_db()
         
         self.analysis_results = []
+        self.aggregator.reset()
+        self.report = None
         total_queries = len(self.queries)
         
         for i, query_info in enumerate(self.queries):
@@ -464,7 +615,9 @@ class SlowQueryAnalyzer:
                     if analysis:
                         # 合并查询信息和分析结果
                         result = {**query_info, **analysis}
+                        result['digest'] = query_digest(query)
                         self.analysis_results.append(result)
+                        self.aggregator.add(result)
                 else:
                     print(f"跳过非SELECT查询: {query[:60]}...")
             
@@ -474,54 +627,13 @@ class SlowQueryAnalyzer:
     
     def generate_report(self):
         """生成分析报告"""
-        if not self.analysis_results:
+        if not self.aggregator.total_queries:
             print("没有分析结果，请先调用analyze_queries()")
             return None
             
-        # 提取所有的建议
-        all_suggestions = []
-        for result in self.analysis_results:
-            if 'suggestions' in result:
-                for suggestion in result['suggestions']:
-                    suggestion_copy = suggestion.copy()
-                    suggestion_copy['query'] = result['query'][:100] + '...' if len(result['query']) > 100 else result['query']
-                    suggestion_copy['query_time'] = result.get('query_time', 0)
-                    all_suggestions.append(suggestion_copy)
-        
-        # 按建议类型分组
-        suggestions_by_type = defaultdict(list)
-        for suggestion in all_suggestions:
-            suggestions_by_type[suggestion['type']].append(suggestion)
-            
-        # 统计每种建议类型的数量
-        suggestion_counts = {type_name: len(suggestions) for type_name, suggestions in suggestions_by_type.items()}
-        
-        # 按表分组建议
-        suggestions_by_table = defaultdict(list)
-        for suggestion in all_suggestions:
-            if 'table' in suggestion:
-                suggestions_by_table[suggestion['table']].append(suggestion)
-        
-        # 统计需要添加索引的列
-        index_columns = Counter()
-        for suggestion in all_suggestions:
-            if 'columns' in suggestion:
-                for column in suggestion['columns']:
-                    index_columns[column] += 1
-                    
-        # 生成报告
-        report = {
-            'timestamp': datetime.now().isoformat(),
-            'total_queries_analyzed': len(self.analysis_results),
-            'total_suggestions': len(all_suggestions),
-            'suggestion_counts': suggestion_counts,
-            'suggestions_by_type': dict(suggestions_by_type),
-            'suggestions_by_table': dict(suggestions_by_table),
-            'recommended_indexes': [{'column': column, 'count': count} 
-                                   for column, count in index_columns.most_common(20)]
-        }
-        
-        return report
+        # 计数已在分析过程中增量更新，这里只需组装报告
+        self.report = self.aggregator.build_report()
+        return self.report
     
     def save_report(self, report, output_file):
         """保存报告到文件"""
@@ -531,7 +643,7 @@ class SlowQueryAnalyzer:
         
     def visualize_results(self, output_dir=None):
         """可视化分析结果"""
-        if not self.analysis_results:
+        if not self.aggregator.total_queries:
             print("没有分析结果，请先调用analyze_queries()")
             return
             
@@ -540,13 +652,13 @@ class SlowQueryAnalyzer:
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # 准备数据
-        df = pd.DataFrame(self.analysis_results)
+        # 图表数据直接取自聚合器，无需再遍历分析结果
+        query_times = self.aggregator.query_times
         
-        if 'query_time' in df.columns:
+        if query_times:
             # 1. 查询时间分布
             plt.figure(figsize=(10, 6))
-            plt.hist(df['query_time'], bins=20, alpha=0.7)
+            plt.hist(query_times, bins=20, alpha=0.7)
             plt.xlabel('查询时间 (秒)')
             plt.ylabel('查询数量')
             plt.title('慢查询时间分布')
@@ -556,11 +668,11 @@ class SlowQueryAnalyzer:
             plt.close()
             
             # 2. 最慢的10个查询
-            if len(df) > 10:
-                top_slow = df.nlargest(10, 'query_time')
+            if len(query_times) > 10:
+                top_slow = self.aggregator.slowest_queries()
                 plt.figure(figsize=(12, 8))
-                bars = plt.barh(range(len(top_slow)), top_slow['query_time'], alpha=0.7)
-                plt.yticks(range(len(top_slow)), [q[:50] + '...' for q in top_slow['query']])
+                bars = plt.barh(range(len(top_slow)), [q['query_time'] for q in top_slow], alpha=0.7)
+                plt.yticks(range(len(top_slow)), [q['query'][:50] + '...' for q in top_slow])
                 plt.xlabel('查询时间 (秒)')
                 plt.title('最慢的10个查询')
                 plt.grid(True, alpha=0.3)
@@ -568,8 +680,8 @@ class SlowQueryAnalyzer:
                 plt.savefig(os.path.join(output_dir, f"top_10_slowest_queries_{timestamp}.png"))
                 plt.close()
         
-        # 3. 建议类型分布
-        report = self.generate_report()
+        # 3. 建议类型分布（复用已生成的报告）
+        report = self.report or self.generate_report()
         if report and 'suggestion_counts' in report:
             suggestion_counts = report['suggestion_counts']
             plt.figure(figsize=(10, 6))
@@ -640,6 +752,16 @@ def main():
             report_file = os.path.join(RESULT_DIR, f"slow_query_report_{timestamp}.json")
             analyzer.save_report(report, report_file)
             
+            # 记录到历史结果库（以查询文件为来源，history import不会再次导入同一次分析）
+            try:
+                store = ResultsStore()
+                run_id = store.record_slow_query_run(analyzer.aggregator.digest_stats.values(),
+                                                     source_file=queries_json)
+                store.close()
+                print(f"分析结果已记录到历史结果库（运行ID: {run_id}）")
+            except Exception as e:
+                print(f"记录历史结果时出错: {e}")
+            
             # 输出一些主要建议
             print("\n主要索引优化建议:")
             for i, idx in enumerate(report['recommended_indexes'][:5]):
@@ -648,8 +770,7 @@ def main():
             # 输出建议最多的表
             if report['suggestions_by_table']:
                 print("\n需要优化的主要表:")
-                table_counts = {table: len(suggestions) 
-                              for table, suggestions in report['suggestions_by_table'].items()}
+                table_counts = report['table_suggestion_counts']
                 for i, (table, count) in enumerate(sorted(table_counts.items(), 
                                                        key=lambda x: x[1], reverse=True)[:5]):
                     print(f"{i+1}. 表 '{table}' - 建议数: {count}")
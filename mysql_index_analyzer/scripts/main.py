@@ -71,7 +71,9 @@ def check_environment():
     print("\n检查环境...")
     return run_script("check_environment.py")
 
-def generate_data(scale_factor=None):
+def generate_data(scale_factor=None, load_mode=None, workers=None, seed=None, engine=None, fast_load=False,
+                  snapshot=False, regenerate=False, reference_date=None, distribution=None, distribution_file=None,
+                  spec=None, partition=None):
     """生成测试数据"""
     print_header()
     print("\n生成测试数据...")
@@ -79,14 +81,123 @@ def generate_data(scale_factor=None):
     args = []
     if scale_factor:
         args.append(str(scale_factor))
+    if load_mode:
+        args.extend(["--load-mode", load_mode])
+    if workers:
+        args.extend(["--workers", str(workers)])
+    if seed is not None:
+        args.extend(["--seed", str(seed)])
+    if engine:
+        args.extend(["--engine", engine])
+    if fast_load:
+        args.append("--fast-load")
+    if snapshot:
+        args.append("--snapshot")
+    if regenerate:
+        args.append("--regenerate")
+    if reference_date:
+        args.extend(["--reference-date", reference_date])
+    if distribution:
+        args.extend(["--distribution", distribution])
+    if distribution_file:
+        args.extend(["--distribution-file", distribution_file])
+    if spec:
+        args.extend(["--spec", spec])
+    if partition:
+        args.extend(["--partition", partition])
         
     return run_script("data_generator.py", args)
 
-def run_index_test():
+def run_index_test(cache_mode=None, evict_method=None, skip_writes=False, build_algorithm=None, build_lock=None,
+                   build_load=None, cases=None, index_state=None, optimizer_choice=False, optimizer_trace=False,
+                   fixed_params=False, partition_test=False):
     """运行索引测试"""
     print_header()
     print("\n运行索引测试...")
-    return run_script("index_tester.py")
+    
+    args = []
+    if cache_mode:
+        args.extend(["--cache-mode", cache_mode])
+    if evict_method:
+        args.extend(["--evict-method", evict_method])
+    if skip_writes:
+        args.append("--skip-writes")
+    if build_algorithm:
+        args.extend(["--build-algorithm", build_algorithm])
+    if build_lock:
+        args.extend(["--build-lock", build_lock])
+    if build_load:
+        args.extend(["--build-load", str(build_load)])
+    if cases:
+        args.extend(["--cases", cases])
+    if index_state:
+        args.extend(["--index-state", index_state])
+    if optimizer_choice:
+        args.append("--optimizer-choice")
+    if optimizer_trace:
+        args.append("--optimizer-trace")
+    if fixed_params:
+        args.append("--fixed-params")
+    if partition_test:
+        args.append("--partition-test")
+    return run_script("index_tester.py", args)
+
+def run_load_test(workers=None, duration=None, requests=None, rate=None, weights=None, strategies=None, seed=None,
+                  cases=None):
+    """运行并发压测"""
+    print_header()
+    print("\n运行并发压测...")
+    
+    args = []
+    if workers:
+        args.extend(["--workers", str(workers)])
+    if duration:
+        args.extend(["--duration", str(duration)])
+    if requests:
+        args.extend(["--requests", str(requests)])
+    if rate:
+        args.extend(["--rate", str(rate)])
+    if weights:
+        args.extend(["--weights", weights])
+    if strategies:
+        args.append("--strategies")
+        args.extend(strategies)
+    if seed is not None:
+        args.extend(["--seed", str(seed)])
+    if cases:
+        args.extend(["--cases", cases])
+    return run_script("load_tester.py", args)
+
+def run_scale_curve(scales=None, sla_ms=None, snapshot=True, seed=None, spec=None, cases=None, cache_mode=None,
+                    writes=False, results=None, reference_date=None):
+    """在多种数据规模下运行索引测试并拟合规模曲线"""
+    print_header()
+    print("\n运行数据规模曲线测试...")
+    
+    args = []
+    if scales:
+        args.append("--scales")
+        args.extend(str(scale) for scale in scales)
+    if sla_ms:
+        args.extend(["--sla-ms", str(sla_ms)])
+    if not snapshot:
+        args.append("--no-snapshot")
+    if seed is not None:
+        args.extend(["--seed", str(seed)])
+    if spec:
+        args.extend(["--spec", spec])
+    if cases:
+        args.extend(["--cases", cases])
+    if cache_mode:
+        args.extend(["--cache-mode", cache_mode])
+    if writes:
+        args.append("--writes")
+    if results:
+        args.append("--results")
+        args.extend(results)
+    if reference_date:
+        args.extend(["--reference-date", reference_date])
+    return run_script("scale_curve.py", args)
 
 def analyze_log(log_file):
     """分析慢查询日志"""
@@ -94,14 +205,40 @@ def analyze_log(log_file):
     print("\n分析慢查询日志...")
     return run_script("log_analyzer.py", log_file)
 
+def diff_logs(log_a, log_b, workers=None):
+    """对比两份慢查询日志"""
+    print_header()
+    print("\n对比慢查询日志...")
+    args = [log_a, log_b]
+    if workers:
+        args.extend(["--workers", str(workers)])
+    return run_script("slow_log_diff.py", args)
+
 def visualize_results(result_file):
     """可视化结果"""
     print_header()
     print("\n可视化结果...")
     return run_script("visualizer.py", result_file)
 
+def show_history(args):
+    """查询历史结果库"""
+    print_header()
+    print("\n查询历史结果库...")
+    return run_script("results_store.py", args)
+
 def find_latest_result_file():
     """查找最新的测试结果文件"""
+    # 优先从历史结果库中查找，无需扫描data目录
+    try:
+        from results_store import ResultsStore
+        store = ResultsStore()
+        latest = store.latest_source_file()
+        store.close()
+        if latest:
+            return latest
+    except Exception as e:
+        print(f"读取历史结果库时出错: {e}")
+        
     result_files = [f for f in os.listdir(DATA_DIR) if f.startswith("index_test_results_") and f.endswith(".json")]
     
     if not result_files:
@@ -125,21 +262,118 @@ def main():
     # generate命令 - 生成测试数据
     generate_parser = subparsers.add_parser("generate", help="生成测试数据")
     generate_parser.add_argument("--scale", type=float, help="数据量缩放因子（默认为1.0）", default=1.0)
+    generate_parser.add_argument("--load-mode", choices=["insert", "bulk"],
+                                 help="导入方式: insert为批量INSERT, bulk为LOAD DATA LOCAL INFILE")
+    generate_parser.add_argument("--workers", type=int, help="并行生成数据的进程数（默认为CPU核数）")
+    generate_parser.add_argument("--seed", type=int, help="数据生成的随机种子")
+    generate_parser.add_argument("--engine", choices=["python", "numpy"], help="数据生成引擎: python为逐行生成, numpy为按批向量化生成")
+    generate_parser.add_argument("--fast-load", action="store_true", help="快速导入: 关闭外键/唯一性检查，导入后统一添加外键和索引")
+    generate_parser.add_argument("--snapshot", action="store_true", help="生成完成后保存数据集快照，之后生成相同数据集时直接恢复")
+    generate_parser.add_argument("--regenerate", action="store_true", help="忽略已有快照和未完成生成的断点，重新生成数据")
+    generate_parser.add_argument("--reference-date", help="生成日期的参考日期YYYY-MM-DD（默认为今天），复用快照时需要固定")
+    generate_parser.add_argument("--distribution", choices=["uniform", "skewed"], help="数据分布预设: uniform为均匀分布, skewed为热点倾斜和相关列")
+    generate_parser.add_argument("--distribution-file", help="JSON格式的列分布配置，覆盖预设中对应列的分布")
+    generate_parser.add_argument("--spec", help="JSON/YAML格式的声明式表结构，代替内置的用户/产品/订单表")
+    generate_parser.add_argument("--partition", choices=["range", "list", "hash"],
+                                 help="订单表按order_date分区: range为按月, list为按季度, hash为按日期哈希（默认不分区）")
     
     # test命令 - 运行索引测试
     test_parser = subparsers.add_parser("test", help="运行索引测试")
+    test_parser.add_argument("--cache-mode", choices=["warm", "cold", "both"],
+                             help="缓存状态: warm为预读后测量, cold为每次执行前清空缓冲池, both为两者都测（默认为both）")
+    test_parser.add_argument("--evict-method", choices=["scan", "restart"],
+                             help="冷缓存清空缓冲池的方式: scan为扫描填充表, restart为执行MYSQL_RESTART_COMMAND（默认为scan）")
+    test_parser.add_argument("--skip-writes", action="store_true", help="不测试各索引策略下的写入代价")
+    test_parser.add_argument("--build-algorithm", choices=["INPLACE", "COPY", "DEFAULT"],
+                             help="创建索引的ALGORITHM（默认为INPLACE，不支持时退回DEFAULT）")
+    test_parser.add_argument("--build-lock", choices=["NONE", "SHARED", "EXCLUSIVE", "DEFAULT"],
+                             help="创建索引的LOCK（默认为NONE，不支持时退回DEFAULT）")
+    test_parser.add_argument("--build-load", type=int, nargs="?", const=4,
+                             help="创建索引期间运行后台DML负载的线程数（只写--build-load时为4）")
+    test_parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    test_parser.add_argument("--index-state", choices=["invisible", "drop"],
+                             help="切换索引策略时多余索引的处理方式: invisible为设为不可见（MySQL 8.0+）, drop为删除"
+                                  "（默认测试写入代价时为drop，否则为invisible）")
+    test_parser.add_argument("--optimizer-choice", action="store_true",
+                             help="带索引提示的用例再不加提示执行一次，记录优化器选择的计划并标记比强制索引更慢的选择")
+    test_parser.add_argument("--optimizer-trace", action="store_true",
+                             help="同--optimizer-choice，并记录优化器选择了更慢计划的用例的optimizer_trace")
+    test_parser.add_argument("--fixed-params", action="store_true",
+                             help="每次执行都使用同一组参数（默认每次执行从参数池中取下一组参数）")
+    test_parser.add_argument("--partition-test", action="store_true",
+                             help="运行分区裁剪测试（复制一份订单表作为分区/非分区对照表，数据量大时较慢）")
+    
+    # load命令 - 并发压测
+    load_parser = subparsers.add_parser("load", help="在不同索引策略下并发执行测试查询，统计吞吐量和延迟")
+    load_parser.add_argument("--workers", type=int, help="并发线程数，每个线程使用独立连接（默认为8）")
+    load_parser.add_argument("--duration", type=float, help="每种策略的压测时长（秒，默认为30）")
+    load_parser.add_argument("--requests", type=int, help="每种策略的请求总数")
+    load_parser.add_argument("--rate", type=float, help="目标总QPS（默认不限速）")
+    load_parser.add_argument("--weights", help="查询权重配置文件（JSON格式 {查询ID: 权重}）")
+    load_parser.add_argument("--strategies", nargs="+", help="要压测的索引策略ID（默认为测试用例配置中的全部策略）")
+    load_parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    load_parser.add_argument("--seed", type=int, help="选择查询的随机种子")
+    
+    # scale-curve命令 - 数据规模曲线
+    scale_parser = subparsers.add_parser("scale-curve", help="在多种数据规模下运行索引测试，拟合耗时随行数的增长并估算达到SLA的数据量")
+    scale_parser.add_argument("--scales", type=float, nargs="+", help="数据量缩放因子列表（默认为0.01 0.1 1 10）")
+    scale_parser.add_argument("--sla-ms", type=float, help="查询耗时的SLA（毫秒，默认为100）")
+    scale_parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                              help="不保存/复用各规模的数据集快照（默认复用）")
+    scale_parser.add_argument("--seed", type=int, help="数据生成的随机种子")
+    scale_parser.add_argument("--reference-date", help="生成数据的参考日期YYYY-MM-DD（默认为2024-01-01，固定后可复用各规模的快照）")
+    scale_parser.add_argument("--spec", help="JSON/YAML格式的声明式表结构")
+    scale_parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    scale_parser.add_argument("--cache-mode", choices=["warm", "cold", "both"], help="索引测试的缓存状态（默认为warm）")
+    scale_parser.add_argument("--writes", action="store_true", help="同时测试各索引策略的写入代价（默认跳过）")
+    scale_parser.add_argument("--results", nargs="+", help="直接使用已有的索引测试结果文件拟合，不生成数据和运行测试")
     
     # analyze命令 - 分析慢查询日志
     analyze_parser = subparsers.add_parser("analyze", help="分析慢查询日志")
     analyze_parser.add_argument("log_file", help="慢查询日志文件路径")
     
+    # diff命令 - 对比两份慢查询日志
+    diff_parser = subparsers.add_parser("diff", help="按查询摘要对比两份慢查询日志（如发布前后）")
+    diff_parser.add_argument("log_a", help="基准慢查询日志文件路径")
+    diff_parser.add_argument("log_b", help="对比慢查询日志文件路径")
+    diff_parser.add_argument("--workers", type=int, help="并行解析的进程数（默认为CPU核数）")
+    
     # visualize命令 - 可视化结果
     visualize_parser = subparsers.add_parser("visualize", help="可视化结果")
     visualize_parser.add_argument("--result", help="测试结果JSON文件路径（默认使用最新的结果文件）")
     
+    # history命令 - 查询历史结果库
+    history_parser = subparsers.add_parser("history", help="查询历史结果库（趋势和回退检测）")
+    history_subparsers = history_parser.add_subparsers(dest="history_action", help="历史结果库操作")
+    history_subparsers.add_parser("import", help="导入data目录中尚未记录的JSON结果文件")
+    history_runs_parser = history_subparsers.add_parser("runs", help="列出最近的运行记录")
+    history_runs_parser.add_argument("--type", choices=["index_test", "slow_query"])
+    history_trend_parser = history_subparsers.add_parser("trend", help="查看测试用例或查询摘要的历史趋势")
+    history_trend_parser.add_argument("--case", help="测试用例键（如: 按用户名查询）")
+    history_trend_parser.add_argument("--digest", help="查询摘要")
+    history_trend_parser.add_argument("--strategy", help="索引策略（仅用于--case）")
+    history_regress_parser = history_subparsers.add_parser("regressions", help="检测两次运行之间的延迟回退")
+    history_regress_parser.add_argument("--type", choices=["index_test", "slow_query"], default="index_test")
+    history_regress_parser.add_argument("--base", type=int, help="基准运行ID")
+    history_regress_parser.add_argument("--target", type=int, help="目标运行ID")
+    history_regress_parser.add_argument("--threshold", type=float, help="延迟增长比例阈值（默认为0.2）")
+    
     # all命令 - 执行完整工作流程
     all_parser = subparsers.add_parser("all", help="执行完整工作流程（生成数据、运行测试、可视化结果）")
     all_parser.add_argument("--scale", type=float, help="数据量缩放因子（默认为0.01）", default=0.01)
+    all_parser.add_argument("--load-mode", choices=["insert", "bulk"],
+                            help="导入方式: insert为批量INSERT, bulk为LOAD DATA LOCAL INFILE")
+    all_parser.add_argument("--workers", type=int, help="并行生成数据的进程数（默认为CPU核数）")
+    all_parser.add_argument("--seed", type=int, help="数据生成的随机种子")
+    all_parser.add_argument("--engine", choices=["python", "numpy"], help="数据生成引擎: python为逐行生成, numpy为按批向量化生成")
+    all_parser.add_argument("--fast-load", action="store_true", help="快速导入: 关闭外键/唯一性检查，导入后统一添加外键和索引")
+    all_parser.add_argument("--snapshot", action="store_true", help="生成完成后保存数据集快照，之后生成相同数据集时直接恢复")
+    all_parser.add_argument("--regenerate", action="store_true", help="忽略已有快照和未完成生成的断点，重新生成数据")
+    all_parser.add_argument("--reference-date", help="生成日期的参考日期YYYY-MM-DD（默认为今天），复用快照时需要固定")
+    all_parser.add_argument("--distribution", choices=["uniform", "skewed"], help="数据分布预设: uniform为均匀分布, skewed为热点倾斜和相关列")
+    all_parser.add_argument("--distribution-file", help="JSON格式的列分布配置，覆盖预设中对应列的分布")
+    all_parser.add_argument("--partition", choices=["range", "list", "hash"],
+                            help="订单表按order_date分区: range为按月, list为按季度, hash为按日期哈希（默认不分区）")
     
     # 解析参数
     args = parser.parse_args()
@@ -148,11 +382,24 @@ def main():
     if args.command == "check":
         check_environment()
     elif args.command == "generate":
-        generate_data(args.scale)
+        generate_data(args.scale, args.load_mode, args.workers, args.seed, args.engine, args.fast_load,
+                      args.snapshot, args.regenerate, args.reference_date,
+                      args.distribution, args.distribution_file, args.spec, args.partition)
     elif args.command == "test":
-        run_index_test()
+        run_index_test(args.cache_mode, args.evict_method, args.skip_writes,
+                       args.build_algorithm, args.build_lock, args.build_load, args.cases,
+                       args.index_state, args.optimizer_choice, args.optimizer_trace,
+                       args.fixed_params, args.partition_test)
+    elif args.command == "load":
+        run_load_test(args.workers, args.duration, args.requests, args.rate, args.weights, args.strategies, args.seed,
+                      args.cases)
+    elif args.command == "scale-curve":
+        run_scale_curve(args.scales, args.sla_ms, args.snapshot, args.seed, args.spec, args.cases, args.cache_mode,
+                        args.writes, args.results, args.reference_date)
     elif args.command == "analyze":
         analyze_log(args.log_file)
+    elif args.command == "diff":
+        diff_logs(args.log_a, args.log_b, args.workers)
     elif args.command == "visualize":
         result_file = args.result if args.result else find_latest_result_file()
         if result_file:
@@ -160,6 +407,16 @@ def main():
         else:
             print("错误: 找不到测试结果文件")
             sys.exit(1)
+    elif args.command == "history":
+        if not args.history_action:
+            history_parser.print_help()
+            return
+        history_args = [args.history_action]
+        for option in ("type", "case", "digest", "strategy", "base", "target", "threshold"):
+            value = getattr(args, option, None)
+            if value is not None:
+                history_args.extend([f"--{option}", str(value)])
+        show_history(history_args)
     elif args.command == "all":
         # 执行完整工作流程
         print_header()
@@ -174,7 +431,9 @@ def main():
             sys.exit(1)
             
         # 2. 生成测试数据
-        if not generate_data(args.scale):
+        if not generate_data(args.scale, args.load_mode, args.workers, args.seed, args.engine, args.fast_load,
+                             args.snapshot, args.regenerate, args.reference_date,
+                             args.distribution, args.distribution_file, partition=args.partition):
             print("生成测试数据失败，中止工作流程")
             sys.exit(1)
             
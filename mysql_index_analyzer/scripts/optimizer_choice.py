@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 优化器选择
+测试用例默认用FORCE INDEX固定要测的索引；此模块对比同一查询不加提示时优化器实际选择的执行计划，
+找出优化器选了比强制索引更慢的计划的用例，并可读取这些用例的optimizer_trace，查看优化器的代价估算
+"""
+
+import json
+
+# optimizer_trace的内存上限（字节），超出的部分会被截断
+TRACE_MAX_MEM_SIZE = 1024 * 1024
+
+
+def plan_indexes(explain_results):
+    """从EXPLAIN结果中提取每张表使用的索引[(表, 索引)]，全表扫描的索引为None"""
+    return [(row.get('table'), row.get('key')) for row in explain_results or []]
+
+
+def compare_choice(forced_result, unhinted_result, significant):
+    """对比强制索引和优化器自选的结果，返回记录
+
+    significant(test_a, test_b)判断两个用例的耗时差异是否显著；计划相同时耗时差异只是噪声，不标记
+    """
+    forced_time = forced_result['timing']['median']
+    unhinted_time = unhinted_result['timing']['median']
+    forced_plan = plan_indexes(forced_result.get('explain'))
+    chosen_plan = plan_indexes(unhinted_result.get('explain'))
+    same_plan = forced_plan == chosen_plan
+    is_significant = significant(forced_result, unhinted_result)
+    return {
+        'query': unhinted_result['query'],
+        'explain': unhinted_result.get('explain'),
+        'timing': unhinted_result['timing'],
+        'forced_plan': forced_plan,
+        'chosen_plan': chosen_plan,
+        'same_plan': same_plan,
+        'slowdown': unhinted_time / forced_time if forced_time else None,
+        'significant': is_significant,
+        'slower_plan': not same_plan and unhinted_time > forced_time and is_significant is not False
+    }
+
+
+def capture_optimizer_trace(conn, query, params=None):
+    """在当前会话开启optimizer_trace执行一次查询，返回(解析后的跟踪, 截断的字节数)"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(f"SET SESSION optimizer_trace_max_mem_size = {TRACE_MAX_MEM_SIZE}")
+        cursor.execute("SET SESSION optimizer_trace = 'enabled=on'")
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+        cursor.fetchall()
+        cursor.execute("SELECT TRACE, MISSING_BYTES_BEYOND_MAX_MEM_SIZE FROM information_schema.OPTIMIZER_TRACE")
+        row = cursor.fetchone()
+    finally:
+        cursor.execute("SET SESSION optimizer_trace = 'enabled=off'")
+        cursor.close()
+    if not row:
+        return None, 0
+    trace, missing = row
+    try:
+        trace = json.loads(trace)
+    except ValueError:
+        # 被截断的跟踪不是完整的JSON，保留原文
+        pass
+    return trace, int(missing or 0)
+
+
+def considered_access_paths(trace):
+    """从optimizer_trace中提取优化器为各表考虑过的访问方式及代价"""
+    paths = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            # 形如 {"table": "`users`", "best_access_path": {"considered_access_paths": [...]}}
+            best = node.get('best_access_path')
+            if 'table' in node and isinstance(best, dict):
+                for path in best.get('considered_access_paths', []):
+                    paths.append({
+                        'table': node['table'],
+                        'access_type': path.get('access_type'),
+                        'index': path.get('index'),
+                        'rows': path.get('rows') or path.get('rows_to_scan'),
+                        'cost': path.get('cost'),
+                        'chosen': path.get('chosen')
+                    })
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(trace)
+    return paths
@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 订单表分区
+生成按order_date分区（RANGE/LIST/HASH）的订单表定义，供数据生成器建表和索引测试框架
+创建分区/非分区对照表共用
+"""
+
+from datetime import datetime
+
+# 分区方式: range 按月分区, list 按季度（月份列表）分区, hash 按日期哈希分区
+PARTITION_SCHEMES = ('range', 'list', 'hash')
+PARTITION_COLUMN = 'order_date'
+HASH_PARTITIONS = 12  # hash分区的分区数
+# list分区: 每个季度一个分区
+QUARTER_MONTHS = [(1, 2, 3), (4, 5, 6), (7, 8, 9), (10, 11, 12)]
+
+
+def _month_starts(start_date, end_date):
+    """返回start_date所在月到end_date所在月的下一个月，每个月的第一天"""
+    month = datetime(start_date.year, start_date.month, 1)
+    months = []
+    while month <= end_date:
+        months.append(month)
+        month = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+    months.append(month)
+    return months
+
+
+def partition_clause(scheme, start_date, end_date, hash_partitions=HASH_PARTITIONS):
+    """返回按order_date分区的PARTITION BY子句
+
+    range分区覆盖start_date到end_date的每个月，超出范围的数据落入最后的pmax分区
+    """
+    if scheme == 'range':
+        months = _month_starts(start_date, end_date)
+        partitions = [f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{next_month:%Y-%m-%d}'))"
+                      for month, next_month in zip(months, months[1:])]
+        partitions.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+        return f"PARTITION BY RANGE (TO_DAYS({PARTITION_COLUMN})) (\n    " + ",\n    ".join(partitions) + "\n)"
+    if scheme == 'list':
+        partitions = [f"PARTITION pq{quarter} VALUES IN ({', '.join(str(month) for month in months)})"
+                      for quarter, months in enumerate(QUARTER_MONTHS, 1)]
+        return f"PARTITION BY LIST (MONTH({PARTITION_COLUMN})) (\n    " + ",\n    ".join(partitions) + "\n)"
+    if scheme == 'hash':
+        return f"PARTITION BY HASH (TO_DAYS({PARTITION_COLUMN})) PARTITIONS {hash_partitions}"
+    raise ValueError(f"未知的分区方式: {scheme}")
+
+
+def partition_table_statements(table, scheme, start_date, end_date):
+    """把已有的非分区订单表改为分区表的语句
+
+    分区表的主键必须包含分区列，因此主键改为(id, order_date)
+    """
+    return [
+        f"ALTER TABLE {table} DROP PRIMARY KEY, ADD PRIMARY KEY (id, {PARTITION_COLUMN})",
+        f"ALTER TABLE {table} {partition_clause(scheme, start_date, end_date)}"
+    ]
+
+
+def table_partitions(cursor, table):
+    """返回表的分区方式和分区名列表，非分区表返回(None, [])"""
+    cursor.execute("""
+        SELECT PARTITION_METHOD, PARTITION_NAME FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND PARTITION_NAME IS NOT NULL
+        ORDER BY PARTITION_ORDINAL_POSITION
+    """, (table,))
+    rows = cursor.fetchall()
+    if not rows:
+        return None, []
+    rows = [tuple(row.values()) if isinstance(row, dict) else row for row in rows]
+    return rows[0][0], [name for _, name in rows]
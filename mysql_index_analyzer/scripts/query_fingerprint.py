@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 查询指纹
+将查询中的常量替换为占位符，得到同一类查询共用的摘要（digest）
+"""
+
+import re
+import hashlib
+
+# 归一化使用的正则表达式
+SINGLE_QUOTED_PATTERN = re.compile(r"'(?:[^'\\]|\\.)*'")
+DOUBLE_QUOTED_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"')
+NUMBER_PATTERN = re.compile(r"\b-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b")
+IN_LIST_PATTERN = re.compile(r"\bin\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+VALUES_LIST_PATTERN = re.compile(r"\bvalues\s*\(.*\)", re.IGNORECASE)
+COMMENT_PATTERN = re.compile(r"/\*.*?\*/", re.DOTALL)
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+DIGEST_LENGTH = 16  # 摘要保留的十六进制字符数
+
+
+def normalize_query(query):
+    """将查询归一化为指纹文本"""
+    if not query:
+        return ''
+
+    text = COMMENT_PATTERN.sub(' ', query.strip().rstrip(';'))
+    text = SINGLE_QUOTED_PATTERN.sub('?', text)
+    text = DOUBLE_QUOTED_PATTERN.sub('?', text)
+    text = NUMBER_PATTERN.sub('?', text)
+    # IN列表和VALUES列表的长度不影响查询类型
+    text = IN_LIST_PATTERN.sub('in (?+)', text)
+    text = VALUES_LIST_PATTERN.sub('values (?+)', text)
+    text = WHITESPACE_PATTERN.sub(' ', text)
+    return text.strip().lower()
+
+
+def query_digest(query):
+    """计算查询的摘要"""
+    fingerprint = normalize_query(query)
+    return hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()[:DIGEST_LENGTH]
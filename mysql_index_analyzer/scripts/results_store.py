@@ -0,0 +1,451 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 历史结果库
+将每次索引测试和慢查询分析的结果记录到嵌入式SQLite数据库，
+支持按测试用例或查询摘要查看历史趋势，并检测两次运行之间的延迟回退
+"""
+
+import os
+import re
+import json
+import sqlite3
+import argparse
+from datetime import datetime
+
+from query_fingerprint import query_digest
+
+# 目录配置
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+RESULT_DIR = os.path.join(PROJECT_DIR, "data")  # 结果保存目录
+DEFAULT_DB_PATH = os.path.join(RESULT_DIR, "results_history.db")  # 历史结果库文件
+
+# 回退检测配置
+REGRESSION_THRESHOLD = 0.2  # 延迟增长超过20%视为回退
+MIN_REGRESSION_DELTA = 0.001  # 绝对增长小于1毫秒时忽略（避免噪声）
+
+# 运行类型
+RUN_TYPE_INDEX_TEST = 'index_test'
+RUN_TYPE_SLOW_QUERY = 'slow_query'
+
+# 没有记录case_spec的旧结果使用的内置索引策略和基准策略
+LEGACY_STRATEGIES = {'no_indexes': '无索引', 'single_column_indexes': '单列索引', 'multi_column_indexes': '联合索引'}
+LEGACY_BASELINE = 'no_indexes'
+
+# 结果文件名中的时间戳
+FILE_TIMESTAMP_PATTERN = re.compile(r"(\d{8}_\d{6})")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_type TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    source_file TEXT UNIQUE,
+    metadata TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_type_time ON runs (run_type, started_at);
+
+CREATE TABLE IF NOT EXISTS test_cases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    strategy TEXT NOT NULL,
+    case_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    query TEXT,
+    params TEXT,
+    avg_time REAL,
+    explain TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_test_cases_run ON test_cases (run_id, strategy, case_key);
+CREATE INDEX IF NOT EXISTS idx_test_cases_key ON test_cases (case_key, strategy, run_id);
+
+CREATE TABLE IF NOT EXISTS timings (
+    test_case_id INTEGER NOT NULL REFERENCES test_cases (id) ON DELETE CASCADE,
+    iteration INTEGER NOT NULL,
+    seconds REAL NOT NULL,
+    PRIMARY KEY (test_case_id, iteration)
+);
+
+CREATE TABLE IF NOT EXISTS digests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    digest TEXT NOT NULL,
+    sample_query TEXT,
+    schema_name TEXT,
+    exec_count INTEGER NOT NULL,
+    total_time REAL NOT NULL,
+    avg_time REAL NOT NULL,
+    max_time REAL NOT NULL,
+    rows_examined INTEGER NOT NULL,
+    rows_sent INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_digests_run ON digests (run_id, digest);
+CREATE INDEX IF NOT EXISTS idx_digests_digest ON digests (digest, run_id);
+
+CREATE TABLE IF NOT EXISTS suggestions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    digest TEXT NOT NULL,
+    type TEXT NOT NULL,
+    table_name TEXT,
+    columns TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_suggestions_run ON suggestions (run_id, type);
+CREATE INDEX IF NOT EXISTS idx_suggestions_digest ON suggestions (digest, run_id);
+"""
+
+
+def case_key_for(test_result):
+    """返回测试用例的稳定键"""
+    if test_result.get('case_id'):
+        return test_result['case_id']
+    return test_result['name'].split('（')[0]
+
+
+def case_time(test_result):
+    """用于比较的用例耗时：有计时统计时取中位数，旧结果取平均值"""
+    timing = test_result.get('timing')
+    return timing['median'] if timing else test_result['avg_time']
+
+
+def recorded_strategies(results):
+    """返回结果中记录的(基准策略ID, {策略ID: 名称})，只包含有测试结果的策略"""
+    spec = results.get('case_spec') or {}
+    labels = spec.get('strategies') or LEGACY_STRATEGIES
+    baseline = spec.get('baseline') or LEGACY_BASELINE
+    return baseline, {strategy: label for strategy, label in labels.items() if isinstance(results.get(strategy), list)}
+
+
+def match_strategy_cases(results):
+    """按用例键匹配基准策略和其他各索引策略的结果
+
+    返回(基准策略ID, {策略ID: 名称}（含基准）, 其他策略ID列表, [(用例名称, 基准结果, {策略ID: 结果})])，
+    只保留所有策略都有结果的用例；没有基准策略的结果时用例列表为空
+    """
+    baseline, labels = recorded_strategies(results)
+    others = [strategy for strategy in labels if strategy != baseline]
+    matched = []
+    for base_test in results.get(baseline, []):
+        case_key = case_key_for(base_test)
+        tests = {strategy: next((t for t in results[strategy] if case_key_for(t) == case_key), None)
+                 for strategy in others}
+        if all(tests.values()):
+            matched.append((base_test['name'].split('（')[0], base_test, tests))
+    return baseline, labels, others, matched
+
+
+def _json_default(obj):
+    """JSON序列化时将无法识别的对象转换为字符串"""
+    if isinstance(obj, datetime):
+        return obj.strftime("%Y-%m-%d %H:%M:%S")
+    return str(obj)
+
+
+class ResultsStore:
+    """历史结果库"""
+
+    def __init__(self, db_path=None):
+        """初始化并创建表结构"""
+        self.db_path = db_path or DEFAULT_DB_PATH
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self.conn = sqlite3.connect(self.db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        """关闭数据库连接"""
+        if self.conn:
+            self.conn.close()
+            self.conn = None
+
+    def _create_run(self, run_type, started_at=None, source_file=None, metadata=None):
+        """创建一条运行记录"""
+        started_at = started_at or datetime.now().isoformat(timespec='seconds')
+        cursor = self.conn.execute(
+            "INSERT INTO runs (run_type, started_at, source_file, metadata) VALUES (?, ?, ?, ?)",
+            (run_type, started_at, source_file,
+             json.dumps(metadata, ensure_ascii=False, default=_json_default) if metadata else None))
+        return cursor.lastrowid
+
+    def has_source_file(self, source_file):
+        """检查结果文件是否已经记录过"""
+        row = self.conn.execute("SELECT 1 FROM runs WHERE source_file = ?", (source_file,)).fetchone()
+        return row is not None
+
+    def record_index_test_run(self, results, source_file=None, started_at=None, metadata=None):
+        """记录一次索引测试运行，返回运行ID"""
+        with self.conn:
+            run_id = self._create_run(RUN_TYPE_INDEX_TEST, started_at, source_file, metadata)
+            for strategy, cases in results.items():
+                # 只有测试用例列表才是策略结果，其他键是附加信息
+                if not isinstance(cases, list):
+                    continue
+                for test_result in cases:
+                    cursor = self.conn.execute(
+                        """INSERT INTO test_cases
+                           (run_id, strategy, case_key, name, query, params, avg_time, explain)
+                           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        (run_id, strategy, case_key_for(test_result), test_result['name'],
+                         test_result.get('query'),
+                         json.dumps(test_result.get('params'), ensure_ascii=False, default=_json_default),
+                         test_result.get('avg_time'),
+                         json.dumps(test_result.get('explain'), ensure_ascii=False, default=_json_default)))
+                    test_case_id = cursor.lastrowid
+                    self.conn.executemany(
+                        "INSERT INTO timings (test_case_id, iteration, seconds) VALUES (?, ?, ?)",
+                        [(test_case_id, i, seconds) for i, seconds in enumerate(test_result.get('times', []))])
+        return run_id
+
+    def record_slow_query_run(self, digest_stats, source_file=None, started_at=None, metadata=None):
+        """记录一次慢查询分析运行，digest_stats为按摘要聚合的统计，返回运行ID"""
+        with self.conn:
+            run_id = self._create_run(RUN_TYPE_SLOW_QUERY, started_at, source_file, metadata)
+            for stats in digest_stats:
+                count = stats['count']
+                self.conn.execute(
+                    """INSERT INTO digests
+                       (run_id, digest, sample_query, schema_name, exec_count, total_time,
+                        avg_time, max_time, rows_examined, rows_sent)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    (run_id, stats['digest'], stats.get('sample_query'), stats.get('schema'), count,
+                     stats['total_time'], stats['total_time'] / count if count else 0.0,
+                     stats['max_time'], stats['rows_examined'], stats['rows_sent']))
+                self.conn.executemany(
+                    """INSERT INTO suggestions (run_id, digest, type, table_name, columns, message)
+                       VALUES (?, ?, ?, ?, ?, ?)""",
+                    [(run_id, stats['digest'], suggestion['type'], suggestion.get('table'),
+                      ','.join(suggestion['columns']) if suggestion.get('columns') else None,
+                      suggestion.get('message'))
+                     for suggestion in stats.get('suggestions', [])])
+        return run_id
+
+    def list_runs(self, run_type=None, limit=20):
+        """列出最近的运行记录"""
+        if run_type:
+            rows = self.conn.execute(
+                "SELECT * FROM runs WHERE run_type = ? ORDER BY started_at DESC, id DESC LIMIT ?",
+                (run_type, limit))
+        else:
+            rows = self.conn.execute("SELECT * FROM runs ORDER BY started_at DESC, id DESC LIMIT ?", (limit,))
+        return [dict(row) for row in rows]
+
+    def latest_runs(self, run_type, count=2):
+        """返回某类型最近的count次运行ID（从新到旧）"""
+        return [run['id'] for run in self.list_runs(run_type, count)]
+
+    def latest_source_file(self, run_type=RUN_TYPE_INDEX_TEST):
+        """返回最近一次运行仍然存在的结果文件"""
+        rows = self.conn.execute(
+            """SELECT source_file FROM runs
+               WHERE run_type = ? AND source_file IS NOT NULL
+               ORDER BY started_at DESC, id DESC""", (run_type,))
+        for row in rows:
+            if os.path.isfile(row['source_file']):
+                return row['source_file']
+        return None
+
+    def trend_test_case(self, case_key, strategy=None, limit=50):
+        """返回测试用例的历史延迟趋势"""
+        sql = """SELECT r.id AS run_id, r.started_at, t.strategy, t.name, t.avg_time
+                 FROM test_cases t JOIN runs r ON r.id = t.run_id
+                 WHERE t.case_key = ?"""
+        params = [case_key]
+        if strategy:
+            sql += " AND t.strategy = ?"
+            params.append(strategy)
+        sql += " ORDER BY r.started_at DESC, r.id DESC LIMIT ?"
+        params.append(limit)
+        rows = [dict(row) for row in self.conn.execute(sql, params)]
+        rows.reverse()
+        return rows
+
+    def trend_digest(self, digest, limit=50):
+        """返回查询摘要的历史趋势"""
+        rows = self.conn.execute(
+            """SELECT r.id AS run_id, r.started_at, d.exec_count, d.avg_time, d.max_time,
+                      d.rows_examined, d.rows_sent, d.sample_query
+               FROM digests d JOIN runs r ON r.id = d.run_id
+               WHERE d.digest = ?
+               ORDER BY r.started_at DESC, r.id DESC LIMIT ?""", (digest, limit))
+        rows = [dict(row) for row in rows]
+        rows.reverse()
+        return rows
+
+    def find_regressions(self, run_type=RUN_TYPE_INDEX_TEST, base_run_id=None, target_run_id=None,
+                         threshold=REGRESSION_THRESHOLD, min_delta=MIN_REGRESSION_DELTA):
+        """比较两次运行，返回延迟增长超过阈值的测试用例或查询摘要
+
+        未指定运行ID时比较该类型最近的两次运行
+        """
+        if base_run_id is None or target_run_id is None:
+            latest = self.latest_runs(run_type, 2)
+            if len(latest) < 2:
+                return []
+            target_run_id = target_run_id or latest[0]
+            base_run_id = base_run_id or latest[1]
+
+        if run_type == RUN_TYPE_INDEX_TEST:
+            sql = """SELECT t.strategy, t.case_key AS key, t.name,
+                            b.avg_time AS base_time, t.avg_time AS target_time
+                     FROM test_cases t
+                     JOIN test_cases b ON b.run_id = ? AND b.strategy = t.strategy AND b.case_key = t.case_key
+                     WHERE t.run_id = ? AND t.avg_time > b.avg_time * (1 + ?)
+                       AND t.avg_time - b.avg_time >= ?"""
+        else:
+            sql = """SELECT NULL AS strategy, t.digest AS key, t.sample_query AS name,
+                            b.avg_time AS base_time, t.avg_time AS target_time
+                     FROM digests t
+                     JOIN digests b ON b.run_id = ? AND b.digest = t.digest
+                     WHERE t.run_id = ? AND t.avg_time > b.avg_time * (1 + ?)
+                       AND t.avg_time - b.avg_time >= ?"""
+
+        regressions = []
+        for row in self.conn.execute(sql, (base_run_id, target_run_id, threshold, min_delta)):
+            regression = dict(row)
+            regression['base_run_id'] = base_run_id
+            regression['target_run_id'] = target_run_id
+            regression['change_pct'] = ((regression['target_time'] - regression['base_time'])
+                                        / regression['base_time'] * 100 if regression['base_time'] else None)
+            regressions.append(regression)
+        regressions.sort(key=lambda r: r['target_time'] - r['base_time'], reverse=True)
+        return regressions
+
+    def import_result_files(self, result_dir=None):
+        """把结果目录中尚未记录的JSON结果文件导入历史结果库"""
+        result_dir = result_dir or RESULT_DIR
+        imported = 0
+        for filename in sorted(os.listdir(result_dir)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(result_dir, filename)
+            if self.has_source_file(path):
+                continue
+
+            match = FILE_TIMESTAMP_PATTERN.search(filename)
+            started_at = (datetime.strptime(match.group(1), "%Y%m%d_%H%M%S").isoformat()
+                          if match else None)
+            try:
+                if filename.startswith("index_test_results_"):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        self.record_index_test_run(json.load(f), source_file=path, started_at=started_at)
+                elif filename.startswith("slow_queries_"):
+                    with open(path, 'r', encoding='utf-8') as f:
+                        digest_stats = aggregate_digests(json.load(f))
+                    self.record_slow_query_run(digest_stats.values(), source_file=path, started_at=started_at)
+                else:
+                    continue
+                imported += 1
+                print(f"已导入: {filename}")
+            except Exception as e:
+                print(f"导入 {filename} 时出错: {e}")
+        return imported
+
+
+def aggregate_digests(queries):
+    """将解析后的慢查询按摘要聚合（不含索引建议）"""
+    digest_stats = {}
+    for query_info in queries:
+        query = query_info.get('query')
+        if not query:
+            continue
+        digest = query_digest(query)
+        query_time = query_info.get('query_time') or 0
+        stats = digest_stats.get(digest)
+        if stats is None:
+            stats = digest_stats[digest] = {
+                'digest': digest, 'sample_query': query, 'schema': query_info.get('schema'),
+                'count': 0, 'total_time': 0.0, 'max_time': 0.0, 'rows_examined': 0, 'rows_sent': 0
+            }
+        stats['count'] += 1
+        stats['total_time'] += query_time
+        stats['max_time'] = max(stats['max_time'], query_time)
+        stats['rows_examined'] += query_info.get('rows_examined') or 0
+        stats['rows_sent'] += query_info.get('rows_sent') or 0
+    return digest_stats
+
+
+def print_rows(rows, columns):
+    """以表格形式打印查询结果"""
+    if not rows:
+        print("没有记录")
+        return
+    print("  ".join(f"{column:<20}" for column in columns))
+    print("-" * (22 * len(columns)))
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if isinstance(value, float):
+                value = f"{value:.6f}"
+            values.append(f"{str(value)[:20]:<20}")
+        print("  ".join(values))
+
+
+def main():
+    """主函数"""
+    print("========== MySQL索引测试 - 历史结果库 ==========")
+
+    parser = argparse.ArgumentParser(description="历史结果库")
+    parser.add_argument("--db", help="历史结果库文件路径")
+    subparsers = parser.add_subparsers(dest="action")
+
+    subparsers.add_parser("import", help="导入data目录中尚未记录的JSON结果文件")
+
+    runs_parser = subparsers.add_parser("runs", help="列出最近的运行记录")
+    runs_parser.add_argument("--type", choices=[RUN_TYPE_INDEX_TEST, RUN_TYPE_SLOW_QUERY])
+
+    trend_parser = subparsers.add_parser("trend", help="查看测试用例或查询摘要的历史趋势")
+    trend_group = trend_parser.add_mutually_exclusive_group(required=True)
+    trend_group.add_argument("--case", help="测试用例键（如: 按用户名查询）")
+    trend_group.add_argument("--digest", help="查询摘要")
+    trend_parser.add_argument("--strategy", help="索引策略（仅用于--case）")
+
+    regress_parser = subparsers.add_parser("regressions", help="检测两次运行之间的延迟回退")
+    regress_parser.add_argument("--type", choices=[RUN_TYPE_INDEX_TEST, RUN_TYPE_SLOW_QUERY],
+                                default=RUN_TYPE_INDEX_TEST)
+    regress_parser.add_argument("--base", type=int, help="基准运行ID（默认为倒数第二次运行）")
+    regress_parser.add_argument("--target", type=int, help="目标运行ID（默认为最近一次运行）")
+    regress_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                                help="延迟增长比例阈值（默认为0.2）")
+
+    args = parser.parse_args()
+    store = ResultsStore(args.db)
+
+    try:
+        if args.action == "import":
+            imported = store.import_result_files()
+            print(f"\n共导入 {imported} 个结果文件")
+        elif args.action == "runs":
+            print_rows(store.list_runs(args.type), ['id', 'run_type', 'started_at', 'source_file'])
+        elif args.action == "trend":
+            if args.case:
+                rows = store.trend_test_case(args.case, args.strategy)
+                print_rows(rows, ['run_id', 'started_at', 'strategy', 'avg_time'])
+            else:
+                rows = store.trend_digest(args.digest)
+                print_rows(rows, ['run_id', 'started_at', 'exec_count', 'avg_time', 'max_time'])
+        elif args.action == "regressions":
+            regressions = store.find_regressions(args.type, args.base, args.target, args.threshold)
+            if regressions:
+                print(f"\n发现 {len(regressions)} 处延迟回退:")
+                for i, regression in enumerate(regressions):
+                    label = f"[{regression['strategy']}] " if regression['strategy'] else ""
+                    # 基准耗时为0时没有变化百分比
+                    change = f"+{regression['change_pct']:.2f}%" if regression['change_pct'] is not None else "-"
+                    print(f"{i+1}. {label}{regression['key']}: {regression['base_time']:.6f}秒 -> "
+                          f"{regression['target_time']:.6f}秒 ({change})")
+            else:
+                print("\n未发现延迟回退")
+        else:
+            parser.print_help()
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
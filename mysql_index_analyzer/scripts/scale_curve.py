@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 数据规模曲线
+按一组缩放因子依次生成数据（保存/复用各规模的快照）并运行索引测试矩阵，
+在对数坐标下拟合每个查询在各索引策略下的耗时与行数的幂律关系（耗时 = a × 行数^b），
+并估算基准策略（无索引时的全表扫描）的耗时在多大的数据量下超过SLA
+"""
+
+import os
+import sys
+import json
+import glob
+import math
+import argparse
+from datetime import datetime
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from main import run_script
+from results_store import case_time
+
+# 配置matplotlib支持中文显示
+plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans']
+plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+plt.rcParams['font.family'] = 'sans-serif'
+
+# 配置
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+RESULT_DIR = os.path.join(PROJECT_DIR, "data")  # 结果保存目录
+VISUALIZATION_DIR = os.path.join(PROJECT_DIR, "visualization")  # 可视化结果保存目录
+
+# 确保结果目录存在
+os.makedirs(RESULT_DIR, exist_ok=True)
+os.makedirs(VISUALIZATION_DIR, exist_ok=True)
+
+# 规模曲线配置（缩放因子1对应100万订单，0.01约为1万订单，100约为1亿订单）
+DEFAULT_SCALES = (0.01, 0.1, 1, 10)
+DEFAULT_SLA_MS = 100  # 查询耗时的SLA（毫秒）
+# 生成数据的参考日期：固定后各规模的快照在之后的运行中仍可复用，日期范围查询的结果也可比较
+DEFAULT_REFERENCE_DATE = "2024-01-01"
+MAX_EXTRAPOLATION = 100  # 最多外推到实测最大行数的倍数，超出后不再报告达到SLA的行数
+CHART_COLUMNS = 2  # 图表每行的子图数
+
+
+def dataset_label(scale):
+    """缩放因子对应的数据集标签"""
+    return f"scale{scale:g}"
+
+
+def find_result_file(label, since):
+    """返回since之后生成的、数据集标签为label的最新索引测试结果文件"""
+    candidates = []
+    for path in glob.glob(os.path.join(RESULT_DIR, "index_test_results_*.json")):
+        if os.path.getmtime(path) < since:
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                dataset = json.load(f).get('dataset') or {}
+        except Exception:
+            continue
+        if dataset.get('label') == label:
+            candidates.append(path)
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def run_scale(scale, args):
+    """生成一种规模的数据并运行索引测试，返回结果文件"""
+    label = dataset_label(scale)
+    print(f"\n==================== 数据规模: {label} ====================")
+    generate_args = [str(scale)]
+    if args.snapshot:
+        # 已有相同规模的快照时直接恢复，否则生成后保存快照供下次复用
+        generate_args.append("--snapshot")
+    generate_args.extend(["--reference-date", args.reference_date])
+    if args.seed is not None:
+        generate_args.extend(["--seed", str(args.seed)])
+    if args.spec:
+        generate_args.extend(["--spec", args.spec])
+    if not run_script("data_generator.py", generate_args):
+        return None
+
+    started = datetime.now().timestamp()
+    test_args = ["--dataset", label, "--cache-mode", args.cache_mode]
+    if not args.writes:
+        test_args.append("--skip-writes")
+    if args.cases:
+        test_args.extend(["--cases", args.cases])
+    if not run_script("index_tester.py", test_args):
+        return None
+    result_file = find_result_file(label, started)
+    if not result_file:
+        print(f"没有找到数据集 {label} 的索引测试结果")
+    return result_file
+
+
+def load_points(result_files):
+    """读取各结果文件，返回 ({策略: {查询ID: [(行数, 耗时)]}}, 基准策略, 查询名称)"""
+    points = {}
+    baseline = None
+    names = {}
+    for path in result_files:
+        with open(path, 'r', encoding='utf-8') as f:
+            results = json.load(f)
+        rows = (results.get('dataset') or {}).get('total_rows')
+        if not rows:
+            print(f"结果文件 {path} 没有记录数据集的行数，跳过")
+            continue
+        spec = results.get('case_spec') or {}
+        baseline = baseline or spec.get('baseline')
+        names.update(spec.get('queries', {}))
+        for strategy, cases in results.items():
+            # 只有测试用例列表才是策略结果，其他键是附加信息
+            if not isinstance(cases, list) or strategy == 'partitioning':
+                continue
+            for case in cases:
+                case_id = case.get('case_id')
+                if case_id:
+                    points.setdefault(strategy, {}).setdefault(case_id, []).append((rows, case_time(case)))
+    return points, baseline, names
+
+
+def fit_power_law(points):
+    """在对数坐标下用最小二乘拟合 耗时 = a × 行数^b，返回{a, b, r2}；不同行数少于2个时返回None"""
+    points = [(rows, seconds) for rows, seconds in points if rows > 0 and seconds > 0]
+    if len({rows for rows, _ in points}) < 2:
+        return None
+    x = np.log([rows for rows, _ in points])
+    y = np.log([seconds for _, seconds in points])
+    b, log_a = np.polyfit(x, y, 1)
+    predicted = log_a + b * x
+    total = float(np.sum((y - y.mean()) ** 2))
+    r2 = 1 - float(np.sum((y - predicted) ** 2)) / total if total else 1.0
+    return {'a': float(math.exp(log_a)), 'b': float(b), 'r2': r2}
+
+
+def sla_crossing(fit, sla_seconds, max_rows):
+    """拟合曲线达到SLA时的行数；耗时不随行数增长或超过max_rows时返回None"""
+    if not fit or fit['b'] <= 0:
+        return None
+    crossing = (sla_seconds / fit['a']) ** (1 / fit['b'])
+    return crossing if crossing <= max_rows else None
+
+
+def analyze(points, baseline, sla_seconds):
+    """拟合每个查询在各策略下的曲线，并计算达到SLA的行数"""
+    curves = {}
+    for strategy, cases in points.items():
+        for case_id, case_points in cases.items():
+            case_points = sorted(case_points)
+            fit = fit_power_law(case_points)
+            measured = [rows for rows, _ in case_points]
+            crossing = sla_crossing(fit, sla_seconds, measured[-1] * MAX_EXTRAPOLATION)
+            curves.setdefault(case_id, {})[strategy] = {
+                'points': case_points,
+                'max_rows': measured[-1],
+                'fit': fit,
+                'sla_rows': crossing,
+                # 达到SLA的行数是否在实测范围内（否则为外推）
+                'sla_extrapolated': crossing is not None and not (measured[0] <= crossing <= measured[-1]),
+                'baseline': strategy == baseline
+            }
+    return curves
+
+
+def print_summary(curves, names, sla_ms):
+    """输出各查询的增长指数和达到SLA的行数"""
+    print(f"\n==================== 数据规模曲线（SLA {sla_ms:g}ms） ====================")
+    for case_id, strategies in curves.items():
+        print(f"\n{names.get(case_id, case_id)}:")
+        for strategy, curve in strategies.items():
+            fit = curve['fit']
+            if not fit:
+                print(f"  {strategy}: 数据规模不足，无法拟合")
+                continue
+            if curve['sla_rows'] is None:
+                crossing = f"{curve['max_rows'] * MAX_EXTRAPOLATION:,.0f} 行（实测最大行数的{MAX_EXTRAPOLATION}倍）以内不会超过SLA"
+            else:
+                crossing = f"约 {curve['sla_rows']:,.0f} 行时超过SLA" + ("（外推）" if curve['sla_extrapolated'] else "")
+            print(f"  {strategy}{'（基准）' if curve['baseline'] else ''}: 耗时 ∝ 行数^{fit['b']:.2f}"
+                  f"（R²={fit['r2']:.3f}），{crossing}")
+
+
+def plot_curves(curves, names, sla_seconds, timestamp):
+    """在对数坐标下绘制每个查询各策略的耗时、拟合曲线和SLA"""
+    count = len(curves)
+    chart_rows = math.ceil(count / CHART_COLUMNS)
+    fig, axes = plt.subplots(chart_rows, CHART_COLUMNS, figsize=(7 * CHART_COLUMNS, 5 * chart_rows), squeeze=False)
+    for ax, (case_id, strategies) in zip(axes.flat, curves.items()):
+        for strategy, curve in strategies.items():
+            x = [rows for rows, _ in curve['points']]
+            y = [seconds * 1000 for _, seconds in curve['points']]
+            line = ax.plot(x, y, 'o', label=strategy)[0]
+            if curve['fit']:
+                fit_x = np.geomspace(min(x), max(x + [curve['sla_rows'] or 0]), 50)
+                ax.plot(fit_x, curve['fit']['a'] * fit_x ** curve['fit']['b'] * 1000, '--', color=line.get_color())
+        ax.axhline(sla_seconds * 1000, color='red', linestyle=':', label='SLA')
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_title(names.get(case_id, case_id))
+        ax.set_xlabel('总行数')
+        ax.set_ylabel('查询时间中位数（毫秒）')
+        ax.legend(fontsize='small')
+    for ax in list(axes.flat)[count:]:
+        ax.set_visible(False)
+
+    chart_file = os.path.join(VISUALIZATION_DIR, f"scale_curve_{timestamp}.png")
+    plt.tight_layout()
+    plt.savefig(chart_file)
+    plt.close()
+    print(f"图表已保存到: {chart_file}")
+
+
+def main():
+    """主函数"""
+    print("========== MySQL索引测试 - 数据规模曲线 ==========")
+
+    parser = argparse.ArgumentParser(description="在多种数据规模下运行索引测试，拟合耗时随行数的增长并估算达到SLA的数据量")
+    parser.add_argument("--scales", type=float, nargs="+", default=list(DEFAULT_SCALES),
+                        help=f"数据量缩放因子列表（默认为{' '.join(f'{scale:g}' for scale in DEFAULT_SCALES)}）")
+    parser.add_argument("--sla-ms", type=float, default=DEFAULT_SLA_MS, help=f"查询耗时的SLA（毫秒，默认为{DEFAULT_SLA_MS}）")
+    parser.add_argument("--no-snapshot", dest="snapshot", action="store_false",
+                        help="不保存/复用各规模的数据集快照（默认复用）")
+    parser.add_argument("--seed", type=int, help="数据生成的随机种子")
+    parser.add_argument("--reference-date", default=DEFAULT_REFERENCE_DATE,
+                        help=f"生成数据的参考日期YYYY-MM-DD（默认为{DEFAULT_REFERENCE_DATE}，固定后可复用各规模的快照）")
+    parser.add_argument("--spec", help="JSON/YAML格式的声明式表结构")
+    parser.add_argument("--cases", help="JSON/YAML格式的测试查询和索引策略配置（默认为specs/index_cases.json）")
+    parser.add_argument("--cache-mode", choices=["warm", "cold", "both"], default="warm",
+                        help="索引测试的缓存状态（默认为warm，冷缓存在大数据量下很慢）")
+    parser.add_argument("--writes", action="store_true", help="同时测试各索引策略的写入代价（默认跳过）")
+    parser.add_argument("--results", nargs="+", help="直接使用已有的索引测试结果文件拟合，不生成数据和运行测试")
+    args = parser.parse_args()
+
+    if args.results:
+        result_files = args.results
+    else:
+        result_files = []
+        for scale in sorted(args.scales):
+            result_file = run_scale(scale, args)
+            if result_file:
+                result_files.append(result_file)
+
+    points, baseline, names = load_points(result_files)
+    if not points:
+        print("没有可用的测试结果")
+        sys.exit(1)
+    sla_seconds = args.sla_ms / 1000
+    curves = analyze(points, baseline, sla_seconds)
+    print_summary(curves, names, args.sla_ms)
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    result_file = os.path.join(RESULT_DIR, f"scale_curve_{timestamp}.json")
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump({'sla_ms': args.sla_ms, 'baseline': baseline,
+                   # 直接使用已有结果文件时数据不是本次生成的，不记录参考日期
+                   'reference_date': None if args.results else args.reference_date,
+                   'result_files': result_files, 'curves': curves},
+                  f, ensure_ascii=False, indent=2)
+    print(f"\n规模曲线结果已保存到: {result_file}")
+    plot_curves(curves, names, sla_seconds, timestamp)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 声明式表结构
+从JSON/YAML文件读取表、列类型、列生成器、外键关系和行数，生成建表语句，
+并按批向量化生成数据，交给数据生成器的并行导入流程写入数据库。
+父表ID固定为1..行数，外键直接在该范围内抽样，无需把父表读入内存
+"""
+
+import re
+import json
+import hashlib
+from faker import Faker
+
+import numpy as np
+
+from distributions import (WeightedChoice, NumericSampler, zipf_ranks, zipf_weights, scatter_ranks,
+                           seasonal_weights)
+from vectorized_generator import get_faker_pool, draw_values, format_datetimes, batch_ranges
+
+SECONDS_PER_DAY = 86400
+FAKER_POOL_SIZE = 10000  # faker列默认的取值池大小
+DEFAULT_LOCALE = 'zh_CN'
+
+# 支持的列生成器
+GENERATOR_TYPES = ('int', 'float', 'choice', 'bool', 'datetime', 'faker', 'template', 'foreign_key', 'constant')
+
+# 未指定列类型时按生成器推断
+DEFAULT_COLUMN_TYPES = {
+    'int': 'INT',
+    'bool': 'TINYINT(1)',
+    'datetime': 'DATETIME',
+    'faker': 'VARCHAR(255)',
+    'template': 'VARCHAR(255)',
+    'constant': 'VARCHAR(255)'
+}
+
+
+def read_spec_file(path):
+    """读取JSON或YAML格式的配置文件"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith(('.yml', '.yaml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("读取YAML格式的配置需要安装PyYAML（pip install pyyaml），或改用JSON格式")
+            return yaml.safe_load(f)
+        return json.load(f)
+
+
+def _column_type(column, generator, id_types):
+    """返回列的SQL类型，未指定时按生成器推断"""
+    if column.get('type'):
+        return column['type']
+    kind = generator['type']
+    if kind == 'float':
+        return f"DECIMAL(12,{generator.get('decimals', 2)})"
+    if kind == 'choice':
+        return f"VARCHAR({max(len(str(value)) for value in generator['values'])})"
+    if kind == 'foreign_key':
+        return id_types[generator['references']]
+    return DEFAULT_COLUMN_TYPES[kind]
+
+
+def _estimate_row_bytes(columns):
+    """估算一行在INSERT语句中的字节数，用于按max_allowed_packet计算批量大小"""
+    total = 12
+    for column in columns:
+        match = re.search(r'CHAR\((\d+)\)', column['type'], re.IGNORECASE)
+        if match:
+            total += int(match.group(1)) + 3
+        elif 'TEXT' in column['type'].upper():
+            total += 300
+        else:
+            total += 22
+    return total
+
+
+def _sort_tables(tables):
+    """按外键依赖排序，父表排在子表之前"""
+    ordered = []
+    visiting = set()
+    done = set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"外键存在循环引用: {name}")
+        visiting.add(name)
+        for parent in tables[name]['parents']:
+            visit(parent)
+        visiting.discard(name)
+        done.add(name)
+        ordered.append(tables[name])
+
+    for name in tables:
+        visit(name)
+    return ordered
+
+
+def load_spec(path, scale_factor=1.0, default_database=None):
+    """读取并校验声明式表结构，返回按依赖排序的表定义"""
+    raw = read_spec_file(path)
+    if not isinstance(raw, dict) or not raw.get('tables'):
+        raise ValueError("配置中必须包含非空的tables列表")
+    locale = raw.get('locale', DEFAULT_LOCALE)
+    fake = Faker(locale)
+
+    # 先确定每张表的行数和主键类型，供外键列引用
+    raw_tables = {}
+    id_types = {}
+    for table in raw['tables']:
+        name = table.get('name')
+        if not name or name in raw_tables:
+            raise ValueError(f"表名为空或重复: {name}")
+        if not table.get('columns'):
+            raise ValueError(f"表 {name} 没有定义列")
+        rows = max(int(table['rows'] * scale_factor), 1)
+        raw_tables[name] = (table, rows)
+        id_types[name] = table.get('id_type', 'BIGINT' if rows > 2 ** 31 - 1 else 'INT')
+
+    tables = {}
+    for name, (table, rows) in raw_tables.items():
+        columns = []
+        foreign_keys = []
+        parents = []
+        seen = {'id'}
+        for column in table['columns']:
+            column_name = column.get('name')
+            generator = column.get('generator', {'type': 'int'})
+            kind = generator.get('type')
+            if not column_name or column_name in seen:
+                raise ValueError(f"表 {name} 的列名为空或重复: {column_name}")
+            if kind not in GENERATOR_TYPES:
+                raise ValueError(f"{name}.{column_name} 的生成器类型不支持: {kind}（可选: {', '.join(GENERATOR_TYPES)}）")
+            if kind == 'foreign_key':
+                parent = generator.get('references')
+                if parent not in raw_tables:
+                    raise ValueError(f"{name}.{column_name} 引用的表不存在: {parent}")
+                if parent == name:
+                    raise ValueError(f"{name}.{column_name} 不支持自引用外键")
+                parents.append(parent)
+                foreign_keys.append((f"fk_{name}_{column_name}", column_name, f"{parent}(id)"))
+            elif kind == 'choice' and not generator.get('values'):
+                raise ValueError(f"{name}.{column_name} 的choice生成器必须提供values")
+            elif kind == 'faker' and not callable(getattr(fake, generator.get('provider', ''), None)):
+                raise ValueError(f"{name}.{column_name} 的Faker方法不存在: {generator.get('provider')}")
+            elif kind == 'template' and '{id}' not in generator.get('format', ''):
+                raise ValueError(f"{name}.{column_name} 的template必须包含{{id}}")
+            elif kind == 'datetime' and generator.get('after') and generator['after'] not in seen:
+                raise ValueError(f"{name}.{column_name} 的after必须引用之前定义的日期列")
+            seen.add(column_name)
+            columns.append({
+                'name': column_name,
+                'type': _column_type(column, generator, id_types),
+                'nullable': generator.get('null_ratio', 0) > 0 or column.get('nullable', False),
+                'generator': generator
+            })
+
+        indexes = []
+        for index in table.get('indexes', []):
+            index_columns = index['columns'] if isinstance(index['columns'], list) else [index['columns']]
+            unknown = [column for column in index_columns if column not in seen]
+            if unknown:
+                raise ValueError(f"表 {name} 的索引引用了不存在的列: {', '.join(unknown)}")
+            index_name = index.get('name') or f"idx_{name}_{'_'.join(index_columns)}"
+            indexes.append((index_name, ', '.join(index_columns)))
+
+        tables[name] = {
+            'name': name,
+            'rows': rows,
+            'label': f"{name}表数据",
+            'id_type': id_types[name],
+            'columns': ('id',) + tuple(column['name'] for column in columns),
+            'column_specs': columns,
+            'indexes': indexes,
+            'foreign_keys': foreign_keys,
+            'parents': parents,
+            'row_bytes': _estimate_row_bytes(columns)
+        }
+
+    text = json.dumps(raw, sort_keys=True, ensure_ascii=False)
+    return {
+        'database': raw.get('database', default_database),
+        'locale': locale,
+        'label': f"spec{hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]}",
+        'tables': _sort_tables(tables)
+    }
+
+
+def create_table_sql(table, foreign_keys=True):
+    """生成建表语句，foreign_keys为False时外键留到导入后再添加"""
+    lines = [f"id {table['id_type']} AUTO_INCREMENT PRIMARY KEY"]
+    for column in table['column_specs']:
+        lines.append(f"{column['name']} {column['type']}{'' if column['nullable'] else ' NOT NULL'}")
+    if foreign_keys:
+        lines.extend(f"CONSTRAINT {name} FOREIGN KEY ({column}) REFERENCES {reference}"
+                     for name, column, reference in table['foreign_keys'])
+    return f"CREATE TABLE {table['name']} (\n    " + ",\n    ".join(lines) + "\n) ENGINE=InnoDB"
+
+
+def _int_generator(spec):
+    """整数列：uniform/zipf/normal"""
+    low, high = spec.get('min', 0), spec.get('max', 1000000)
+    distribution = spec.get('distribution', 'uniform')
+    if distribution == 'zipf':
+        return lambda rng, n, ids, state: low + zipf_ranks(rng, high - low + 1, spec.get('s', 1.1), n) - 1
+    if distribution == 'normal':
+        sampler = NumericSampler('normal', spec, low, high, True)
+        return lambda rng, n, ids, state: sampler.draw_array(rng, n)
+    return lambda rng, n, ids, state: rng.integers(low, high + 1, n)
+
+
+def _float_generator(spec):
+    """小数列：uniform/normal/lognormal"""
+    low, high = spec.get('min', 0), spec.get('max', 10000)
+    decimals = spec.get('decimals', 2)
+    distribution = spec.get('distribution', 'uniform')
+    if distribution in ('normal', 'lognormal'):
+        sampler = NumericSampler(distribution, spec, low, high, False, decimals)
+        return lambda rng, n, ids, state: sampler.draw_array(rng, n)
+    return lambda rng, n, ids, state: np.round(rng.uniform(low, high, n), decimals)
+
+
+def _choice_generator(spec):
+    """枚举列：按weights或Zipf参数s抽样，都未指定时均匀抽样"""
+    values = spec['values']
+    if 'weights' in spec:
+        weights = spec['weights']
+    elif 's' in spec:
+        weights = zipf_weights(len(values), spec['s'])
+    else:
+        weights = [1] * len(values)
+    choice = WeightedChoice(values, weights)
+    return lambda rng, n, ids, state: choice.draw_array(rng, n)
+
+
+def _datetime_generator(column, spec, reference_time):
+    """日期列：往前days_back天内均匀或按季节性分布，after表示在另一日期列之后"""
+    low, high = spec.get('days_back', [0, 365])
+    with_time = spec.get('with_time', False)
+    date_only = column['type'].upper() == 'DATE'
+    seasonal = None
+    if spec.get('seasonal'):
+        seasonal = WeightedChoice(list(range(low, high + 1)),
+                                  seasonal_weights(low, high, reference_time, spec['seasonal']))
+
+    def generate(rng, n, ids, state):
+        if spec.get('after'):
+            # 在引用列和参考时间之间均匀取值
+            base = state[spec['after']]
+            offsets = base + (rng.random(n) * -base).astype(np.int64)
+        else:
+            days = seasonal.draw_array(rng, n).astype(np.int64) if seasonal else rng.integers(low, high + 1, n)
+            offsets = -days * SECONDS_PER_DAY
+            if with_time:
+                offsets = offsets - rng.integers(0, SECONDS_PER_DAY, n)
+        state[column['name']] = offsets
+        text = format_datetimes(offsets, state['reference'])
+        return [value[:10] for value in text] if date_only else text
+
+    return generate
+
+
+def _foreign_key_generator(spec, table_rows):
+    """外键列：在父表ID范围1..行数内均匀或按Zipf分布抽样（热门父行打散在整个ID范围内）"""
+    parent_rows = table_rows[spec['references']]
+    if spec.get('distribution') == 'zipf':
+        s = spec.get('s', 1.1)
+        return lambda rng, n, ids, state: scatter_ranks(zipf_ranks(rng, parent_rows, s, n), parent_rows)
+    return lambda rng, n, ids, state: rng.integers(1, parent_rows + 1, n)
+
+
+def _column_generator(column, table_rows, seed, locale, reference_time):
+    """根据列的生成器配置创建生成函数"""
+    spec = column['generator']
+    kind = spec['type']
+    if kind == 'int':
+        return _int_generator(spec)
+    if kind == 'float':
+        return _float_generator(spec)
+    if kind == 'choice':
+        return _choice_generator(spec)
+    if kind == 'bool':
+        ratio = spec.get('true_ratio', 0.5)
+        return lambda rng, n, ids, state: (rng.random(n) < ratio).astype(np.int64)
+    if kind == 'datetime':
+        return _datetime_generator(column, spec, reference_time)
+    if kind == 'faker':
+        pool = get_faker_pool(seed, spec['provider'], spec.get('pool_size', FAKER_POOL_SIZE), locale)
+        return lambda rng, n, ids, state: draw_values(rng, pool, n)
+    if kind == 'template':
+        template = spec['format']
+        return lambda rng, n, ids, state: [template.format(id=value) for value in ids]
+    if kind == 'foreign_key':
+        return _foreign_key_generator(spec, table_rows)
+    value = spec.get('value')
+    return lambda rng, n, ids, state: [value] * n
+
+
+def _to_list(values):
+    """把生成的列转换为Python对象列表"""
+    return values.tolist() if isinstance(values, np.ndarray) else list(values)
+
+
+def build_spec_batches(rng, start_id, end_id, reference_time, context):
+    """按批向量化生成声明式表的数据"""
+    table = context['spec_table']
+    if 'generators' not in context:
+        context['generators'] = [
+            (column, _column_generator(column, context['table_rows'], context['seed'], context['locale'],
+                                       reference_time))
+            for column in table['column_specs']
+        ]
+
+    for batch_start, batch_end in batch_ranges(start_id, end_id, context['batch_size']):
+        n = batch_end - batch_start + 1
+        ids = list(range(batch_start, batch_end + 1))
+        state = {'reference': np.datetime64(reference_time, 's')}
+        columns = [ids]
+        for column, generate in context['generators']:
+            values = _to_list(generate(rng, n, ids, state))
+            null_ratio = column['generator'].get('null_ratio', 0)
+            if null_ratio > 0:
+                for index in np.flatnonzero(rng.random(n) < null_ratio):
+                    values[index] = None
+            columns.append(values)
+        yield list(zip(*columns))
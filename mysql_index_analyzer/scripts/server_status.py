@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 服务器状态和缓冲池控制
+读取SHOW STATUS计数器的差值和performance_schema中语句的服务器端耗时，并控制InnoDB缓冲池的冷/热状态：
+冷缓存通过扫描一张比缓冲池更大的填充表把测试数据挤出缓冲池（或调用重启MySQL的外部命令），
+热缓存通过执行若干次受控的预读查询把数据页读入缓冲池
+"""
+
+import os
+import time
+import subprocess
+
+# 缓存状态模式: warm 预读后测量, cold 每次执行前清空缓冲池
+CACHE_MODES = ('warm', 'cold')
+# 每次执行记录的缓冲池计数器: 从磁盘读取的页数和逻辑读请求数
+BUFFER_POOL_STATUS = ('Innodb_buffer_pool_reads', 'Innodb_buffer_pool_read_requests')
+# 每条语句记录的会话计数器（Innodb_*只有全局值，SHOW SESSION STATUS返回的是全局值）
+STATEMENT_STATUS = (
+    'Handler_read_first', 'Handler_read_key', 'Handler_read_last', 'Handler_read_next',
+    'Handler_read_prev', 'Handler_read_rnd', 'Handler_read_rnd_next',
+    'Innodb_rows_read', 'Created_tmp_tables', 'Created_tmp_disk_tables'
+) + BUFFER_POOL_STATUS
+PICOSECONDS = 1e12  # performance_schema的计时单位为皮秒
+STATEMENT_HISTORY_DEPTH = 5  # 查找被测语句时检查的最近语句数
+
+# 清空缓冲池的方式: scan 扫描填充表, restart 执行重启命令
+EVICT_METHODS = ('scan', 'restart')
+FILLER_TABLE = '_cache_filler'  # 填充表
+FILLER_RATIO = 1.5  # 填充表大小为缓冲池的倍数
+FILLER_ROW_BYTES = 1024  # 填充表单行的估算字节数
+FILLER_SEED_ROWS = 1000  # 填充表初始行数，之后按倍数自我复制
+RESTART_COMMAND_ENV = 'MYSQL_RESTART_COMMAND'  # 重启MySQL的命令（如 sudo systemctl restart mysql）
+RESTART_TIMEOUT = 120  # 重启后等待重新连接的秒数
+
+
+def read_status(conn, names=BUFFER_POOL_STATUS, scope='GLOBAL'):
+    """读取指定的状态计数器，scope为GLOBAL或SESSION"""
+    cursor = conn.cursor()
+    placeholders = ", ".join(["%s"] * len(names))
+    cursor.execute(f"SHOW {scope} STATUS WHERE Variable_name IN ({placeholders})", tuple(names))
+    status = {name: int(value) for name, value in cursor.fetchall()}
+    cursor.close()
+    return status
+
+
+def status_delta(before, after):
+    """两次读取的计数器差值"""
+    return {name: after[name] - before.get(name, 0) for name in after}
+
+
+def read_variable(conn, name):
+    """读取全局系统变量"""
+    cursor = conn.cursor()
+    cursor.execute(f"SELECT @@GLOBAL.{name}")
+    value = cursor.fetchone()[0]
+    cursor.close()
+    return value
+
+
+class StatementProbe:
+    """记录一条语句执行前后的会话计数器差值，以及performance_schema中该语句的服务器端耗时
+
+    SHOW STATUS本身也会增加部分计数器，初始化时测量两次连续读取之间的差值作为开销并在结果中扣除
+    """
+
+    def __init__(self, conn):
+        self.overhead = {}
+        self.history_enabled = self._enable_history(conn)
+        first = read_status(conn, STATEMENT_STATUS, 'SESSION')
+        second = read_status(conn, STATEMENT_STATUS, 'SESSION')
+        self.overhead = status_delta(first, second)
+        self.before = {}
+
+    def _enable_history(self, conn):
+        """确认performance_schema记录语句历史，未开启时尝试开启"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT ENABLED FROM performance_schema.setup_consumers "
+                           "WHERE NAME = 'events_statements_history'")
+            row = cursor.fetchone()
+            if row is None:
+                return False
+            if row[0] != 'YES':
+                cursor.execute("UPDATE performance_schema.setup_consumers SET ENABLED = 'YES' "
+                               "WHERE NAME = 'events_statements_history'")
+            return True
+        except Exception as e:
+            print(f"performance_schema语句历史不可用（{e}），不记录服务器端耗时")
+            return False
+        finally:
+            cursor.close()
+
+    def begin(self, conn):
+        """在被测语句执行前调用"""
+        self.before = read_status(conn, STATEMENT_STATUS, 'SESSION')
+
+    def end(self, conn):
+        """在被测语句执行后调用，返回计数器差值和服务器端耗时"""
+        after = read_status(conn, STATEMENT_STATUS, 'SESSION')
+        delta = status_delta(self.before, after)
+        status = {name: max(value - self.overhead.get(name, 0), 0) for name, value in delta.items()}
+        result = {'status': status}
+        if self.history_enabled:
+            result.update(self.last_statement(conn) or {})
+        return result
+
+    def last_statement(self, conn):
+        """从本连接的语句历史中找到最近一条被测语句（跳过SHOW STATUS）"""
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT SQL_TEXT, TIMER_WAIT, LOCK_TIME, ROWS_SENT, ROWS_EXAMINED,
+                   CREATED_TMP_DISK_TABLES, NO_INDEX_USED
+            FROM performance_schema.events_statements_history
+            WHERE THREAD_ID = (SELECT THREAD_ID FROM performance_schema.threads
+                               WHERE PROCESSLIST_ID = CONNECTION_ID())
+            ORDER BY EVENT_ID DESC
+            LIMIT {STATEMENT_HISTORY_DEPTH}
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+        for sql_text, timer_wait, lock_time, rows_sent, rows_examined, tmp_disk_tables, no_index_used in rows:
+            if sql_text and sql_text.lstrip().upper().startswith('SHOW'):
+                continue
+            return {
+                'server_time': timer_wait / PICOSECONDS,
+                'lock_time': lock_time / PICOSECONDS,
+                'rows_sent': rows_sent,
+                'rows_examined': rows_examined,
+                'created_tmp_disk_tables': tmp_disk_tables,
+                'no_index_used': bool(no_index_used)
+            }
+        return None
+
+
+def prewarm(func, runs=1):
+    """执行若干次预读，把查询用到的数据页读入缓冲池（热缓存）"""
+    for _ in range(runs):
+        func()
+
+
+class BufferPoolController:
+    """清空InnoDB缓冲池中的测试数据，用于冷缓存测量"""
+
+    def __init__(self, conn, method='scan', restart_command=None, reconnect=None):
+        """method为restart时需要提供restart_command（默认读取环境变量）和返回新连接的reconnect函数"""
+        if method not in EVICT_METHODS:
+            raise ValueError(f"未知的缓冲池清空方式: {method}")
+        self.conn = conn
+        self.method = method
+        self.restart_command = restart_command or os.environ.get(RESTART_COMMAND_ENV)
+        self.reconnect = reconnect
+        self.filler_ready = False
+        if method == 'restart':
+            if not self.restart_command or not reconnect:
+                raise ValueError(f"restart方式需要设置环境变量{RESTART_COMMAND_ENV}")
+            if read_variable(conn, 'innodb_buffer_pool_load_at_startup'):
+                print("警告: innodb_buffer_pool_load_at_startup已开启，重启后缓冲池会被重新加载，冷缓存测量不准确")
+
+    def _prepare_filler(self):
+        """创建比缓冲池更大的填充表（只创建一次）"""
+        pool_size = read_variable(self.conn, 'innodb_buffer_pool_size')
+        target_rows = int(pool_size * FILLER_RATIO / FILLER_ROW_BYTES)
+        cursor = self.conn.cursor()
+        cursor.execute(f"""
+        CREATE TABLE IF NOT EXISTS {FILLER_TABLE} (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            pad1 CHAR(255) NOT NULL,
+            pad2 CHAR(255) NOT NULL,
+            pad3 CHAR(255) NOT NULL,
+            pad4 CHAR(255) NOT NULL
+        ) ENGINE=InnoDB
+        """)
+        cursor.execute(f"SELECT COUNT(*) FROM {FILLER_TABLE}")
+        rows = cursor.fetchone()[0]
+        if rows < target_rows:
+            print(f"创建缓冲池填充表 {FILLER_TABLE}（缓冲池 {pool_size / 1024 / 1024:.0f} MB，"
+                  f"目标 {target_rows:,} 行）...")
+            if rows == 0:
+                cursor.executemany(f"INSERT INTO {FILLER_TABLE} (pad1, pad2, pad3, pad4) VALUES (%s, %s, %s, %s)",
+                                   [(f"a{i}", f"b{i}", f"c{i}", f"d{i}") for i in range(FILLER_SEED_ROWS)])
+                rows = FILLER_SEED_ROWS
+            while rows < target_rows:
+                cursor.execute(f"INSERT INTO {FILLER_TABLE} (pad1, pad2, pad3, pad4) "
+                               f"SELECT pad1, pad2, pad3, pad4 FROM {FILLER_TABLE} LIMIT %s", (target_rows - rows,))
+                rows += cursor.rowcount
+                self.conn.commit()
+        self.conn.commit()
+        cursor.close()
+        self.filler_ready = True
+
+    def _scan_filler(self):
+        """扫描填充表，把其他表的数据页挤出缓冲池
+
+        扫描期间把innodb_old_blocks_time设为0，让填充表的页立即进入LRU的young区，
+        否则扫描只会替换old区，测试表的热点页仍留在缓冲池中
+        """
+        if not self.filler_ready:
+            self._prepare_filler()
+        cursor = self.conn.cursor()
+        old_blocks_time = None
+        try:
+            cursor.execute("SELECT @@GLOBAL.innodb_old_blocks_time")
+            old_blocks_time = cursor.fetchone()[0]
+            cursor.execute("SET GLOBAL innodb_old_blocks_time = 0")
+        except Exception as e:
+            old_blocks_time = None
+            print(f"无法修改innodb_old_blocks_time（{e}），缓冲池可能清空不完全")
+        try:
+            cursor.execute(f"SELECT COUNT(*) FROM {FILLER_TABLE} WHERE pad4 <> ''")
+            cursor.fetchall()
+        finally:
+            if old_blocks_time is not None:
+                cursor.execute(f"SET GLOBAL innodb_old_blocks_time = {int(old_blocks_time)}")
+            cursor.close()
+
+    def _restart(self):
+        """执行重启命令并等待重新连接"""
+        subprocess.run(self.restart_command, shell=True, check=True)
+        deadline = time.time() + RESTART_TIMEOUT
+        while True:
+            try:
+                self.conn = self.reconnect()
+                return
+            except Exception:
+                if time.time() >= deadline:
+                    raise
+                time.sleep(1)
+
+    def evict(self):
+        """清空缓冲池中的测试数据（冷缓存）"""
+        if self.method == 'restart':
+            self._restart()
+        else:
+            self._scan_filler()
+
+    def cleanup(self):
+        """删除填充表"""
+        if self.filler_ready:
+            cursor = self.conn.cursor()
+            cursor.execute(f"DROP TABLE IF EXISTS {FILLER_TABLE}")
+            self.conn.commit()
+            cursor.close()
+            self.filler_ready = False
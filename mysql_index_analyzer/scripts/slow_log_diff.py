@@ -0,0 +1,383 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 慢查询日志对比
+按查询摘要对齐两份慢查询日志（如发布前后），报告每类查询的执行次数、
+p95查询时间和扫描效率（rows_examined/rows_sent）的变化及显著性，
+并列出新出现和消失的查询类型
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from log_analyzer import SlowQueryLogParser, RESULT_DIR
+from query_fingerprint import query_digest
+
+# 并行解析配置
+CHUNK_SIZE = 64 * 1024 * 1024  # 每个解析任务处理的字节数
+
+# 查询时间直方图配置（对数分桶，各分块的直方图可以精确合并）
+HISTOGRAM_MIN_TIME = 1e-6  # 小于该值的查询时间计入第0个桶
+HISTOGRAM_PRECISION = 0.01  # 相邻桶的相对宽度，即分位数的相对误差
+
+# 显著性检验配置
+SIGNIFICANCE_LEVEL = 0.05
+MIN_SAMPLES = 5  # 样本数少于该值时不做显著性检验
+TOP_CHANGES = 20  # 控制台输出的变化条目数
+
+_LOG_BASE = math.log(1 + HISTOGRAM_PRECISION)
+
+
+def _bucket_of(value):
+    """返回查询时间所在的桶"""
+    if value <= HISTOGRAM_MIN_TIME:
+        return 0
+    return int(math.log(value / HISTOGRAM_MIN_TIME) / _LOG_BASE) + 1
+
+
+def _bucket_value(bucket):
+    """返回桶的代表值（几何中点）"""
+    if bucket == 0:
+        return HISTOGRAM_MIN_TIME
+    return HISTOGRAM_MIN_TIME * math.exp((bucket - 0.5) * _LOG_BASE)
+
+
+def histogram_percentile(histogram, percentile):
+    """根据直方图计算分位数"""
+    total = sum(histogram.values())
+    if not total:
+        return None
+    rank = percentile / 100 * total
+    seen = 0
+    for bucket in sorted(histogram):
+        seen += histogram[bucket]
+        if seen >= rank:
+            return _bucket_value(bucket)
+    return _bucket_value(max(histogram))
+
+
+def _normal_p_value(z):
+    """标准正态分布的双侧p值"""
+    return math.erfc(abs(z) / math.sqrt(2))
+
+
+def mann_whitney_test(histogram_a, histogram_b):
+    """基于直方图的Mann-Whitney U检验（正态近似，含结点校正）
+
+    返回(z, p值)，z>0表示B的查询时间整体偏大
+    """
+    n_a = sum(histogram_a.values())
+    n_b = sum(histogram_b.values())
+    if n_a < MIN_SAMPLES or n_b < MIN_SAMPLES:
+        return None, None
+
+    u_b = 0.0
+    below_a = 0
+    tie_term = 0
+    for bucket in sorted(set(histogram_a) | set(histogram_b)):
+        count_a = histogram_a.get(bucket, 0)
+        count_b = histogram_b.get(bucket, 0)
+        # B中每个样本胜过所有更小的A样本，同一个桶内记半
+        u_b += count_b * (below_a + 0.5 * count_a)
+        below_a += count_a
+        tied = count_a + count_b
+        tie_term += tied ** 3 - tied
+
+    n = n_a + n_b
+    mean_u = n_a * n_b / 2
+    variance = n_a * n_b / 12 * ((n + 1) - tie_term / (n * (n - 1)))
+    if variance <= 0:
+        return 0.0, 1.0
+    z = (u_b - mean_u) / math.sqrt(variance)
+    return z, _normal_p_value(z)
+
+
+def rate_test(count_a, count_b, exposure_a, exposure_b):
+    """比较两个时间段内的执行次数（条件二项检验的正态近似）
+
+    exposure为各日志覆盖的时长，返回(z, p值)
+    """
+    total = count_a + count_b
+    if total < MIN_SAMPLES or exposure_a <= 0 or exposure_b <= 0:
+        return None, None
+    expected_share = exposure_b / (exposure_a + exposure_b)
+    variance = total * expected_share * (1 - expected_share)
+    z = (count_b - total * expected_share) / math.sqrt(variance)
+    return z, _normal_p_value(z)
+
+
+def welch_test(stats_a, stats_b, key):
+    """对逐条记录的比值做Welch t检验（大样本正态近似）"""
+    n_a, n_b = stats_a['count'], stats_b['count']
+    if n_a < MIN_SAMPLES or n_b < MIN_SAMPLES:
+        return None, None
+    mean_a = stats_a[key + '_sum'] / n_a
+    mean_b = stats_b[key + '_sum'] / n_b
+    var_a = max(stats_a[key + '_sumsq'] / n_a - mean_a ** 2, 0.0) * n_a / (n_a - 1)
+    var_b = max(stats_b[key + '_sumsq'] / n_b - mean_b ** 2, 0.0) * n_b / (n_b - 1)
+    standard_error = math.sqrt(var_a / n_a + var_b / n_b)
+    if standard_error == 0:
+        return (0.0, 1.0) if mean_a == mean_b else (math.copysign(float('inf'), mean_b - mean_a), 0.0)
+    z = (mean_b - mean_a) / standard_error
+    return z, _normal_p_value(z)
+
+
+def _new_digest_stats(query_info):
+    """创建单个摘要的统计结构"""
+    return {
+        'sample_query': query_info['query'],
+        'count': 0,
+        'total_time': 0.0,
+        'rows_examined': 0,
+        'rows_sent': 0,
+        'scan_ratio_sum': 0.0,
+        'scan_ratio_sumsq': 0.0,
+        'histogram': {}
+    }
+
+
+def scan_chunk(log_file, start, end):
+    """解析日志的一个字节范围，按摘要聚合统计"""
+    parser = SlowQueryLogParser(log_file)
+    digests = {}
+    first_timestamp = None
+    last_timestamp = None
+
+    for query_info in parser.iter_entries(start, end):
+        digest = query_digest(query_info['query'])
+        stats = digests.get(digest)
+        if stats is None:
+            stats = digests[digest] = _new_digest_stats(query_info)
+
+        query_time = query_info['query_time'] or 0.0
+        rows_examined = query_info['rows_examined'] or 0
+        rows_sent = query_info['rows_sent'] or 0
+        scan_ratio = rows_examined / max(rows_sent, 1)
+
+        stats['count'] += 1
+        stats['total_time'] += query_time
+        stats['rows_examined'] += rows_examined
+        stats['rows_sent'] += rows_sent
+        stats['scan_ratio_sum'] += scan_ratio
+        stats['scan_ratio_sumsq'] += scan_ratio * scan_ratio
+        bucket = _bucket_of(query_time)
+        stats['histogram'][bucket] = stats['histogram'].get(bucket, 0) + 1
+
+        timestamp = query_info['timestamp']
+        if timestamp:
+            if first_timestamp is None or timestamp < first_timestamp:
+                first_timestamp = timestamp
+            if last_timestamp is None or timestamp > last_timestamp:
+                last_timestamp = timestamp
+
+    return {'digests': digests, 'first_timestamp': first_timestamp, 'last_timestamp': last_timestamp}
+
+
+def merge_summaries(summaries):
+    """合并多个分块的统计结果"""
+    merged = {'digests': {}, 'first_timestamp': None, 'last_timestamp': None}
+    for summary in summaries:
+        for digest, stats in summary['digests'].items():
+            target = merged['digests'].get(digest)
+            if target is None:
+                merged['digests'][digest] = stats
+                continue
+            for key in ('count', 'total_time', 'rows_examined', 'rows_sent',
+                        'scan_ratio_sum', 'scan_ratio_sumsq'):
+                target[key] += stats[key]
+            for bucket, count in stats['histogram'].items():
+                target['histogram'][bucket] = target['histogram'].get(bucket, 0) + count
+
+        for key, pick in (('first_timestamp', min), ('last_timestamp', max)):
+            if summary[key]:
+                merged[key] = pick(merged[key], summary[key]) if merged[key] else summary[key]
+    return merged
+
+
+def split_chunks(log_file, chunk_size=CHUNK_SIZE):
+    """按字节把日志切分为多个解析任务"""
+    size = os.path.getsize(log_file)
+    return [(log_file, start, min(start + chunk_size, size)) for start in range(0, max(size, 1), chunk_size)]
+
+
+def summarize_logs(log_files, workers=None, chunk_size=CHUNK_SIZE):
+    """并行解析多份日志，返回与log_files顺序一致的统计结果"""
+    tasks = []
+    for index, log_file in enumerate(log_files):
+        tasks.extend((index, chunk) for chunk in split_chunks(log_file, chunk_size))
+
+    partial = [[] for _ in log_files]
+    # 两份日志的所有分块放进同一个进程池，充分利用多核
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(index, executor.submit(scan_chunk, *chunk)) for index, chunk in tasks]
+        for index, future in futures:
+            partial[index].append(future.result())
+
+    return [merge_summaries(summaries) for summaries in partial]
+
+
+def _log_duration(summary):
+    """返回日志覆盖的时长（秒），无法确定时返回None"""
+    if not summary['first_timestamp'] or not summary['last_timestamp']:
+        return None
+    try:
+        first = datetime.fromisoformat(summary['first_timestamp'].replace('Z', '+00:00'))
+        last = datetime.fromisoformat(summary['last_timestamp'].replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return (last - first).total_seconds() or None
+
+
+def _scan_efficiency(stats):
+    """返回rows_examined与rows_sent之比"""
+    return stats['rows_examined'] / max(stats['rows_sent'], 1)
+
+
+def _digest_summary(digest, stats):
+    """返回单侧摘要的汇总信息"""
+    return {
+        'digest': digest,
+        'query': stats['sample_query'],
+        'count': stats['count'],
+        'p95_time': histogram_percentile(stats['histogram'], 95),
+        'avg_time': stats['total_time'] / stats['count'],
+        'rows_examined_per_sent': _scan_efficiency(stats)
+    }
+
+
+def diff_summaries(summary_a, summary_b, alpha=SIGNIFICANCE_LEVEL):
+    """按摘要对齐两份日志的统计结果"""
+    digests_a = summary_a['digests']
+    digests_b = summary_b['digests']
+
+    # 按覆盖时长比较执行次数，无法确定时长时按总查询数比较占比
+    duration_a = _log_duration(summary_a)
+    duration_b = _log_duration(summary_b)
+    if duration_a and duration_b:
+        exposure_a, exposure_b = duration_a, duration_b
+    else:
+        exposure_a = sum(stats['count'] for stats in digests_a.values())
+        exposure_b = sum(stats['count'] for stats in digests_b.values())
+
+    changes = []
+    for digest in digests_a.keys() & digests_b.keys():
+        stats_a = digests_a[digest]
+        stats_b = digests_b[digest]
+        p95_a = histogram_percentile(stats_a['histogram'], 95)
+        p95_b = histogram_percentile(stats_b['histogram'], 95)
+        count_z, count_p = rate_test(stats_a['count'], stats_b['count'], exposure_a, exposure_b)
+        time_z, time_p = mann_whitney_test(stats_a['histogram'], stats_b['histogram'])
+        scan_z, scan_p = welch_test(stats_a, stats_b, 'scan_ratio')
+
+        changes.append({
+            'digest': digest,
+            'query': stats_b['sample_query'],
+            'count_a': stats_a['count'],
+            'count_b': stats_b['count'],
+            'count_p_value': count_p,
+            'count_significant': count_p is not None and count_p < alpha,
+            'p95_time_a': p95_a,
+            'p95_time_b': p95_b,
+            'p95_change_pct': (p95_b - p95_a) / p95_a * 100 if p95_a else None,
+            'query_time_p_value': time_p,
+            'query_time_significant': time_p is not None and time_p < alpha,
+            'slower': time_z is not None and time_z > 0 and time_p < alpha,
+            'rows_examined_per_sent_a': _scan_efficiency(stats_a),
+            'rows_examined_per_sent_b': _scan_efficiency(stats_b),
+            'scan_p_value': scan_p,
+            'scan_significant': scan_p is not None and scan_p < alpha
+        })
+
+    # 按总耗时的变化排序，最值得关注的排在前面
+    changes.sort(key=lambda c: c['p95_time_b'] * c['count_b'] - c['p95_time_a'] * c['count_a'], reverse=True)
+
+    new_digests = [_digest_summary(digest, digests_b[digest]) for digest in digests_b.keys() - digests_a.keys()]
+    vanished_digests = [_digest_summary(digest, digests_a[digest]) for digest in digests_a.keys() - digests_b.keys()]
+    new_digests.sort(key=lambda d: d['count'] * d['avg_time'], reverse=True)
+    vanished_digests.sort(key=lambda d: d['count'] * d['avg_time'], reverse=True)
+
+    return {
+        'timestamp': datetime.now().isoformat(),
+        'significance_level': alpha,
+        'duration_a': duration_a,
+        'duration_b': duration_b,
+        'total_queries_a': sum(stats['count'] for stats in digests_a.values()),
+        'total_queries_b': sum(stats['count'] for stats in digests_b.values()),
+        'changed': changes,
+        'new': new_digests,
+        'vanished': vanished_digests
+    }
+
+
+def print_diff(diff):
+    """在控制台输出对比结果"""
+    print(f"\n日志A: {diff['total_queries_a']} 条查询, 日志B: {diff['total_queries_b']} 条查询")
+
+    slower = [c for c in diff['changed'] if c['slower']]
+    print(f"\n显著变慢的查询类型: {len(slower)}")
+    for i, change in enumerate(slower[:TOP_CHANGES]):
+        print(f"{i+1}. [{change['digest']}] {change['query'][:80]}")
+        print(f"   次数: {change['count_a']} -> {change['count_b']}"
+              f"{' (显著)' if change['count_significant'] else ''}")
+        print(f"   p95: {change['p95_time_a']:.6f}秒 -> {change['p95_time_b']:.6f}秒 "
+              f"(p={change['query_time_p_value']:.4g})")
+        print(f"   检查行数/返回行数: {change['rows_examined_per_sent_a']:.2f} -> "
+              f"{change['rows_examined_per_sent_b']:.2f}{' (显著)' if change['scan_significant'] else ''}")
+
+    print(f"\n新出现的查询类型: {len(diff['new'])}")
+    for i, digest in enumerate(diff['new'][:TOP_CHANGES]):
+        print(f"{i+1}. [{digest['digest']}] 次数: {digest['count']}, p95: {digest['p95_time']:.6f}秒 - "
+              f"{digest['query'][:80]}")
+
+    print(f"\n消失的查询类型: {len(diff['vanished'])}")
+    for i, digest in enumerate(diff['vanished'][:TOP_CHANGES]):
+        print(f"{i+1}. [{digest['digest']}] 次数: {digest['count']} - {digest['query'][:80]}")
+
+
+def main():
+    """主函数"""
+    print("========== MySQL索引测试 - 慢查询日志对比 ==========")
+
+    parser = argparse.ArgumentParser(description="按查询摘要对比两份慢查询日志")
+    parser.add_argument("log_a", help="基准慢查询日志（如发布前）")
+    parser.add_argument("log_b", help="对比慢查询日志（如发布后）")
+    parser.add_argument("--workers", type=int, help="并行解析的进程数（默认为CPU核数）")
+    parser.add_argument("--alpha", type=float, default=SIGNIFICANCE_LEVEL, help="显著性水平（默认为0.05）")
+    parser.add_argument("--output", help="对比结果JSON文件路径")
+    args = parser.parse_args()
+
+    for log_file in (args.log_a, args.log_b):
+        if not os.path.isfile(log_file):
+            print(f"错误: 找不到慢查询日志文件: {log_file}")
+            sys.exit(1)
+
+    try:
+        print(f"并行解析日志: {args.log_a} / {args.log_b}")
+        summary_a, summary_b = summarize_logs([args.log_a, args.log_b], args.workers)
+        print(f"解析完成，日志A有 {len(summary_a['digests'])} 类查询，日志B有 {len(summary_b['digests'])} 类查询")
+
+        diff = diff_summaries(summary_a, summary_b, args.alpha)
+        diff['log_a'] = os.path.abspath(args.log_a)
+        diff['log_b'] = os.path.abspath(args.log_b)
+        print_diff(diff)
+
+        output_file = args.output or os.path.join(
+            RESULT_DIR, f"slow_log_diff_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        with open(output_file, 'w', encoding='utf-8') as f:
+            json.dump(diff, f, ensure_ascii=False, indent=2)
+        print(f"\n对比结果已保存到: {output_file}")
+    except KeyboardInterrupt:
+        print("\n对比被用户中断")
+    except Exception as e:
+        print(f"\n对比时出错: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 数据集快照
+把生成好的测试数据按ID区间并行导出为压缩CSV，并在下次生成相同数据集时
+并行导入恢复，省去重新生成的时间。快照按缩放因子、随机种子、生成引擎、数据分布和表结构版本区分
+"""
+
+import os
+import sys
+import gzip
+import json
+import shutil
+import tempfile
+import argparse
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import mysql.connector
+
+from bulk_loader import write_csv_rows, read_csv_rows, load_csv_file, insert_rows
+
+# 目录配置
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
+SNAPSHOT_DIR = os.path.join(PROJECT_DIR, "snapshots")  # 快照保存目录
+
+MANIFEST_FILE = "manifest.json"
+COMPRESS_LEVEL = 1  # gzip压缩级别，快照以速度优先
+CHUNK_ROWS = 100000  # 每个快照文件包含的ID区间大小
+INSERT_BATCH_SIZE = 20000  # 不能使用LOAD DATA时的批量插入大小
+
+
+def snapshot_key(scale_factor, seed, schema_version, engine, distribution='uniform'):
+    """返回数据集对应的快照键"""
+    return f"scale{scale_factor:g}_seed{seed}_{engine}_{distribution}_v{schema_version}"
+
+
+def find_snapshot(key, snapshot_dir=None):
+    """查找完整的快照，返回清单；不存在或文件缺失时返回None"""
+    path = os.path.join(snapshot_dir or SNAPSHOT_DIR, key)
+    manifest_file = os.path.join(path, MANIFEST_FILE)
+    if not os.path.isfile(manifest_file):
+        return None
+
+    with open(manifest_file, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for table_info in manifest['tables'].values():
+        for chunk in table_info['chunks']:
+            if not os.path.isfile(os.path.join(path, chunk['file'])):
+                print(f"快照 {key} 缺少文件 {chunk['file']}，忽略该快照")
+                return None
+    manifest['path'] = path
+    return manifest
+
+
+def _dump_chunk(db_config, table, columns, start_id, end_id, path):
+    """导出一个ID区间到压缩CSV文件，返回行数"""
+    conn = mysql.connector.connect(**db_config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id BETWEEN %s AND %s ORDER BY id",
+                       (start_id, end_id))
+        with gzip.open(path, 'wt', encoding='utf-8', newline='', compresslevel=COMPRESS_LEVEL) as f:
+            count = write_csv_rows(f, cursor)
+        cursor.close()
+        return count
+    finally:
+        conn.close()
+
+
+def create_snapshot(key, db_config, tables, metadata=None, workers=1, snapshot_dir=None):
+    """并行导出各表数据为快照
+
+    tables为{表名: 列名列表}，列中必须包含id
+    """
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    os.makedirs(snapshot_dir, exist_ok=True)
+    target = os.path.join(snapshot_dir, key)
+    # 先写入临时目录，全部完成后再改名，避免留下不完整的快照
+    staging = tempfile.mkdtemp(prefix=f".{key}_", dir=snapshot_dir)
+    print(f"\n创建数据集快照: {key}")
+
+    try:
+        conn = mysql.connector.connect(**db_config)
+        cursor = conn.cursor()
+        tasks = []
+        for table in tables:
+            cursor.execute(f"SELECT MAX(id) FROM {table}")
+            max_id = cursor.fetchone()[0] or 0
+            for start_id in range(1, max_id + 1, CHUNK_ROWS):
+                end_id = min(start_id + CHUNK_ROWS - 1, max_id)
+                tasks.append((table, start_id, end_id, f"{table}_{start_id:012d}.csv.gz"))
+        cursor.close()
+        conn.close()
+
+        manifest_tables = {table: {'columns': list(columns), 'rows': 0, 'chunks': []}
+                           for table, columns in tables.items()}
+        with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+            futures = {executor.submit(_dump_chunk, db_config, table, tables[table], start_id, end_id,
+                                       os.path.join(staging, filename)): (table, start_id, filename)
+                       for table, start_id, end_id, filename in tasks}
+            for future in as_completed(futures):
+                table, start_id, filename = futures[future]
+                rows = future.result()
+                manifest_tables[table]['rows'] += rows
+                manifest_tables[table]['chunks'].append({'file': filename, 'start_id': start_id, 'rows': rows})
+
+        for table_info in manifest_tables.values():
+            table_info['chunks'].sort(key=lambda chunk: chunk['start_id'])
+
+        manifest = {
+            'key': key,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'metadata': metadata or {},
+            'tables': manifest_tables
+        }
+        with open(os.path.join(staging, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2, default=str)
+
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.rename(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    total_rows = sum(table_info['rows'] for table_info in manifest_tables.values())
+    print(f"快照已保存到: {target}（共 {total_rows:,} 行）")
+    return manifest
+
+
+def _restore_chunk(db_config, table, columns, path, use_load_data):
+    """把一个快照文件导入数据库，返回行数"""
+    config = dict(db_config, allow_local_infile=True) if use_load_data else db_config
+    conn = mysql.connector.connect(**config)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        cursor.execute("SET SESSION unique_checks = 0")
+        rows = 0
+        if use_load_data:
+            # LOAD DATA需要未压缩的本地文件
+            fd, csv_path = tempfile.mkstemp(prefix=f"{table}_", suffix=".csv")
+            try:
+                with os.fdopen(fd, 'wb') as out, gzip.open(path, 'rb') as src:
+                    shutil.copyfileobj(src, out)
+                load_csv_file(cursor, table, columns, csv_path)
+                rows = cursor.rowcount
+            finally:
+                os.unlink(csv_path)
+        else:
+            with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+                batch = []
+                for row in read_csv_rows(f):
+                    batch.append(row)
+                    if len(batch) >= INSERT_BATCH_SIZE:
+                        insert_rows(cursor, table, columns, batch)
+                        rows += len(batch)
+                        batch = []
+                if batch:
+                    insert_rows(cursor, table, columns, batch)
+                    rows += len(batch)
+        conn.commit()
+        cursor.close()
+        return rows
+    finally:
+        conn.close()
+
+
+def restore_snapshot(manifest, db_config, workers=1, use_load_data=True):
+    """并行把快照导入到已经建好的空表中，返回各表导入的行数"""
+    print(f"\n从快照恢复数据集: {manifest['key']}（创建于 {manifest['created_at']}）")
+    restored = {table: 0 for table in manifest['tables']}
+
+    with ProcessPoolExecutor(max_workers=max(workers, 1)) as executor:
+        futures = {}
+        for table, table_info in manifest['tables'].items():
+            for chunk in table_info['chunks']:
+                future = executor.submit(_restore_chunk, db_config, table, table_info['columns'],
+                                         os.path.join(manifest['path'], chunk['file']), use_load_data)
+                futures[future] = table
+        for future in as_completed(futures):
+            restored[futures[future]] += future.result()
+
+    for table, table_info in manifest['tables'].items():
+        if restored[table] != table_info['rows']:
+            raise RuntimeError(f"表 {table} 恢复了 {restored[table]} 行，快照中有 {table_info['rows']} 行")
+        print(f"{table}: 已恢复 {restored[table]:,} 行")
+    return restored
+
+
+def list_snapshots(snapshot_dir=None):
+    """列出所有完整的快照"""
+    snapshot_dir = snapshot_dir or SNAPSHOT_DIR
+    if not os.path.isdir(snapshot_dir):
+        return []
+    manifests = []
+    for key in sorted(os.listdir(snapshot_dir)):
+        if key.startswith('.'):
+            continue
+        manifest = find_snapshot(key, snapshot_dir)
+        if manifest:
+            manifests.append(manifest)
+    return manifests
+
+
+def main():
+    """主函数"""
+    print("========== MySQL索引测试 - 数据集快照 ==========")
+
+    parser = argparse.ArgumentParser(description="管理数据集快照")
+    subparsers = parser.add_subparsers(dest="action")
+    subparsers.add_parser("list", help="列出所有快照")
+    delete_parser = subparsers.add_parser("delete", help="删除快照")
+    delete_parser.add_argument("key", help="快照键")
+    args = parser.parse_args()
+
+    if args.action == "list":
+        manifests = list_snapshots()
+        if not manifests:
+            print("没有快照")
+        for manifest in manifests:
+            rows = sum(table_info['rows'] for table_info in manifest['tables'].values())
+            print(f"{manifest['key']}: {rows:,} 行, 创建于 {manifest['created_at']}")
+    elif args.action == "delete":
+        path = os.path.join(SNAPSHOT_DIR, args.key)
+        if not os.path.isdir(path):
+            print(f"错误: 找不到快照: {args.key}")
+            sys.exit(1)
+        shutil.rmtree(path)
+        print(f"已删除快照: {args.key}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
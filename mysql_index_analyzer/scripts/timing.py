@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 计时引擎
+使用perf_counter_ns计时：先执行若干次预热，再自适应地重复执行，直到均值的置信区间足够窄
+（或达到次数/时间上限）；用MAD剔除异常值后统计中位数、p95、p99、标准差和置信区间
+"""
+
+import time
+import math
+
+import numpy as np
+
+# 计时配置
+WARMUP_RUNS = 2  # 预热次数（不计时，用于填充缓冲池和查询缓存等）
+MIN_ITERATIONS = 5  # 最少计时次数
+MAX_ITERATIONS = 50  # 最多计时次数
+TARGET_CI_RATIO = 0.05  # 目标置信区间半宽占均值的比例
+MAX_SECONDS = 60  # 单个用例计时的总时间上限（秒），慢查询达到上限后不再增加次数
+OUTLIER_THRESHOLD = 3.5  # 修正Z分数超过该值的样本视为异常值
+
+# 95%置信水平下t分布的双侧临界值（自由度1..30），自由度更大时使用正态近似
+T_CRITICAL_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042
+]
+Z_CRITICAL_95 = 1.960
+
+
+def t_critical(df):
+    """返回95%置信水平下的t临界值"""
+    if df < 1:
+        return math.inf
+    if df <= len(T_CRITICAL_95):
+        return T_CRITICAL_95[df - 1]
+    return Z_CRITICAL_95
+
+
+def split_outliers(samples, threshold=OUTLIER_THRESHOLD):
+    """按中位数绝对偏差（MAD）的修正Z分数把样本分为正常值和异常值"""
+    values = np.asarray(samples, dtype=np.float64)
+    if len(values) < 3:
+        return list(values), []
+    median = np.median(values)
+    mad = np.median(np.abs(values - median))
+    if mad == 0:
+        return list(values), []
+    scores = 0.6745 * (values - median) / mad
+    keep = np.abs(scores) <= threshold
+    return list(values[keep]), list(values[~keep])
+
+
+def confidence_interval(samples):
+    """返回均值的95%置信区间(下限, 上限)"""
+    n = len(samples)
+    mean = float(np.mean(samples))
+    if n < 2:
+        return mean, mean
+    half_width = t_critical(n - 1) * float(np.std(samples, ddof=1)) / math.sqrt(n)
+    return mean - half_width, mean + half_width
+
+
+def summarize(samples, threshold=OUTLIER_THRESHOLD):
+    """剔除异常值后统计样本（秒）"""
+    kept, outliers = split_outliers(samples, threshold)
+    mean = float(np.mean(kept))
+    ci_low, ci_high = confidence_interval(kept)
+    return {
+        'iterations': len(samples),
+        'samples': len(kept),
+        'outliers': len(outliers),
+        'mean': mean,
+        'median': float(np.median(kept)),
+        'p95': float(np.percentile(kept, 95)),
+        'p99': float(np.percentile(kept, 99)),
+        'stddev': float(np.std(kept, ddof=1)) if len(kept) > 1 else 0.0,
+        'min': float(np.min(kept)),
+        'max': float(np.max(kept)),
+        'ci_low': ci_low,
+        'ci_high': ci_high,
+        'ci_ratio': (ci_high - mean) / mean if mean > 0 else 0.0
+    }
+
+
+def intervals_overlap(stats_a, stats_b):
+    """两组结果的置信区间是否重叠（不重叠时可认为差异显著）"""
+    return stats_a['ci_low'] <= stats_b['ci_high'] and stats_b['ci_low'] <= stats_a['ci_high']
+
+
+class TimingEngine:
+    """预热+自适应重复执行的计时器"""
+
+    def __init__(self, warmup=WARMUP_RUNS, min_iterations=MIN_ITERATIONS, max_iterations=MAX_ITERATIONS,
+                 target_ci_ratio=TARGET_CI_RATIO, max_seconds=MAX_SECONDS, outlier_threshold=OUTLIER_THRESHOLD):
+        self.warmup = warmup
+        self.min_iterations = max(min_iterations, 2)
+        self.max_iterations = max(max_iterations, self.min_iterations)
+        self.target_ci_ratio = target_ci_ratio
+        self.max_seconds = max_seconds
+        self.outlier_threshold = outlier_threshold
+
+    def _converged(self, samples):
+        """剔除异常值后的样本数达到下限且置信区间足够窄"""
+        if len(samples) < self.min_iterations:
+            return False
+        stats = summarize(samples, self.outlier_threshold)
+        return stats['samples'] >= self.min_iterations and stats['ci_ratio'] <= self.target_ci_ratio
+
+    def measure(self, func, iterations=None, callback=None, before_each=None):
+        """预热后重复执行func并计时，返回(每次耗时列表（秒）, 统计结果)
+
+        iterations不为空时固定执行该次数，否则自适应直到置信区间达到目标；
+        before_each()在每次计时前调用（不计入耗时），用于清空缓存或读取计数器；
+        callback(i, elapsed)在每次计时后调用，用于输出进度
+        """
+        for _ in range(self.warmup):
+            func()
+
+        samples = []
+        started = time.perf_counter_ns()
+        while True:
+            if before_each:
+                before_each()
+            start = time.perf_counter_ns()
+            func()
+            elapsed = (time.perf_counter_ns() - start) / 1e9
+            samples.append(elapsed)
+            if callback:
+                callback(len(samples), elapsed)
+
+            if iterations:
+                if len(samples) >= iterations:
+                    break
+            elif len(samples) >= self.max_iterations or self._converged(samples):
+                break
+            elif len(samples) >= self.min_iterations and \
+                    (time.perf_counter_ns() - started) / 1e9 >= self.max_seconds:
+                break
+
+        stats = summarize(samples, self.outlier_threshold)
+        stats['warmup'] = self.warmup
+        stats['converged'] = stats['samples'] >= self.min_iterations and stats['ci_ratio'] <= self.target_ci_ratio
+        return samples, stats
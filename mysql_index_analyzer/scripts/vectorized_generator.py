@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 向量化数据生成引擎
+使用NumPy按批生成整列数据：日期以int64秒偏移表示，枚举字段向量化抽样，
+字符串字段从预先生成的Faker取值池中抽取，逐行的Python工作只剩格式化
+"""
+
+import numpy as np
+from faker import Faker
+
+# 取值池大小
+USERNAME_POOL_SIZE = 100000
+EMAIL_POOL_SIZE = 100000
+PHONE_POOL_SIZE = 100000
+PRODUCT_NAME_POOL_SIZE = 20000
+DESCRIPTION_POOL_SIZE = 2000
+
+SECONDS_PER_DAY = 86400
+
+# 已生成的取值池，按种子（和Faker方法）缓存（每个进程只生成一次）
+_pools = {}
+
+
+def _unique_pool(generate, size):
+    """生成取值池，重复的值追加数字后缀保证唯一"""
+    seen = {}
+    pool = []
+    for _ in range(size):
+        value = generate()
+        count = seen.get(value, 0)
+        seen[value] = count + 1
+        pool.append(value if count == 0 else f"{value}{count}")
+    return np.array(pool, dtype=object)
+
+
+def _plain_pool(generate, size):
+    """生成允许重复的取值池"""
+    return np.array([generate() for _ in range(size)], dtype=object)
+
+
+def get_pools(seed):
+    """返回字符串字段的取值池，同一种子在所有进程中得到相同的取值池"""
+    if seed not in _pools:
+        print(f"生成Faker取值池（种子: {seed}）...")
+        fake = Faker('zh_CN')
+        fake.seed_instance(seed)
+        _pools[seed] = {
+            'username': _unique_pool(fake.user_name, USERNAME_POOL_SIZE),
+            'email': _unique_pool(fake.email, EMAIL_POOL_SIZE),
+            'phone': _plain_pool(fake.phone_number, PHONE_POOL_SIZE),
+            'product_name': _plain_pool(lambda: fake.word() + ' ' + fake.word(), PRODUCT_NAME_POOL_SIZE),
+            'description': _plain_pool(fake.paragraph, DESCRIPTION_POOL_SIZE)
+        }
+    return _pools[seed]
+
+
+def get_faker_pool(seed, provider, size, locale='zh_CN'):
+    """返回任意Faker方法生成的取值池，供声明式表结构中的faker列使用"""
+    key = (seed, provider, size, locale)
+    if key not in _pools:
+        fake = Faker(locale)
+        fake.seed_instance(seed)
+        _pools[key] = _plain_pool(getattr(fake, provider), size)
+    return _pools[key]
+
+
+def draw_values(rng, values, n):
+    """从取值数组中有放回地向量化抽样"""
+    return values[rng.integers(0, len(values), n)]
+
+
+def id_suffixed(value, row_id, separator=None):
+    """在取值后追加"_行ID"，使取值池或Faker重复的值在整列中唯一；separator不为空时加在其之前（如邮箱的@之前）"""
+    if separator:
+        head, sep, tail = value.partition(separator)
+        return f"{head}_{row_id}{sep}{tail}"
+    return f"{value}_{row_id}"
+
+
+def format_datetimes(seconds, reference):
+    """把相对参考时间的秒偏移格式化为DATETIME文本"""
+    text = np.datetime_as_string(reference + seconds.astype('timedelta64[s]'), unit='s')
+    return np.char.replace(text, 'T', ' ').tolist()
+
+
+def batch_ranges(start_id, end_id, batch_size):
+    """把ID区间切分为批"""
+    for batch_start in range(start_id, end_id + 1, batch_size):
+        yield batch_start, min(batch_start + batch_size - 1, end_id)
+
+
+def build_users_batches(rng, start_id, end_id, reference_time, context):
+    """向量化生成用户数据，按批返回"""
+    pools = get_pools(context['seed'])
+    status_options = np.array(context['choices']['users.status'], dtype=object)
+    reference = np.datetime64(reference_time, 's')
+    samplers = context['samplers']
+    reg_sampler = samplers.get('users.registration_date')
+    status_sampler = samplers.get('users.status')
+    credit_sampler = samplers.get('users.credit_score')
+
+    for batch_start, batch_end in batch_ranges(start_id, end_id, context['batch_size']):
+        n = batch_end - batch_start + 1
+        # 注册日期在过去3年内，最后登录日期在注册日期之后
+        reg_days = reg_sampler.draw_array(rng, n).astype(np.int64) if reg_sampler else rng.integers(1, 1096, n)
+        login_days = (rng.random(n) * (reg_days + 1)).astype(np.int64)
+        reg_offsets = -reg_days * SECONDS_PER_DAY
+        login_offsets = reg_offsets + login_days * SECONDS_PER_DAY
+
+        ids = range(batch_start, batch_end + 1)
+        yield list(zip(
+            ids,
+            # 取值池只有10万个值，用户名和邮箱追加用户ID保证唯一
+            [id_suffixed(value, user_id) for value, user_id in zip(draw_values(rng, pools['username'], n), ids)],
+            [id_suffixed(value, user_id, '@') for value, user_id in zip(draw_values(rng, pools['email'], n), ids)],
+            draw_values(rng, pools['phone'], n).tolist(),
+            format_datetimes(reg_offsets, reference),
+            format_datetimes(login_offsets, reference),
+            (status_sampler.draw_array(rng, n, ages=reg_days - login_days) if status_sampler
+             else draw_values(rng, status_options, n)).tolist(),
+            (credit_sampler.draw_array(rng, n) if credit_sampler else rng.integers(300, 851, n)).tolist()
+        ))
+
+
+def build_products_batches(rng, start_id, end_id, reference_time, context):
+    """向量化生成产品数据，按批返回"""
+    pools = get_pools(context['seed'])
+    categories = np.array(context['choices']['products.category'], dtype=object)
+    reference = np.datetime64(reference_time, 's')
+    samplers = context['samplers']
+    created_sampler = samplers.get('products.created_at')
+    category_sampler = samplers.get('products.category')
+    price_sampler = samplers.get('products.price')
+    stock_sampler = samplers.get('products.stock')
+
+    for batch_start, batch_end in batch_ranges(start_id, end_id, context['batch_size']):
+        n = batch_end - batch_start + 1
+        # 创建日期在过去2年内，更新日期在创建日期之后
+        created_days = (created_sampler.draw_array(rng, n).astype(np.int64) if created_sampler
+                        else rng.integers(1, 731, n))
+        updated_days = (rng.random(n) * (created_days + 1)).astype(np.int64)
+        created_offsets = -created_days * SECONDS_PER_DAY
+        updated_offsets = created_offsets + updated_days * SECONDS_PER_DAY
+        if price_sampler:
+            price_cents = np.rint(price_sampler.draw_array(rng, n) * 100).astype(np.int64)
+        else:
+            price_cents = rng.integers(1000, 1000000, n)
+
+        yield list(zip(
+            range(batch_start, batch_end + 1),
+            draw_values(rng, pools['product_name'], n).tolist(),
+            (category_sampler.draw_array(rng, n) if category_sampler else draw_values(rng, categories, n)).tolist(),
+            (price_cents / 100).tolist(),
+            (stock_sampler.draw_array(rng, n) if stock_sampler else rng.integers(0, 10001, n)).tolist(),
+            draw_values(rng, pools['description'], n).tolist(),
+            format_datetimes(created_offsets, reference),
+            format_datetimes(updated_offsets, reference)
+        ))
+
+
+def build_orders_batches(rng, start_id, end_id, reference_time, context):
+    """向量化生成订单数据，按批返回"""
+    user_ids = context['user_ids']
+    product_ids = context['product_ids']
+    price_cents = context['price_cents']
+    status_options = np.array(context['choices']['orders.status'], dtype=object)
+    payment_methods = np.array(context['choices']['orders.payment_method'], dtype=object)
+    reference = np.datetime64(reference_time, 's')
+    samplers = context['samplers']
+    user_sampler = samplers.get('orders.user_id')
+    product_sampler = samplers.get('orders.product_id')
+    quantity_sampler = samplers.get('orders.quantity')
+    date_sampler = samplers.get('orders.order_date')
+    status_sampler = samplers.get('orders.status')
+    payment_sampler = samplers.get('orders.payment_method')
+
+    for batch_start, batch_end in batch_ranges(start_id, end_id, context['batch_size']):
+        n = batch_end - batch_start + 1
+        # 按下标从产品ID和价格数组中取值
+        product_index = product_sampler.draw_array(rng, n) if product_sampler else rng.integers(0, len(product_ids), n)
+        quantity = quantity_sampler.draw_array(rng, n).astype(np.int64) if quantity_sampler else rng.integers(1, 11, n)
+        # 总价按分计算，避免浮点误差
+        total_cents = price_cents[product_index] * quantity
+        order_days = date_sampler.draw_array(rng, n).astype(np.int64) if date_sampler else rng.integers(0, 366, n)
+        order_offsets = -order_days * SECONDS_PER_DAY
+        # 从实际存在的用户ID中抽样
+        user_index = user_sampler.draw_array(rng, n) if user_sampler else rng.integers(0, len(user_ids), n)
+
+        yield list(zip(
+            range(batch_start, batch_end + 1),
+            user_ids[user_index].tolist(),
+            product_ids[product_index].tolist(),
+            format_datetimes(order_offsets, reference),
+            quantity.tolist(),
+            (total_cents / 100).tolist(),
+            (status_sampler.draw_array(rng, n, ages=order_days) if status_sampler
+             else draw_values(rng, status_options, n)).tolist(),
+            (payment_sampler.draw_array(rng, n) if payment_sampler else draw_values(rng, payment_methods, n)).tolist()
+        ))
+
+
+# 各表按批生成数据的函数
+BATCH_BUILDERS = {
+    'users': build_users_batches,
+    'products': build_products_batches,
+    'orders': build_orders_batches
+}
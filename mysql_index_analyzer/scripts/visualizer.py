@@ -16,6 +16,7 @@ import matplotlib.cm as cm
 import matplotlib.font_manager as fm
 import seaborn as sns
 from datetime import datetime
+from results_store import case_time, match_strategy_cases, recorded_strategies
 
 # 配置matplotlib支持中文显示
 plt.rcParams['font.sans-serif'] = ['SimHei', 'Arial Unicode MS', 'Microsoft YaHei', 'SimSun', 'DejaVu Sans']
@@ -32,6 +33,10 @@ VISUALIZATION_DIR = os.path.join(PROJECT_DIR, "visualization")  # 可视化结
 os.makedirs(RESULT_DIR, exist_ok=True)
 os.makedirs(VISUALIZATION_DIR, exist_ok=True)
 
+# 各索引策略的颜色和折线标记（按基准策略、其他策略的顺序循环使用）
+STRATEGY_COLORS = ['#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#C299FF', '#FF99CC']
+STRATEGY_MARKERS = ['o-', 's-', '^-', 'D-', 'v-', 'p-']
+
 class IndexPerformanceVisualizer:
     """索引性能可视化类"""
     
@@ -67,6 +72,25 @@ class IndexPerformanceVisualizer:
         print("改进数据加载完成")
         return self.improvement_data
     
+    def _match_cases(self):
+        """按测试用例ID匹配基准策略和其他索引策略的结果
+
+        返回(基准策略ID, {策略ID: 名称}, 其他策略ID列表, 用例名称, {策略ID: 各用例耗时中位数})
+        """
+        baseline, labels, others, matched = match_strategy_cases(self.data)
+        categories = [name for name, _, _ in matched]
+        times = {baseline: [case_time(base_test) for _, base_test, _ in matched]}
+        for strategy in others:
+            times[strategy] = [case_time(tests[strategy]) for _, _, tests in matched]
+        return baseline, labels, others, categories, times
+    
+    @staticmethod
+    def _improvements(baseline, others, times):
+        """各策略相对于基准策略的性能提升百分比 {策略ID: [各用例的提升]}"""
+        return {strategy: [(base_time - idx_time) / base_time * 100 if base_time else 0
+                           for base_time, idx_time in zip(times[baseline], times[strategy])]
+                for strategy in others}
+    
     def generate_visualizations(self, output_dir=None):
         """生成各种可视化图表"""
         if not self.data:
@@ -79,69 +103,55 @@ class IndexPerformanceVisualizer:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
         # 生成各种图表
-        self._create_query_time_comparison(output_dir, timestamp)
-        self._create_query_time_bar_chart(output_dir, timestamp)
-        self._create_improvement_percentage_chart(output_dir, timestamp)
+        _, _, others, categories, _ = self._match_cases()
+        if categories and others:
+            self._create_query_time_comparison(output_dir, timestamp)
+            self._create_query_time_bar_chart(output_dir, timestamp)
+            self._create_improvement_percentage_chart(output_dir, timestamp)
+        else:
+            print("没有可对比的测试用例（需要基准策略和至少一种其他策略的结果），跳过查询时间对比图")
         
         if self.improvement_data:
             self._create_improvement_heatmap(output_dir, timestamp)
             
+        if self.data.get('partitioning'):
+            self._create_partitioning_chart(output_dir, timestamp)
+            
+        if self.data.get('write_costs'):
+            self._create_write_cost_chart(output_dir, timestamp)
+            
+        if self.data.get('index_builds'):
+            self._create_index_build_chart(output_dir, timestamp)
+            
+        if self.data.get('index_sizes'):
+            self._create_gain_per_mb_chart(output_dir, timestamp)
+            
         print(f"可视化图表已保存到: {output_dir}")
     
     def _create_query_time_comparison(self, output_dir, timestamp):
         """创建查询时间对比图"""
         # 准备数据
-        categories = []
-        no_index_times = []
-        single_index_times = []
-        multi_index_times = []
-        
-        # 从每个测试类型中提取测试用例
-        no_indexes = self.data.get('no_indexes', [])
-        single_column_indexes = self.data.get('single_column_indexes', [])
-        multi_column_indexes = self.data.get('multi_column_indexes', [])
-        
-        # 匹配相同的测试用例
-        for no_idx_test in no_indexes:
-            test_name = no_idx_test['name']
-            base_name = test_name.split('（')[0]  # 提取基本名称
-            
-            # 查找对应的单列索引和多列索引测试结果
-            single_idx_test = next((t for t in single_column_indexes 
-                                   if t['name'].startswith(base_name)), None)
-            multi_idx_test = next((t for t in multi_column_indexes 
-                                  if t['name'].startswith(base_name)), None)
-            
-            if single_idx_test and multi_idx_test:
-                categories.append(base_name)
-                no_index_times.append(no_idx_test['avg_time'])
-                single_index_times.append(single_idx_test['avg_time'])
-                multi_index_times.append(multi_idx_test['avg_time'])
+        baseline, labels, others, categories, times = self._match_cases()
         
         # 创建折线图
         plt.figure(figsize=(12, 8))
         
         x = range(len(categories))
         
-        plt.plot(x, no_index_times, 'o-', linewidth=2, label='无索引', markersize=8)
-        plt.plot(x, single_index_times, 's-', linewidth=2, label='单列索引', markersize=8)
-        plt.plot(x, multi_index_times, '^-', linewidth=2, label='联合索引', markersize=8)
+        for i, strategy in enumerate([baseline] + others):
+            plt.plot(x, times[strategy], STRATEGY_MARKERS[i % len(STRATEGY_MARKERS)], linewidth=2,
+                     label=labels[strategy], markersize=8)
         
-        plt.ylabel('平均查询时间（秒）', fontsize=14)
+        plt.ylabel('查询时间中位数（秒）', fontsize=14)
         plt.title('不同索引策略下的查询性能对比', fontsize=16)
         plt.xticks(x, categories, rotation=45, ha='right', fontsize=12)
         plt.legend(fontsize=12)
         plt.grid(True, alpha=0.3)
         
         # 在每个点上标注具体的时间值
-        for i, v in enumerate(no_index_times):
-            plt.text(i, v+0.01, f'{v:.4f}s', ha='center', va='bottom')
-        
-        for i, v in enumerate(single_index_times):
-            plt.text(i, v+0.01, f'{v:.4f}s', ha='center', va='bottom')
-            
-        for i, v in enumerate(multi_index_times):
-            plt.text(i, v+0.01, f'{v:.4f}s', ha='center', va='bottom')
+        for strategy_times in times.values():
+            for i, v in enumerate(strategy_times):
+                plt.text(i, v+0.01, f'{v:.4f}s', ha='center', va='bottom')
         
         plt.tight_layout()
         plt.savefig(os.path.join(output_dir, f"query_time_line_{timestamp}.png"), dpi=300)
@@ -150,46 +160,23 @@ class IndexPerformanceVisualizer:
     def _create_query_time_bar_chart(self, output_dir, timestamp):
         """创建查询时间柱状图"""
         # 准备数据
-        categories = []
-        no_index_times = []
-        single_index_times = []
-        multi_index_times = []
-        
-        # 从每个测试类型中提取测试用例
-        no_indexes = self.data.get('no_indexes', [])
-        single_column_indexes = self.data.get('single_column_indexes', [])
-        multi_column_indexes = self.data.get('multi_column_indexes', [])
-        
-        # 匹配相同的测试用例
-        for no_idx_test in no_indexes:
-            test_name = no_idx_test['name']
-            base_name = test_name.split('（')[0]  # 提取基本名称
-            
-            # 查找对应的单列索引和多列索引测试结果
-            single_idx_test = next((t for t in single_column_indexes 
-                                   if t['name'].startswith(base_name)), None)
-            multi_idx_test = next((t for t in multi_column_indexes 
-                                  if t['name'].startswith(base_name)), None)
-            
-            if single_idx_test and multi_idx_test:
-                categories.append(base_name)
-                no_index_times.append(no_idx_test['avg_time'])
-                single_index_times.append(single_idx_test['avg_time'])
-                multi_index_times.append(multi_idx_test['avg_time'])
+        baseline, labels, others, categories, times = self._match_cases()
+        strategies = [baseline] + others
         
         # 创建分组柱状图
         fig, ax = plt.subplots(figsize=(14, 8))
         
         x = range(len(categories))
-        width = 0.25
+        width = 0.8 / len(strategies)
         
         # 柱状图
-        rects1 = ax.bar([i - width for i in x], no_index_times, width, label='无索引', color='#FF9999')
-        rects2 = ax.bar(x, single_index_times, width, label='单列索引', color='#66B2FF')
-        rects3 = ax.bar([i + width for i in x], multi_index_times, width, label='联合索引', color='#99FF99')
+        bars = []
+        for i, strategy in enumerate(strategies):
+            bars.append(ax.bar([j + (i - (len(strategies) - 1) / 2) * width for j in x], times[strategy], width,
+                               label=labels[strategy], color=STRATEGY_COLORS[i % len(STRATEGY_COLORS)]))
         
         # 添加标签、标题和图例
-        ax.set_ylabel('平均查询时间（秒）', fontsize=14)
+        ax.set_ylabel('查询时间中位数（秒）', fontsize=14)
         ax.set_title('不同索引策略下的查询性能对比', fontsize=16)
         ax.set_xticks(x)
         ax.set_xticklabels(categories, rotation=45, ha='right', fontsize=12)
@@ -204,9 +191,8 @@ class IndexPerformanceVisualizer:
                         f'{height:.4f}s',
                         ha='center', va='bottom', fontsize=9)
         
-        add_labels(rects1)
-        add_labels(rects2)
-        add_labels(rects3)
+        for rects in bars:
+            add_labels(rects)
         
         plt.tight_layout()
         plt.savefig(os.path.join(output_dir, f"query_time_bar_{timestamp}.png"), dpi=300)
@@ -215,88 +201,204 @@ class IndexPerformanceVisualizer:
     def _create_improvement_percentage_chart(self, output_dir, timestamp):
         """创建性能提升百分比图表"""
         # 准备数据
-        categories = []
-        no_index_times = []
-        single_index_times = []
-        multi_index_times = []
-        
-        # 从每个测试类型中提取测试用例
-        no_indexes = self.data.get('no_indexes', [])
-        single_column_indexes = self.data.get('single_column_indexes', [])
-        multi_column_indexes = self.data.get('multi_column_indexes', [])
-        
-        # 匹配相同的测试用例
-        for no_idx_test in no_indexes:
-            test_name = no_idx_test['name']
-            base_name = test_name.split('（')[0]  # 提取基本名称
-            
-            # 查找对应的单列索引和多列索引测试结果
-            single_idx_test = next((t for t in single_column_indexes 
-                                   if t['name'].startswith(base_name)), None)
-            multi_idx_test = next((t for t in multi_column_indexes 
-                                  if t['name'].startswith(base_name)), None)
-            
-            if single_idx_test and multi_idx_test:
-                categories.append(base_name)
-                no_index_times.append(no_idx_test['avg_time'])
-                single_index_times.append(single_idx_test['avg_time'])
-                multi_index_times.append(multi_idx_test['avg_time'])
+        baseline, labels, others, categories, times = self._match_cases()
                 
         # 计算性能提升百分比
-        single_improvements = [(no_time - single_time) / no_time * 100 
-                              for no_time, single_time in zip(no_index_times, single_index_times)]
-        multi_improvements = [(no_time - multi_time) / no_time * 100 
-                             for no_time, multi_time in zip(no_index_times, multi_index_times)]
+        improvements = self._improvements(baseline, others, times)
         
         # 创建水平条形图
         plt.figure(figsize=(12, 10))
         
         y_pos = range(len(categories))
+        height = 0.8 / len(others)
         
-        plt.barh(y_pos, single_improvements, 0.4, alpha=0.8, label='单列索引', color='#66B2FF')
-        
-        # 使用不同的y位置，这样两个条不会重叠
-        adjusted_y_pos = [y + 0.4 for y in y_pos]
-        plt.barh(adjusted_y_pos, multi_improvements, 0.4, alpha=0.8, label='联合索引', color='#99FF99')
+        # 每个策略使用不同的y位置，这样各策略的条不会重叠
+        for i, strategy in enumerate(others):
+            color = STRATEGY_COLORS[(i + 1) % len(STRATEGY_COLORS)]
+            adjusted_y_pos = [y + i * height for y in y_pos]
+            plt.barh(adjusted_y_pos, improvements[strategy], height, alpha=0.8, label=labels[strategy], color=color)
+            
+            # 添加数据标签
+            for y, v in zip(adjusted_y_pos, improvements[strategy]):
+                plt.text(v + 1, y, f'{v:.2f}%', va='center', fontsize=10)
         
         # 添加网格线
         plt.grid(True, alpha=0.3, axis='x')
         
         # 设置坐标轴标签和标题
         plt.xlabel('性能提升百分比 (%)', fontsize=14)
-        plt.title('不同索引策略的性能提升百分比', fontsize=16)
+        plt.title(f'不同索引策略的性能提升百分比（相对于{labels[baseline]}）', fontsize=16)
         
-        # 设置y轴刻度和标签
-        # 我们使用y_pos和categories来设置刻度和标签
-        # 但需要调整y_pos，使其处于两个条的中间
-        middle_y_pos = [y + 0.2 for y in y_pos]
+        # 设置y轴刻度和标签，刻度位于各策略条的中间
+        middle_y_pos = [y + (len(others) - 1) * height / 2 for y in y_pos]
         plt.yticks(middle_y_pos, categories, fontsize=12)
         
-        # 添加数据标签
-        for i, v in enumerate(single_improvements):
-            plt.text(v + 1, y_pos[i], f'{v:.2f}%', va='center', fontsize=10)
-            
-        for i, v in enumerate(multi_improvements):
-            plt.text(v + 1, adjusted_y_pos[i], f'{v:.2f}%', va='center', fontsize=10)
-        
         # 添加图例
         plt.legend(fontsize=12)
         
-        # 计算平均提升
-        avg_single = sum(single_improvements) / len(single_improvements)
-        avg_multi = sum(multi_improvements) / len(multi_improvements)
+        # 计算并标注平均提升
+        for i, strategy in enumerate(others):
+            color = STRATEGY_COLORS[(i + 1) % len(STRATEGY_COLORS)]
+            avg_improvement = sum(improvements[strategy]) / len(improvements[strategy])
+            plt.axvline(x=avg_improvement, color=color, linestyle='--', alpha=0.7)
+            plt.text(avg_improvement + 1, len(categories) - 1 + i * 0.5, f'平均提升: {avg_improvement:.2f}%',
+                     color=color, fontsize=12, va='center')
         
-        # 添加平均提升标注
-        plt.axvline(x=avg_single, color='#66B2FF', linestyle='--', alpha=0.7)
-        plt.axvline(x=avg_multi, color='#99FF99', linestyle='--', alpha=0.7)
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, f"improvement_percentage_{timestamp}.png"), dpi=300)
+        plt.close()
+    
+    def _create_partitioning_chart(self, output_dir, timestamp):
+        """创建分区表与非分区表的查询时间对比图，标注分区表访问的分区数"""
+        cases = self.data.get('partitioning', [])
+        partitioned = [t for t in cases if t.get('partitioned')]
+        unpartitioned = {t['name'].split('（')[0]: t for t in cases if not t.get('partitioned')}
         
-        plt.text(avg_single + 1, len(categories) - 1, f'平均提升: {avg_single:.2f}%', 
-                color='#66B2FF', fontsize=12, va='center')
-        plt.text(avg_multi + 1, len(categories) - 0.5, f'平均提升: {avg_multi:.2f}%', 
-                color='#99FF99', fontsize=12, va='center')
+        categories = []
+        partitioned_times = []
+        unpartitioned_times = []
+        labels = []
+        for test in partitioned:
+            base_name = test['name'].split('（')[0]
+            if base_name not in unpartitioned:
+                continue
+            categories.append(base_name)
+            partitioned_times.append(test['avg_time'])
+            unpartitioned_times.append(unpartitioned[base_name]['avg_time'])
+            labels.append(f"{len(test.get('partitions_scanned', []))}/{test.get('total_partitions', 0)}")
+        if not categories:
+            return
+        
+        fig, ax = plt.subplots(figsize=(12, 8))
+        x = np.arange(len(categories))
+        width = 0.35
+        ax.bar(x - width/2, unpartitioned_times, width, label='非分区表')
+        rects = ax.bar(x + width/2, partitioned_times, width, label='分区表')
+        
+        # 标注分区表访问的分区数
+        for rect, label in zip(rects, labels):
+            ax.annotate(f'分区 {label}', xy=(rect.get_x() + rect.get_width() / 2, rect.get_height()),
+                        xytext=(0, 3), textcoords="offset points", ha='center', va='bottom')
+        
+        scheme = self.data.get('partition_layout', {}).get('scheme', '')
+        ax.set_ylabel('平均查询时间（秒）', fontsize=14)
+        ax.set_title(f'按日期范围查询: 分区表（{scheme}）与非分区表对比', fontsize=16)
+        ax.set_xticks(x)
+        ax.set_xticklabels(categories, rotation=45, ha='right', fontsize=12)
+        ax.legend(fontsize=12)
         
         plt.tight_layout()
-        plt.savefig(os.path.join(output_dir, f"improvement_percentage_{timestamp}.png"), dpi=300)
+        plt.savefig(os.path.join(output_dir, f"partition_pruning_{timestamp}.png"), dpi=300)
+        plt.close()
+    
+    def _create_write_cost_chart(self, output_dir, timestamp):
+        """创建各索引策略下写入用例的每秒行数和每行redo字节数对比图"""
+        write_costs = self.data.get('write_costs', {})
+        _, labels = recorded_strategies(self.data)
+        strategies = [(key, labels.get(key, key)) for key, cases in write_costs.items() if cases]
+        if not strategies:
+            return
+        categories = [case['name'] for case in write_costs[strategies[0][0]]]
+        
+        fig, (ax_rate, ax_redo) = plt.subplots(1, 2, figsize=(18, 8))
+        x = np.arange(len(categories))
+        width = 0.8 / len(strategies)
+        for i, (key, label) in enumerate(strategies):
+            cases = {case['name']: case for case in write_costs[key]}
+            offset = (i - (len(strategies) - 1) / 2) * width
+            ax_rate.bar(x + offset, [cases[name]['rows_per_sec'] if name in cases else 0 for name in categories],
+                        width, label=label)
+            ax_redo.bar(x + offset, [cases[name]['redo_bytes_per_row'] if name in cases else 0 for name in categories],
+                        width, label=label)
+        
+        for ax, ylabel, title in ((ax_rate, '每秒写入行数', '写入速度'), (ax_redo, '每行redo字节数', 'redo日志写入量')):
+            ax.set_ylabel(ylabel, fontsize=14)
+            ax.set_title(f'不同索引策略下的{title}', fontsize=16)
+            ax.set_xticks(x)
+            ax.set_xticklabels(categories, rotation=45, ha='right', fontsize=12)
+            ax.legend(fontsize=12)
+        
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, f"write_costs_{timestamp}.png"), dpi=300)
+        plt.close()
+    
+    def _create_index_build_chart(self, output_dir, timestamp):
+        """创建各索引的创建耗时图，有后台负载时标注创建期间的吞吐量下降"""
+        labels = []
+        times = []
+        notes = []
+        for strategy, builds in self.data.get('index_builds', {}).items():
+            for build in builds:
+                labels.append(f"{build['table']}.{build['index']}")
+                times.append(build['elapsed'])
+                note = f"{build['algorithm']}/{build['lock']}"
+                drop = build.get('background', {}).get('impact', {}).get('throughput_drop')
+                if drop is not None:
+                    note += f", 吞吐量-{drop:.0f}%"
+                notes.append(note)
+        if not labels:
+            return
+        
+        fig, ax = plt.subplots(figsize=(12, max(4, len(labels) * 0.6)))
+        y = np.arange(len(labels))
+        rects = ax.barh(y, times)
+        for rect, note in zip(rects, notes):
+            ax.annotate(note, xy=(rect.get_width(), rect.get_y() + rect.get_height() / 2),
+                        xytext=(3, 0), textcoords="offset points", ha='left', va='center')
+        
+        ax.set_xlabel('创建耗时（秒）', fontsize=14)
+        ax.set_title('索引创建耗时（ALGORITHM/LOCK）', fontsize=16)
+        ax.set_yticks(y)
+        ax.set_yticklabels(labels, fontsize=12)
+        ax.invert_yaxis()
+        
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, f"index_build_cost_{timestamp}.png"), dpi=300)
+        plt.close()
+    
+    def _create_gain_per_mb_chart(self, output_dir, timestamp):
+        """创建各索引策略的二级索引大小和每MB索引带来的查询时间缩短对比图"""
+        index_sizes = self.data.get('index_sizes', {})
+        _, labels, others, matched = match_strategy_cases(self.data)
+        strategies = [(key, labels[key]) for key in others
+                      if index_sizes.get(key) and index_sizes[key]['secondary_index_mb'] > 0]
+        if not strategies:
+            return
+        
+        # 匹配相同的测试用例，计算每MB二级索引相对基准策略缩短的查询时间（毫秒）
+        categories = [name for name, _, _ in matched]
+        gains = {key: [] for key, _ in strategies}
+        for _, base_test, tests in matched:
+            for key, _ in strategies:
+                gain_ms = (case_time(base_test) - case_time(tests[key])) * 1000
+                gains[key].append(gain_ms / index_sizes[key]['secondary_index_mb'])
+        
+        fig, (ax_size, ax_gain) = plt.subplots(1, 2, figsize=(18, 8), gridspec_kw={'width_ratios': [1, 2]})
+        
+        # 各策略的二级索引大小，标注占缓冲池的比例
+        sizes = [index_sizes[key]['secondary_index_mb'] for key, _ in strategies]
+        rects = ax_size.bar([label for _, label in strategies], sizes)
+        for rect, (key, _) in zip(rects, strategies):
+            ratio = index_sizes[key].get('buffer_pool_ratio')
+            if ratio is not None:
+                ax_size.annotate(f'缓冲池的{ratio:.1%}', xy=(rect.get_x() + rect.get_width() / 2, rect.get_height()),
+                                 xytext=(0, 3), textcoords="offset points", ha='center', va='bottom')
+        ax_size.set_ylabel('二级索引大小（MB）', fontsize=14)
+        ax_size.set_title('二级索引大小', fontsize=16)
+        
+        x = np.arange(len(categories))
+        width = 0.8 / len(strategies)
+        for i, (key, label) in enumerate(strategies):
+            ax_gain.bar(x + (i - (len(strategies) - 1) / 2) * width, gains[key], width, label=label)
+        ax_gain.axhline(0, color='gray', linewidth=0.8)
+        ax_gain.set_ylabel('每MB索引缩短的查询时间（毫秒/MB）', fontsize=14)
+        ax_gain.set_title('索引的查询时间收益/索引大小', fontsize=16)
+        ax_gain.set_xticks(x)
+        ax_gain.set_xticklabels(categories, rotation=45, ha='right', fontsize=12)
+        ax_gain.legend(fontsize=12)
+        
+        plt.tight_layout()
+        plt.savefig(os.path.join(output_dir, f"gain_per_mb_{timestamp}.png"), dpi=300)
         plt.close()
     
     def _create_improvement_heatmap(self, output_dir, timestamp):
@@ -310,20 +412,19 @@ class IndexPerformanceVisualizer:
         if not improvements:
             return
             
-        # 准备热图数据
+        # 准备热图数据（每个策略一行）
         test_cases = [imp['test_case'] for imp in improvements]
-        single_improvements = [imp['single_column_improvement'] for imp in improvements]
-        multi_improvements = [imp['multi_column_improvement'] for imp in improvements]
-        
-        # 创建数据框
-        df = pd.DataFrame({
-            'test_case': test_cases,
-            'single_column': single_improvements,
-            'multi_column': multi_improvements
-        })
-        
-        # 数据透视为适合热图的格式
-        pivot_df = df.set_index('test_case').T
+        strategies = self.improvement_data.get('strategies')
+        if strategies:
+            rows = {label: [imp['improvements'][strategy] for imp in improvements]
+                    for strategy, label in strategies.items()}
+        else:
+            # 旧版本的改进数据只记录了单列索引和联合索引
+            rows = {'单列索引': [imp['single_column_improvement'] for imp in improvements],
+                    '联合索引': [imp['multi_column_improvement'] for imp in improvements]}
+        
+        # 创建数据框，数据透视为适合热图的格式
+        pivot_df = pd.DataFrame(rows, index=test_cases).T
         
         # 绘制热图
         plt.figure(figsize=(14, 6))
@@ -335,7 +436,7 @@ class IndexPerformanceVisualizer:
         plt.xlabel('查询类型', fontsize=14)
         
         # 设置Y轴标签
-        ax.set_yticklabels(['单列索引', '联合索引'], rotation=0, fontsize=12)
+        ax.set_yticklabels(list(rows), rotation=0, fontsize=12)
         
         plt.tight_layout()
         plt.savefig(os.path.join(output_dir, f"improvement_heatmap_{timestamp}.png"), dpi=300)
@@ -352,42 +453,10 @@ class IndexPerformanceVisualizer:
             output_file = os.path.join(RESULT_DIR, f"index_performance_summary_{timestamp}.txt")
             
         # 准备数据
-        categories = []
-        no_index_times = []
-        single_index_times = []
-        multi_index_times = []
-        
-        # 从每个测试类型中提取测试用例
-        no_indexes = self.data.get('no_indexes', [])
-        single_column_indexes = self.data.get('single_column_indexes', [])
-        multi_column_indexes = self.data.get('multi_column_indexes', [])
-        
-        # 匹配相同的测试用例
-        for no_idx_test in no_indexes:
-            test_name = no_idx_test['name']
-            base_name = test_name.split('（')[0]  # 提取基本名称
-            
-            # 查找对应的单列索引和多列索引测试结果
-            single_idx_test = next((t for t in single_column_indexes 
-                                   if t['name'].startswith(base_name)), None)
-            multi_idx_test = next((t for t in multi_column_indexes 
-                                  if t['name'].startswith(base_name)), None)
-            
-            if single_idx_test and multi_idx_test:
-                categories.append(base_name)
-                no_index_times.append(no_idx_test['avg_time'])
-                single_index_times.append(single_idx_test['avg_time'])
-                multi_index_times.append(multi_idx_test['avg_time'])
+        baseline, labels, others, categories, times = self._match_cases()
                 
         # 计算性能提升百分比
-        single_improvements = [(no_time - single_time) / no_time * 100 
-                              for no_time, single_time in zip(no_index_times, single_index_times)]
-        multi_improvements = [(no_time - multi_time) / no_time * 100 
-                             for no_time, multi_time in zip(no_index_times, multi_index_times)]
-        
-        # 计算平均提升
-        avg_single = sum(single_improvements) / len(single_improvements)
-        avg_multi = sum(multi_improvements) / len(multi_improvements)
+        improvements = self._improvements(baseline, others, times)
         
         # 生成报告文本
         report = []
@@ -397,35 +466,77 @@ class IndexPerformanceVisualizer:
         report.append("")
         report.append(f"报告生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         report.append("")
-        report.append("1. 总体性能提升情况")
-        report.append("---------------------------------------------------------------")
-        report.append(f"单列索引平均性能提升: {avg_single:.2f}%")
-        report.append(f"联合索引平均性能提升: {avg_multi:.2f}%")
-        report.append("")
         
-        # 按性能提升排序的查询类型
-        sorted_categories = [x for _, x in sorted(zip(multi_improvements, categories), reverse=True)]
-        sorted_single_imp = [x for _, x in sorted(zip(multi_improvements, single_improvements), reverse=True)]
-        sorted_multi_imp = sorted(multi_improvements, reverse=True)
+        section = 1
         
-        report.append("2. 各查询类型的性能提升（按联合索引提升降序排列）")
-        report.append("---------------------------------------------------------------")
-        for i, category in enumerate(sorted_categories):
-            report.append(f"{i+1}. {category}")
-            report.append(f"   - 单列索引提升: {sorted_single_imp[i]:.2f}%")
-            report.append(f"   - 联合索引提升: {sorted_multi_imp[i]:.2f}%")
+        if categories and others:
+            report.append(f"{section}. 总体性能提升情况（相对于{labels[baseline]}）")
+            report.append("---------------------------------------------------------------")
+            for strategy in others:
+                avg_improvement = sum(improvements[strategy]) / len(improvements[strategy])
+                report.append(f"{labels[strategy]}平均性能提升: {avg_improvement:.2f}%")
             report.append("")
+            section += 1
             
-        report.append("3. 各查询类型的执行时间对比")
-        report.append("---------------------------------------------------------------")
-        report.append(f"{'查询类型':<30} {'无索引(秒)':<15} {'单列索引(秒)':<15} {'联合索引(秒)':<15}")
-        report.append("-" * 80)
-        
-        for i, category in enumerate(categories):
-            report.append(f"{category:<30} {no_index_times[i]:<15.6f} {single_index_times[i]:<15.6f} {multi_index_times[i]:<15.6f}")
+            # 按最后一个策略的性能提升排序的查询类型
+            sort_strategy = others[-1]
+            order = sorted(range(len(categories)), key=lambda i: improvements[sort_strategy][i], reverse=True)
             
-        report.append("")
-        report.append("4. 索引优化建议")
+            report.append(f"{section}. 各查询类型的性能提升（按{labels[sort_strategy]}提升降序排列）")
+            report.append("---------------------------------------------------------------")
+            for rank, i in enumerate(order):
+                report.append(f"{rank+1}. {categories[i]}")
+                for strategy in others:
+                    report.append(f"   - {labels[strategy]}提升: {improvements[strategy][i]:.2f}%")
+                report.append("")
+            section += 1
+                
+            strategies = [baseline] + others
+            report.append(f"{section}. 各查询类型的执行时间对比（中位数）")
+            report.append("---------------------------------------------------------------")
+            report.append(f"{'查询类型':<30} " + " ".join(f"{labels[strategy] + '(秒)':<15}" for strategy in strategies))
+            report.append("-" * (31 + 16 * len(strategies)))
+            
+            for i, category in enumerate(categories):
+                report.append(f"{category:<30} " + " ".join(f"{times[strategy][i]:<15.6f}" for strategy in strategies))
+                
+            report.append("")
+            section += 1
+        else:
+            report.append("没有可对比的测试用例（需要基准策略和至少一种其他策略的结果）")
+            report.append("")
+        
+        # 索引大小
+        index_sizes = self.data.get('index_sizes', {})
+        if index_sizes:
+            report.append(f"{section}. 各索引策略的索引大小")
+            report.append("---------------------------------------------------------------")
+            for strategy, sizes in index_sizes.items():
+                report.append(f"{strategy}: 二级索引合计 {sizes['secondary_index_mb']:.2f} MB"
+                              + (f"（占缓冲池的 {sizes['buffer_pool_ratio']:.1%}）"
+                                 if sizes.get('buffer_pool_ratio') is not None else ""))
+                for index in sizes['indexes']:
+                    if index['index'] != 'PRIMARY':
+                        report.append(f"   - {index['table']}.{index['index']}: {index['mb']:.2f} MB")
+            report.append("")
+            section += 1
+        
+        # 写入代价
+        write_costs = self.data.get('write_costs', {})
+        if write_costs:
+            report.append(f"{section}. 各索引策略的写入代价")
+            report.append("---------------------------------------------------------------")
+            report.append(f"{'写入用例':<20} {'索引策略':<25} {'行/秒':<12} {'redo字节/行':<12} {'页分裂':<10}")
+            report.append("-" * 80)
+            for strategy, cases in write_costs.items():
+                for case in cases:
+                    splits = case['page_splits'] if case.get('page_splits') is not None else '-'
+                    report.append(f"{case['name']:<20} {strategy:<25} {case['rows_per_sec']:<12.0f} "
+                                  f"{case['redo_bytes_per_row']:<12.0f} {splits:<10}")
+            report.append("")
+            section += 1
+        
+        report.append(f"{section}. 索引优化建议")
         report.append("---------------------------------------------------------------")
         report.append("1) 对于简单的等值查询（如按用户名查询），单列索引通常已经足够")
         report.append("2) 对于复杂查询（如联表查询、多条件查询），联合索引通常效果更好")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MySQL索引测试 - 写入代价测试
+在当前索引策略下对订单表和用户表执行批量插入、索引列的单行更新和单行删除，统计每秒写入行数、
+redo日志写入字节数（Innodb_os_log_written增量）和索引页分裂次数（INNODB_METRICS），
+用于权衡索引带来的读性能提升和写入代价
+"""
+
+import time
+import random
+from datetime import datetime, timedelta
+
+from server_status import read_status, status_delta
+
+# 写入测试配置
+WRITE_BATCH_SIZE = 500  # 批量插入每批行数
+WRITE_BATCHES = 10  # 批量插入批数
+POINT_WRITES = 500  # 单行更新/删除的次数（每条语句单独提交）
+WRITE_SEED = 20240101  # 固定随机种子，各索引策略执行完全相同的写入
+WRITE_MARKER = 'write_benchmark'  # 写入测试插入的行的标记（订单的payment_method、用户名前缀）
+
+# 写入时记录的全局计数器（其他会话的写入也会计入，测试时应避免其他负载）
+WRITE_STATUS = (
+    'Innodb_os_log_written', 'Innodb_rows_inserted', 'Innodb_rows_updated', 'Innodb_rows_deleted'
+)
+# 索引页分裂/合并计数器（INNODB_METRICS，默认未开启）
+PAGE_METRICS = ('index_page_splits', 'index_page_merge_successful')
+
+
+def enable_page_metrics(conn):
+    """开启索引页分裂/合并计数器，无权限时返回False"""
+    cursor = conn.cursor()
+    try:
+        for name in PAGE_METRICS:
+            cursor.execute(f"SET GLOBAL innodb_monitor_enable = '{name}'")
+        return True
+    except Exception as e:
+        print(f"无法开启INNODB_METRICS计数器（{e}），不记录索引页分裂次数")
+        return False
+    finally:
+        cursor.close()
+
+
+def read_page_metrics(conn):
+    """读取索引页分裂/合并计数器"""
+    cursor = conn.cursor()
+    placeholders = ", ".join(["%s"] * len(PAGE_METRICS))
+    cursor.execute(f"SELECT NAME, COUNT FROM information_schema.INNODB_METRICS WHERE NAME IN ({placeholders})",
+                   PAGE_METRICS)
+    metrics = {name: int(count) for name, count in cursor.fetchall()}
+    cursor.close()
+    return metrics
+
+
+class WriteBenchmark:
+    """在当前索引下执行一组写入用例，测试结束后删除插入的全部行，不改变测试数据"""
+
+    def __init__(self, conn, batch_size=WRITE_BATCH_SIZE, batches=WRITE_BATCHES, point_writes=POINT_WRITES,
+                 seed=WRITE_SEED):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.batches = batches
+        self.point_writes = point_writes
+        self.seed = seed
+        self.page_metrics = enable_page_metrics(conn)
+
+    def measure(self, name, table, rows, func):
+        """执行一个写入用例，返回耗时、每秒行数、redo字节数和索引页分裂次数"""
+        before = read_status(self.conn, WRITE_STATUS)
+        metrics_before = read_page_metrics(self.conn) if self.page_metrics else {}
+        start = time.perf_counter_ns()
+        func()
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        status = status_delta(before, read_status(self.conn, WRITE_STATUS))
+        metrics = status_delta(metrics_before, read_page_metrics(self.conn)) if self.page_metrics else {}
+
+        result = {
+            'name': name,
+            'table': table,
+            'rows': rows,
+            'elapsed': elapsed,
+            'rows_per_sec': rows / elapsed if elapsed > 0 else 0,
+            'redo_bytes': status['Innodb_os_log_written'],
+            'redo_bytes_per_row': status['Innodb_os_log_written'] / rows if rows else 0,
+            'page_splits': metrics.get('index_page_splits'),
+            'page_merges': metrics.get('index_page_merge_successful'),
+            'status': status
+        }
+        print(f"{name}: {rows:,} 行, {elapsed:.3f}秒, {result['rows_per_sec']:,.0f} 行/秒, "
+              f"redo {result['redo_bytes_per_row']:.0f} 字节/行"
+              + (f", 页分裂 {result['page_splits']}" if self.page_metrics else ""))
+        return result
+
+    def _execute_each(self, query, rows):
+        """逐行执行并提交"""
+        cursor = self.conn.cursor()
+        for row in rows:
+            cursor.execute(query, row)
+            self.conn.commit()
+        cursor.close()
+
+    def _insert_batches(self, query, rows):
+        """按批插入，每批提交一次"""
+        cursor = self.conn.cursor()
+        for i in range(0, len(rows), self.batch_size):
+            cursor.executemany(query, rows[i:i + self.batch_size])
+            self.conn.commit()
+        cursor.close()
+
+    def _id_range(self, table):
+        """返回表的(最小ID, 最大ID)"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT MIN(id), MAX(id) FROM {table}")
+        min_id, max_id = cursor.fetchone()
+        cursor.close()
+        return min_id or 0, max_id or 0
+
+    def _new_ids(self, table, after_id):
+        """写入测试插入的行的ID"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT id FROM {table} WHERE id > %s ORDER BY id", (after_id,))
+        ids = [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return ids
+
+    def cleanup(self, table, after_id):
+        """删除写入测试插入的剩余行"""
+        cursor = self.conn.cursor()
+        cursor.execute(f"DELETE FROM {table} WHERE id > %s", (after_id,))
+        self.conn.commit()
+        cursor.close()
+
+    def run(self):
+        """执行全部写入用例，返回结果列表"""
+        rng = random.Random(self.seed)
+        total = self.batch_size * self.batches
+        now = datetime.now().replace(microsecond=0)
+        min_user, max_user = self._id_range("users")
+        min_product, max_product = self._id_range("products")
+        if not max_user or not max_product:
+            print("用户表或产品表没有数据，跳过写入测试")
+            return []
+        _, last_order = self._id_range("orders")
+        _, last_user = self._id_range("users")
+
+        # 预先生成全部写入的数据，不计入耗时
+        orders = [(rng.randint(min_user, max_user), rng.randint(min_product, max_product),
+                   now - timedelta(days=rng.randint(0, 730)), rng.randint(1, 5),
+                   round(rng.uniform(10, 5000), 2), rng.choice(['pending', 'shipped', 'delivered']), WRITE_MARKER)
+                  for _ in range(total)]
+        users = [(f"{WRITE_MARKER}_{i}_{rng.getrandbits(32):08x}", f"{WRITE_MARKER}_{i}@example.com",
+                  f"{rng.randint(10 ** 9, 10 ** 10 - 1)}", now - timedelta(days=rng.randint(0, 730)), now,
+                  rng.choice(['active', 'inactive', 'suspended']), rng.randint(300, 850))
+                 for i in range(total)]
+
+        results = []
+        try:
+            results.append(self.measure("订单批量插入", "orders", total, lambda: self._insert_batches(
+                "INSERT INTO orders (user_id, product_id, order_date, quantity, total_price, status, payment_method) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)", orders)))
+            results.append(self.measure("用户批量插入", "users", total, lambda: self._insert_batches(
+                "INSERT INTO users (username, email, phone, registration_date, last_login, status, credit_score) "
+                "VALUES (%s, %s, %s, %s, %s, %s, %s)", users)))
+
+            # 只更新和删除本次插入的行，按随机顺序访问
+            order_ids = self._new_ids("orders", last_order)
+            user_ids = self._new_ids("users", last_user)
+            rng.shuffle(order_ids)
+            rng.shuffle(user_ids)
+            order_ids = order_ids[:self.point_writes]
+            user_ids = user_ids[:self.point_writes]
+
+            order_updates = [(rng.randint(min_user, max_user), rng.randint(min_product, max_product), order_id)
+                             for order_id in order_ids]
+            results.append(self.measure("订单索引列单行更新", "orders", len(order_updates), lambda: self._execute_each(
+                "UPDATE orders SET user_id = %s, product_id = %s WHERE id = %s", order_updates)))
+            user_updates = [(now - timedelta(days=rng.randint(0, 730)), rng.choice(['active', 'inactive', 'suspended']),
+                             rng.randint(300, 850), user_id) for user_id in user_ids]
+            results.append(self.measure("用户索引列单行更新", "users", len(user_updates), lambda: self._execute_each(
+                "UPDATE users SET registration_date = %s, status = %s, credit_score = %s WHERE id = %s",
+                user_updates)))
+
+            results.append(self.measure("订单单行删除", "orders", len(order_ids), lambda: self._execute_each(
+                "DELETE FROM orders WHERE id = %s", [(order_id,) for order_id in order_ids])))
+            results.append(self.measure("用户单行删除", "users", len(user_ids), lambda: self._execute_each(
+                "DELETE FROM users WHERE id = %s", [(user_id,) for user_id in user_ids])))
+        finally:
+            self.conn.rollback()
+            self.cleanup("orders", last_order)
+            self.cleanup("users", last_user)
+        return results
+
+
+def write_overhead(write_costs, baseline):
+    """各索引策略写入用例相对基准策略的每秒行数变化（%）和redo字节数倍数"""
+    base = {case['name']: case for case in write_costs.get(baseline, [])}
+    overhead = {}
+    for strategy, cases in write_costs.items():
+        if strategy == baseline:
+            continue
+        overhead[strategy] = {}
+        for case in cases:
+            base_case = base.get(case['name'])
+            if not base_case or not base_case['rows_per_sec'] or not base_case['redo_bytes']:
+                continue
+            overhead[strategy][case['name']] = {
+                'rows_per_sec_change': (case['rows_per_sec'] - base_case['rows_per_sec'])
+                                       / base_case['rows_per_sec'] * 100,
+                'redo_ratio': case['redo_bytes'] / base_case['redo_bytes']
+            }
+    return overhead